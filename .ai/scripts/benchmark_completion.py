@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Completion Engine Benchmark
+
+This script generates synthetic work units with an increasing number of tasks and times a full
+completion recalculation (parse, calculate, write) on each, to check that the completion engine
+scales linearly with the number of tasks.
+
+Usage:
+    python benchmark_completion.py [--sizes 10,100,300,1000] [--subtasks 4] [--repeat 5]
+
+Options:
+    --sizes SIZES       Comma-separated task counts to benchmark
+    --subtasks COUNT    Number of subtasks per task
+    --repeat COUNT      Number of timed runs per size; the best run is reported
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from completion_engine import update_completion
+
+STATUSES = ('Not Started', 'In Progress', 'Completed')
+MARKERS = ('[ ]', '[~]', '[✓]')
+
+def generate_work_unit(task_count, subtask_count):
+    """Generate the text of a work unit with the given number of tasks and subtasks per task."""
+    lines = [
+        "# Work Unit: Benchmark",
+        "",
+        "## Metadata",
+        "- **ID**: WU-999",
+        "- **Status**: In Progress",
+        "- **Completion**: 0%",
+        "- **Last Updated**: 2025-01-01 00:00",
+        "",
+        "## Requirements",
+        ""
+    ]
+    for index in range(task_count):
+        section, task = divmod(index, 10)
+        lines += [
+            f"#### {section + 1}.{task + 1} Task {index + 1}",
+            f"- **Status**: {STATUSES[index % len(STATUSES)]}",
+            "- **Completion**: 0%",
+            "- **Implementation Details**:"
+        ]
+        for subtask in range(subtask_count):
+            marker = MARKERS[(index + subtask) % len(MARKERS)]
+            lines.append(f"  - {marker} Subtask {subtask + 1} - [US-{index:04d}-{subtask}](../user_stories/US-{index:04d}.md)")
+        lines.append("")
+    lines += ["## Changelog", "", "- **2025-01-01 00:00**: Created", ""]
+    return "\n".join(lines)
+
+def benchmark(task_count, subtask_count, repeat):
+    """Return the best wall-clock time of a completion update on a work unit of the given size."""
+    content = generate_work_unit(task_count, subtask_count).encode('utf-8')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, 'WU-999_benchmark.md')
+        best = None
+        for _ in range(repeat):
+            with open(file_path, 'wb') as f:
+                f.write(content)
+            start = time.perf_counter()
+            update_completion(file_path)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    return best, len(content)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the completion engine.')
+    parser.add_argument('--sizes', default='10,100,300,1000', help='Comma-separated task counts to benchmark')
+    parser.add_argument('--subtasks', type=int, default=4, help='Number of subtasks per task')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed runs per size')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    print(f"{'Tasks':>8} {'Size (KB)':>10} {'Time (ms)':>10} {'us/task':>10}")
+    results = []
+    for size in sizes:
+        elapsed, byte_count = benchmark(size, args.subtasks, args.repeat)
+        results.append((size, elapsed))
+        print(f"{size:>8} {byte_count / 1024:>10.1f} {elapsed * 1000:>10.2f} {elapsed / size * 1e6:>10.1f}")
+
+    # Linear scaling keeps the per-task cost roughly flat from the smallest to the largest size
+    (small_size, small_time), (large_size, large_time) = results[0], results[-1]
+    if len(results) > 1:
+        ratio = (large_time / large_size) / (small_time / small_size)
+        print(f"\nPer-task cost ratio ({large_size} vs {small_size} tasks): {ratio:.2f}x")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Parallel Scan and Validation Benchmark
+
+This script generates a synthetic corpus of work units and times a cold index scan (metadata
+extraction of every file) and a full validation run with an increasing number of jobs, to check
+that both scale with the number of worker processes. The corpus lives in a temporary directory
+whose files are passed to the workers by absolute path, so the workers read the corpus whatever
+the process start method; the framework's own work units and index are not touched.
+
+Usage:
+    python benchmark_parallel.py [--units 10000] [--tasks 10] [--jobs 1,2,4,8,16] [--start-method METHOD]
+
+Options:
+    --units COUNT           Number of work units in the synthetic corpus
+    --tasks COUNT           Number of tasks per work unit
+    --jobs JOBS             Comma-separated job counts to benchmark
+    --start-method METHOD   Process start method of the workers: fork, spawn or forkserver
+                            (default: the platform's)
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from work_unit_index import extract_file, is_work_unit_file
+from work_unit_validator import validate_all_work_units
+from process_pool import parallel_map
+
+STATUSES = ('Not Started', 'In Progress', 'Completed')
+MARKERS = ('[ ]', '[~]', '[✓]')
+
+def generate_work_unit(number, task_count):
+    """Generate the text of a synthetic work unit."""
+    lines = [
+        f"# Work Unit: Synthetic Work Unit {number}",
+        "",
+        "## Metadata",
+        f"- **ID**: WU-{number:05d}",
+        f"- **Status**: {STATUSES[number % len(STATUSES)]}",
+        "- **Type**: Feature",
+        "- **Completion**: 0%",
+        "- **Created**: 2025-01-01",
+        "- **Last Updated**: 2025-01-01 00:00",
+        f"- **Description**: Synthetic work unit number {number}",
+        "- **Relationship Type**: Independent",
+        f"- **Dependencies**: WU-{max(number - 1, 0):05d}",
+        "",
+        "## Requirements",
+        ""
+    ]
+    for task in range(task_count):
+        lines += [
+            f"#### 1.{task + 1} Requirement {task + 1}",
+            f"- **Status**: {STATUSES[(number + task) % len(STATUSES)]}",
+            f"- **Completion**: {(task * 10) % 100}%",
+            "- **Implementation Details**:"
+        ]
+        for subtask in range(4):
+            marker = MARKERS[(number + task + subtask) % len(MARKERS)]
+            lines.append(f"  - {marker} Subtask {subtask + 1} - [US-{number}-{task}](../user_stories/US-{number}.md)")
+        lines.append("")
+    lines += ["## Changelog", "", "- **2025-01-01 00:00**: Created", ""]
+    return "\n".join(lines)
+
+def generate_corpus(work_units_dir, unit_count, task_count):
+    """Write a synthetic corpus of work units into a directory."""
+    for number in range(unit_count):
+        file_path = os.path.join(work_units_dir, f"WU-{number:05d}_synthetic.md")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(generate_work_unit(number, task_count))
+
+def time_scan(work_units_dir, jobs):
+    """Time the metadata extraction of every work unit in the corpus, as in a cold index refresh."""
+    file_paths = [os.path.join(work_units_dir, filename)
+                  for filename in sorted(os.listdir(work_units_dir)) if is_work_unit_file(filename)]
+    start = time.perf_counter()
+    parallel_map(extract_file, file_paths, jobs)
+    return time.perf_counter() - start
+
+def time_validation(work_units_dir, jobs):
+    """Time a validation run over the corpus."""
+    start = time.perf_counter()
+    validate_all_work_units(jobs=jobs, work_units_dir=work_units_dir)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parallel scanning and validation.')
+    parser.add_argument('--units', type=int, default=10000, help='Number of work units in the synthetic corpus')
+    parser.add_argument('--tasks', type=int, default=10, help='Number of tasks per work unit')
+    parser.add_argument('--jobs', default='1,2,4,8,16', help='Comma-separated job counts to benchmark')
+    parser.add_argument('--start-method', choices=multiprocessing.get_all_start_methods(),
+                        help="Process start method of the workers (default: the platform's)")
+    args = parser.parse_args()
+
+    if args.start_method:
+        multiprocessing.set_start_method(args.start_method)
+    job_counts = [int(jobs) for jobs in args.jobs.split(',')]
+    print(f"CPUs available: {os.cpu_count()}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_units_dir = os.path.join(temp_dir, 'work_units')
+        os.makedirs(work_units_dir)
+        print(f"Generating {args.units} work units with {args.tasks} tasks each...")
+        generate_corpus(work_units_dir, args.units, args.tasks)
+
+        print(f"\n{'Jobs':>6} {'Scan (s)':>10} {'Speedup':>8} {'Validate (s)':>13} {'Speedup':>8}")
+        baseline = None
+        for jobs in job_counts:
+            scan_time = time_scan(work_units_dir, jobs)
+            validation_time = time_validation(work_units_dir, jobs)
+            if baseline is None:
+                baseline = (scan_time, validation_time)
+            print(f"{jobs:>6} {scan_time:>10.2f} {baseline[0] / scan_time:>7.2f}x "
+                  f"{validation_time:>13.2f} {baseline[1] / validation_time:>7.2f}x")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
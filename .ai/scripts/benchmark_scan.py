@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Project Scan Benchmark
+
+This script generates a synthetic project tree and times the project analyzer's scan against the
+previous implementation (os.walk, and every framework indicator tested against every file path),
+checking that both produce the same analysis. It also times a bare os.scandir walk of the tree: the
+directory reads that every scan pays, which bound the speedup. The tree lives in a temporary
+directory and holds empty files, except for a few manifest files.
+
+Usage:
+    python benchmark_scan.py [--files 500000] [--files-per-dir 50] [--repeat 1]
+
+Options:
+    --files COUNT           Number of files in the synthetic tree
+    --files-per-dir COUNT   Number of files per directory
+    --repeat COUNT          Number of timed runs per implementation; the best run is reported
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import tempfile
+from collections import Counter, defaultdict
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import project_analyzer
+from project_analyzer import TECH_MAPPING, FRAMEWORK_INDICATORS, MANIFEST_FILES, inspect_manifest, scan_project
+
+PACKAGES = ('web', 'api', 'worker', 'shared', 'mobile', 'infra', 'ml', 'docs')
+SUBDIRS = ('src', 'lib', 'components', 'services', 'models', 'utils', 'tests', 'config')
+NAMED_FILES = ('index.js', '__init__.py', 'README.md', 'app.py', 'settings.py', 'server.js',
+               'deployment.yaml', 'component.ts', 'Makefile', 'LICENSE')
+EXTENSIONS = ('.py', '.js', '.ts', '.tsx', '.jsx', '.md', '.json', '.css', '.go', '.java', '.yml', '.txt', '.svg', '')
+
+def generate_tree(project_dir, file_count, files_per_dir):
+    """Write a synthetic monorepo-like tree of empty files with a few manifests."""
+    directory_count = max(1, file_count // files_per_dir)
+    written = 0
+    for number in range(directory_count):
+        package = PACKAGES[number % len(PACKAGES)]
+        path = os.path.join(project_dir, 'packages', f"{package}-{number // 64}", 'src',
+                            SUBDIRS[number % len(SUBDIRS)], f"feature_{number // 8}", f"module_{number}")
+        os.makedirs(path, exist_ok=True)
+        count = files_per_dir if number < directory_count - 1 else file_count - written
+        for index in range(count):
+            if index < len(NAMED_FILES) and (number + index) % 3 == 0:
+                name = NAMED_FILES[index]
+            else:
+                name = f"file_{number}_{index}{EXTENSIONS[(number + index) % len(EXTENSIONS)]}"
+            open(os.path.join(path, name), 'w').close()
+        written += count
+        if number % 97 == 0:
+            with open(os.path.join(path, 'package.json'), 'w', encoding='utf-8') as f:
+                json.dump({'dependencies': {'react': '^18.0.0', 'express': '^4.0.0'}}, f)
+            with open(os.path.join(path, 'requirements.txt'), 'w', encoding='utf-8') as f:
+                f.write("django\ntorch\n")
+            open(os.path.join(path, 'Dockerfile'), 'w').close()
+            open(os.path.join(path, '.env'), 'w').close()
+    # Directories the scan skips
+    for ignored in ('node_modules', '.git'):
+        path = os.path.join(project_dir, ignored, 'pkg')
+        os.makedirs(path)
+        open(os.path.join(path, 'index.js'), 'w').close()
+
+def legacy_scan_project(project_dir):
+    """The previous scan: os.walk, and every indicator tested against every file path."""
+    file_extensions = Counter()
+    technologies = Counter()
+    directories = []
+    framework_indicators = defaultdict(int)
+    
+    for root, dirs, files in os.walk(project_dir):
+        dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['node_modules', 'venv', 'env', '__pycache__', 'dist', 'build']]
+        
+        for file in files:
+            if file.startswith('.'):
+                continue
+            
+            file_path = os.path.join(root, file)
+            _, ext = os.path.splitext(file.lower())
+            file_extensions[ext] += 1
+            if ext in TECH_MAPPING:
+                technologies[TECH_MAPPING[ext]] += 1
+            
+            for framework, indicators in FRAMEWORK_INDICATORS.items():
+                for indicator in indicators:
+                    if indicator in file.lower() or indicator in file_path.lower():
+                        framework_indicators[framework] += 1
+            
+            if file.lower() in MANIFEST_FILES:
+                inspect_manifest(file.lower(), file_path, technologies)
+        
+        if files:
+            rel_path = os.path.relpath(root, project_dir)
+            if rel_path != '.':
+                directories.append(rel_path)
+    
+    frameworks = [framework for framework, count in framework_indicators.items() if count > 0]
+    return {
+        'file_extensions': file_extensions,
+        'technologies': technologies,
+        'top_technologies': [tech for tech, _ in technologies.most_common(10)],
+        'frameworks': frameworks,
+        'directories': directories
+    }
+
+def read_directories(project_dir):
+    """Read every directory the scan reads, and nothing else."""
+    stack = [project_dir]
+    while stack:
+        with os.scandir(stack.pop()) as scanner:
+            for entry in scanner:
+                if entry.is_dir() and not entry.name.startswith('.') and entry.name not in project_analyzer.IGNORED_DIRS:
+                    stack.append(entry.path)
+
+def time_scan(scan, project_dir, repeat):
+    """Return the best time of a scan implementation and its result."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = scan(project_dir)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the project analyzer scan.')
+    parser.add_argument('--files', type=int, default=500000, help='Number of files in the synthetic tree')
+    parser.add_argument('--files-per-dir', type=int, default=50, help='Number of files per directory')
+    parser.add_argument('--repeat', type=int, default=1, help='Number of timed runs per implementation; the best run is reported')
+    args = parser.parse_args()
+
+    project_analyzer.logger.setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        project_dir = os.path.join(temp_dir, 'project')
+        print(f"Generating {args.files} files, {args.files_per_dir} per directory...")
+        generate_tree(project_dir, args.files, args.files_per_dir)
+
+        # Warm the directory cache so that both scans read from memory
+        scan_project(project_dir)
+
+        legacy_time, legacy_result = time_scan(legacy_scan_project, project_dir, args.repeat)
+        scan_time, result = time_scan(scan_project, project_dir, args.repeat)
+        read_time, _ = time_scan(read_directories, project_dir, args.repeat)
+
+        print(f"\n{'Implementation':<16} {'Time (s)':>10} {'Files/s':>12}")
+        print(f"{'previous':<16} {legacy_time:>10.2f} {args.files / legacy_time:>12,.0f}")
+        print(f"{'scandir':<16} {scan_time:>10.2f} {args.files / scan_time:>12,.0f}")
+        print(f"{'directory read':<16} {read_time:>10.2f} {args.files / read_time:>12,.0f}")
+        print(f"\nSpeedup: {legacy_time / scan_time:.1f}x (directory reads alone: {legacy_time / read_time:.1f}x)")
+        print(f"Frameworks: {', '.join(result['frameworks'])}")
+
+        if result != legacy_result:
+            print("Results differ from the previous implementation")
+            return False
+        print("Results match the previous implementation")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Changelog Archive Script
+
+This script keeps the Changelog sections of work units (and documentation files) small by moving
+old entries to a per-file archive in a `changelogs` directory next to the file, e.g.
+`work_units/changelogs/WU-013.changelog.md`, optionally gzip-compressed. A pointer to the archive is
+left in the Changelog section where the archived entries were. Archives are append-only and hold the moved entries
+oldest first; the history query streams the archive followed by the live entries.
+
+An entry is archived when it is older than the maximum age, or when it is not among the newest
+entries allowed by the maximum entry count. Entry age is taken from the entry date; entries with
+the same date keep the order of the file, which may list entries newest or oldest first.
+
+Scripts that prepend changelog entries call rotate_if_needed after writing, which rotates only
+once the section has grown ROTATION_SLACK entries past the limit, so archives grow in batches.
+
+Usage:
+    python changelog_archive.py --work-unit WU_ID [--history] [--max-entries N] [--max-age DAYS] [--gzip]
+    python changelog_archive.py --file PATH [--history]
+    python changelog_archive.py --all [--max-entries N] [--max-age DAYS] [--gzip]
+
+Options:
+    --work-unit WU_ID   Rotate (or query) the changelog of a work unit
+    --file PATH         Rotate (or query) the changelog of any markdown file
+    --all               Rotate the changelogs of all work units
+    --history           Print the full changelog history, oldest first, instead of rotating
+    --max-entries N     Number of newest entries kept in the file (0 disables the limit)
+    --max-age DAYS      Archive entries older than this many days (0 disables the limit)
+    --gzip              Compress new archives with gzip
+"""
+
+import os
+import re
+import sys
+import gzip
+import argparse
+import logging
+from datetime import datetime, timedelta
+
+# Import the work unit parser and the shared write layer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from work_unit_parser import parse_work_unit_bytes, splice
+from work_unit_index import find_work_unit_file, is_work_unit_file
+from file_store import file_lock, read_file, write_atomic
+
+# Constants
+WORK_UNITS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "work_units")
+ARCHIVE_DIR_NAME = "changelogs"
+ARCHIVE_SUFFIX = ".changelog.md"
+
+# Default rotation policy
+MAX_ENTRIES = 50
+MAX_AGE_DAYS = 0
+COMPRESS = False
+
+# Automatic rotation waits until this many entries beyond the limit have accumulated
+ROTATION_SLACK = 10
+
+DATE_FORMATS = ('%Y-%m-%d %H:%M', '%Y-%m-%d')
+POINTER_PATTERN = re.compile(rb'^_Older entries are archived in .*$', re.MULTILINE)
+
+logger = logging.getLogger('changelog_archive')
+
+def _entry_date(entry):
+    """Parse the date of a changelog entry, returning None if it is not a known date format."""
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(entry.date.strip(), date_format)
+        except ValueError:
+            continue
+    return None
+
+def _archive_name(doc):
+    """Return the archive file name of a document: its work unit ID when that identifies it, else its file stem."""
+    stem = os.path.splitext(os.path.basename(doc.path))[0]
+    work_unit_id = doc.get('ID')
+    if work_unit_id and re.fullmatch(r'[\w.-]+', work_unit_id):
+        # Work units that share an ID (e.g. two WU-008 files) cannot share an archive
+        owner = find_work_unit_file(work_unit_id)
+        if owner is None or os.path.realpath(owner) == os.path.realpath(doc.path):
+            return work_unit_id + ARCHIVE_SUFFIX
+    return stem + ARCHIVE_SUFFIX
+
+def archive_path(doc, compress=None):
+    """Return the archive path of a document; an existing archive is used whatever the compression setting."""
+    directory = os.path.join(os.path.dirname(os.path.abspath(doc.path)), ARCHIVE_DIR_NAME)
+    plain_path = os.path.join(directory, _archive_name(doc))
+    if os.path.exists(plain_path):
+        return plain_path
+    if os.path.exists(plain_path + '.gz'):
+        return plain_path + '.gz'
+    return plain_path + '.gz' if (COMPRESS if compress is None else compress) else plain_path
+
+def _newest_first(doc):
+    """Check whether a changelog lists its newest entry first.
+
+    Files written by the update scripts do; some older files list the newest entry last. When the
+    dates do not tell, the archive pointer does: it sits where the older entries used to be.
+    """
+    dates = [date for date in (_entry_date(entry) for entry in doc.changelog) if date is not None]
+    if dates and dates[0] != dates[-1]:
+        return dates[0] > dates[-1]
+    section = doc.changelog_section
+    pointer = POINTER_PATTERN.search(doc.data, section.body_start, section.end) if section else None
+    return not (pointer and doc.changelog and pointer.start() < doc.changelog[0].start)
+
+def _recency_order(entries, newest_first):
+    """Return the entries sorted from newest to oldest."""
+    ranked = []
+    for index, entry in enumerate(entries):
+        position = -index if newest_first else index
+        ranked.append(((_entry_date(entry) or datetime.min, position), entry))
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    return [entry for _, entry in ranked]
+
+def select_archived_entries(doc, max_entries=MAX_ENTRIES, max_age_days=MAX_AGE_DAYS, now=None):
+    """Return the changelog entries of a document that the rotation policy moves to the archive."""
+    ordered = _recency_order(doc.changelog, _newest_first(doc))
+    archived = set()
+    if max_entries:
+        archived.update(id(entry) for entry in ordered[max_entries:])
+    if max_age_days:
+        cutoff = (now or datetime.now()) - timedelta(days=max_age_days)
+        for entry in ordered:
+            date = _entry_date(entry)
+            if date is not None and date < cutoff:
+                archived.add(id(entry))
+    return [entry for entry in doc.changelog if id(entry) in archived]
+
+def _entry_removal_edit(doc, entry):
+    """Return the edit that removes an entry, together with a blank line separating it from the next entry."""
+    end = entry.end
+    following = doc.data[end:]
+    blank = re.match(rb'[ \t]*\r?\n', following)
+    if blank and re.match(rb'-\s*\*\*', following[blank.end():]):
+        end += blank.end()
+    return (entry.start, end, b'')
+
+def _pointer_line(doc, path):
+    """Return the pointer line left in the Changelog section."""
+    relative = os.path.relpath(path, os.path.dirname(os.path.abspath(doc.path))).replace(os.sep, '/')
+    return f"_Older entries are archived in [{os.path.basename(path)}]({relative})._"
+
+def _append_to_archive(doc, path, entries, newest_first):
+    """Append entries, oldest first, to a (possibly compressed) archive file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    chunks = []
+    if not os.path.exists(path):
+        source = os.path.relpath(doc.path, os.path.dirname(path)).replace(os.sep, '/')
+        title = os.path.basename(path).split('.')[0]
+        chunks.append(f"# Changelog Archive: {title}\n\n"
+                      f"Entries moved out of [{os.path.basename(doc.path)}]({source}), oldest first.\n\n".encode('utf-8'))
+    for entry in reversed(_recency_order(entries, newest_first)):
+        chunks.append(doc.data[entry.start:entry.end].rstrip() + b'\n')
+    data = b''.join(chunks)
+
+    # Gzip archives are appended as additional members, which readers see as one stream
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'ab') as f:
+        f.write(data)
+
+def rotate_changelog(file_path, max_entries=MAX_ENTRIES, max_age_days=MAX_AGE_DAYS, compress=None, slack=0):
+    """Move old changelog entries of a file to its archive.
+
+    Rotation only happens once more than `slack` entries are due. Returns the number of archived entries.
+    The file's lock is held throughout, so no concurrent update of the file can be lost or archived twice.
+    """
+    with file_lock(file_path):
+        data = read_file(file_path)
+        if data is None:
+            logger.error(f"File not found: {file_path}")
+            return 0
+        doc = parse_work_unit_bytes(data, file_path)
+        if doc.changelog_section is None:
+            return 0
+
+        archived = select_archived_entries(doc, max_entries, max_age_days)
+        if not archived or len(archived) <= slack:
+            return 0
+
+        newest_first = _newest_first(doc)
+        path = archive_path(doc, compress)
+        _append_to_archive(doc, path, archived, newest_first)
+
+        # Leave a pointer where the older entries were: after the kept entries, or before them
+        # when the file lists its newest entry last
+        edits = [_entry_removal_edit(doc, entry) for entry in archived]
+        section = doc.changelog_section
+        if not POINTER_PATTERN.search(data, section.body_start, section.end):
+            archived_ids = {id(entry) for entry in archived}
+            kept = [entry for entry in doc.changelog if id(entry) not in archived_ids]
+            pointer = _pointer_line(doc, path)
+            if not kept:
+                edits.append((section.body_start, section.body_start, f"\n{pointer}\n"))
+            elif newest_first:
+                position = max(entry.end for entry in kept)
+                prefix = '\n' if data[:position].endswith(b'\n') else '\n\n'
+                edits.append((position, position, f"{prefix}{pointer}\n"))
+            else:
+                position = min(entry.start for entry in kept)
+                edits.append((position, position, f"{pointer}\n\n"))
+
+        write_atomic(file_path, splice(data, edits))
+
+    logger.info(f"Archived {len(archived)} changelog entries of {file_path} to {path}")
+    return len(archived)
+
+def rotate_if_needed(file_path):
+    """Rotate a changelog with the default policy once enough entries are due; used after prepending entries."""
+    try:
+        return rotate_changelog(file_path, slack=ROTATION_SLACK)
+    except OSError as e:
+        logger.warning(f"Could not rotate the changelog of {file_path}: {e}")
+        return 0
+
+def iter_history(file_path):
+    """Yield the full changelog history of a file, oldest first, one line at a time.
+
+    Archived entries are streamed from the archive without loading it; the live entries follow.
+    """
+    data = read_file(file_path)
+    if data is None:
+        logger.error(f"File not found: {file_path}")
+        return
+    doc = parse_work_unit_bytes(data, file_path)
+    path = archive_path(doc)
+    if os.path.exists(path):
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            in_entries = False
+            for line in f:
+                # Skip the archive header (and the header of any later gzip member)
+                if line.startswith('- **'):
+                    in_entries = True
+                elif line.startswith('# ') or not line.strip():
+                    in_entries = False
+                if in_entries:
+                    yield line.rstrip('\n')
+
+    for entry in reversed(_recency_order(doc.changelog, _newest_first(doc))):
+        for line in doc.data[entry.start:entry.end].decode('utf-8').rstrip().split('\n'):
+            yield line
+
+def main():
+    parser = argparse.ArgumentParser(description='Rotate and query work unit changelogs.')
+    parser.add_argument('--work-unit', help='Rotate (or query) the changelog of a work unit')
+    parser.add_argument('--file', help='Rotate (or query) the changelog of any markdown file')
+    parser.add_argument('--all', action='store_true', help='Rotate the changelogs of all work units')
+    parser.add_argument('--history', action='store_true', help='Print the full changelog history, oldest first')
+    parser.add_argument('--max-entries', type=int, default=MAX_ENTRIES, help='Number of newest entries kept in the file (0 disables the limit)')
+    parser.add_argument('--max-age', type=int, default=MAX_AGE_DAYS, help='Archive entries older than this many days (0 disables the limit)')
+    parser.add_argument('--gzip', action='store_true', help='Compress new archives with gzip')
+    args = parser.parse_args()
+
+    if args.all:
+        file_paths = [os.path.join(WORK_UNITS_DIR, filename)
+                      for filename in sorted(os.listdir(WORK_UNITS_DIR)) if is_work_unit_file(filename)]
+    elif args.work_unit:
+        file_path = find_work_unit_file(args.work_unit)
+        if not file_path:
+            print(f"Work unit {args.work_unit} not found")
+            return False
+        file_paths = [file_path]
+    elif args.file:
+        file_paths = [args.file]
+    else:
+        parser.print_help()
+        return False
+
+    if args.history:
+        for file_path in file_paths:
+            for line in iter_history(file_path):
+                print(line)
+        return True
+
+    total = 0
+    for file_path in file_paths:
+        total += rotate_changelog(file_path, args.max_entries, args.max_age, args.gzip or None)
+    print(f"Archived {total} changelog entries from {len(file_paths)} file(s)")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
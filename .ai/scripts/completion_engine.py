@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Completion Engine
+
+This module recalculates the completion percentages of a work unit in a single walk over its
+parsed task tree: every task's percentage is derived from its subtask markers, the overall
+percentage is the average over all tasks, and the file is written back at most once.
+
+Task completion rules:
+- Completed subtasks count as 100%, in-progress subtasks as 50%
+- A task marked "In Progress" whose subtasks are all unstarted gets a minimum of 10%
+- A task marked "Not Started" is always 0%
+- A task without tracked subtasks keeps its recorded percentage
+
+A task is tracked once one of its subtasks carries a status marker ([✓] or [~]) or an inline
+implementation verb; plain [x]/[ ] checklists are maintained by hand and are left alone.
+
+Usage:
+    python completion_engine.py FILE [--dry-run]
+
+Arguments:
+    FILE        Path of the work unit file to recalculate
+
+Options:
+    --dry-run   Print the calculated percentages without writing the file
+"""
+
+import os
+import sys
+import argparse
+import logging
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from work_unit_parser import (parse_work_unit_bytes, splice, field_value_edit, subtask_marker_edit,
+                              COMPLETED, IN_PROGRESS)
+from file_store import read_file, update_file
+
+# Markers that legacy implementation-verb subtasks are normalized to
+STATE_MARKERS = {COMPLETED: '[✓]', IN_PROGRESS: '[~]'}
+DEFAULT_MARKER = '[ ]'
+
+# Markers only the status tracker writes; a task using them has tracked subtasks
+TRACKER_MARKERS = {'[✓]', '[~]'}
+
+# Minimum completion for an in-progress task whose subtasks have not been started
+IN_PROGRESS_MINIMUM = 10
+
+logger = logging.getLogger('completion_engine')
+
+def _parse_percentage(value):
+    """Parse a `NN%` completion value, returning 0 when it is missing or malformed."""
+    try:
+        return int((value or '').strip().rstrip('%'))
+    except ValueError:
+        return 0
+
+def _has_inline_verb(subtask):
+    """Whether the subtask's own item (or legacy verb sibling) carries an implementation verb."""
+    return bool(subtask.verb) and subtask.reference is not None
+
+def is_tracked(task):
+    """Whether the task's completion is derived from its subtasks rather than recorded by hand."""
+    return any(subtask.marker in TRACKER_MARKERS or _has_inline_verb(subtask) for subtask in task.subtasks)
+
+def task_completion(task):
+    """Calculate the completion percentage of a single task from its subtasks.
+
+    Returns a dict with the percentage and the subtask counts it was derived from.
+    """
+    status = (task.get('Status') or 'Not Started').strip()
+    subtasks = [subtask for subtask in task.subtasks if subtask.state is not None] if is_tracked(task) else []
+    completed = sum(1 for subtask in subtasks if subtask.state == COMPLETED)
+    in_progress = sum(1 for subtask in subtasks if subtask.state == IN_PROGRESS)
+
+    if status == 'Not Started':
+        completion = 0
+    elif subtasks:
+        completion = int((completed * 100 + in_progress * 50) / len(subtasks))
+        if status == 'In Progress' and completion == 0:
+            completion = IN_PROGRESS_MINIMUM
+    else:
+        completion = _parse_percentage(task.get('Completion'))
+
+    return {
+        'task_id': task.task_id,
+        'status': status,
+        'completion': completion,
+        'completed': completed,
+        'in_progress': in_progress,
+        'total': len(subtasks)
+    }
+
+def calculate_completion(doc):
+    """Walk the task tree of a parsed work unit once and calculate every percentage.
+
+    Returns a dict with the per-task results, the overall percentage and the byte-range edits
+    that bring the file in line with them.
+    """
+    tasks = []
+    edits = []
+    for task in doc.tasks:
+        completion_field = task.fields.get('Completion')
+        if completion_field is None:
+            continue
+
+        result = task_completion(task)
+        tasks.append(result)
+        logger.debug(f"Calculated completion for task {task.task_id}: {result['completion']}% "
+                     f"({result['completed']} completed, {result['in_progress']} in progress, {result['total']} total)")
+
+        if completion_field.value != f"{result['completion']}%":
+            edits.append(field_value_edit(completion_field, f"{result['completion']}%"))
+
+        # Normalize legacy implementation verbs to status markers; items without a marker or an
+        # inline verb (notes, nested-verb captions) are left untouched
+        for subtask in task.subtasks:
+            if _has_inline_verb(subtask) and subtask.state is not None:
+                edits.append(subtask_marker_edit(subtask, STATE_MARKERS.get(subtask.state, DEFAULT_MARKER)))
+
+    overall = sum(result['completion'] for result in tasks) // len(tasks) if tasks else 0
+    overall_field = doc.metadata.get('Completion')
+    if overall_field is not None and overall_field.value != f"{overall}%":
+        edits.append(field_value_edit(overall_field, f"{overall}%"))
+
+    return {
+        'tasks': tasks,
+        'overall': overall,
+        'has_overall': overall_field is not None,
+        'edits': edits
+    }
+
+def update_completion(work_unit_file, dry_run=False):
+    """Recalculate and write back the task and overall completion of a work unit file.
+
+    Returns the calculation result, or None if the file is missing, has no tasks or has no overall
+    Completion field.
+    """
+    if not os.path.exists(work_unit_file):
+        logger.error(f"Work unit file {work_unit_file} not found")
+        return None
+
+    outcome = {}
+
+    def recalculate(data):
+        result = calculate_completion(parse_work_unit_bytes(data, work_unit_file))
+        outcome['result'] = result
+        if dry_run or not result['tasks'] or not result['has_overall'] or not result['edits']:
+            return None
+        return splice(data, result['edits'])
+
+    if dry_run:
+        recalculate(read_file(work_unit_file))
+    else:
+        update_file(work_unit_file, recalculate)
+    result = outcome['result']
+
+    if not result['tasks']:
+        logger.warning(f"No task sections found in work unit {work_unit_file}")
+        return None
+    if not result['has_overall']:
+        logger.error(f"Could not find overall completion in metadata of work unit {work_unit_file}")
+        return None
+
+    result['changed'] = bool(result['edits'])
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='Recalculate work unit completion percentages.')
+    parser.add_argument('file', help='Path of the work unit file to recalculate')
+    parser.add_argument('--dry-run', action='store_true', help='Print the calculated percentages without writing the file')
+    args = parser.parse_args()
+
+    result = update_completion(args.file, args.dry_run)
+    if result is None:
+        return False
+
+    for task in result['tasks']:
+        print(f"{task['task_id']}: {task['completion']}% ({task['completed']}/{task['total']} completed, "
+              f"{task['in_progress']} in progress)")
+    print(f"Overall: {result['overall']}%")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
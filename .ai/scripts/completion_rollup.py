@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Completion Rollup Script
+
+This script derives the completion of parent work units from their sub-units (e.g. WU-013 from
+WU-013-01). The rolled-up completion of a unit is the weighted average of its own completion
+(the percentage calculated from its tasks) and the rolled-up completion of each of its children:
+
+    rolled-up = (own weight * own + sum(child weight * child rolled-up)) / (own weight + sum(child weights))
+
+A child's weight comes from a `Rollup Weight` field in its metadata (DEFAULT_CHILD_WEIGHT when
+absent); the weight of a unit's own tasks is OWN_WEIGHT. The result is written to a
+`Rolled-up Completion` field after the Completion field of each parent; the Completion field
+itself stays the completion of the unit's own tasks.
+
+Results are memoized by a key made of the content hashes of a unit's files, the weights and the
+keys of its children, so a changed sub-unit only invalidates its chain of ancestors: the rollups
+of its siblings and of unrelated branches are reused, from memory and across runs from a cache
+file in the cache directory.
+
+Usage:
+    python completion_rollup.py [--work-unit WU_ID] [--write] [--own-weight WEIGHT] [--json]
+
+Options:
+    --work-unit WU_ID    Roll up a single work unit (and, with --write, update its ancestors)
+    --write              Write the Rolled-up Completion fields of the parent work units
+    --own-weight WEIGHT  Weight of a parent's own tasks relative to a child of weight 1
+    --json               Print the rollups as JSON
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import logging
+
+# Import the dependency graph and the shared write layer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from dependency_graph import DependencyGraph
+from work_unit_index import list_work_units, WORK_UNITS_DIR
+from work_unit_parser import parse_work_unit_bytes, set_field_edit, apply_edits
+from file_store import update_file, write_text_file
+
+# Constants
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")
+MEMO_FILE = os.path.join(CACHE_DIR, "completion_rollup.json")
+MEMO_VERSION = 1
+
+# Memoized rollups kept across runs, besides those of the current hierarchy
+MAX_MEMO_ENTRIES = 10000
+
+# Default weights
+OWN_WEIGHT = 1.0
+DEFAULT_CHILD_WEIGHT = 1.0
+
+ROLLUP_FIELD = 'Rolled-up Completion'
+
+logger = logging.getLogger('completion_rollup')
+
+def _parse_weight(value):
+    """Parse a Rollup Weight field, falling back to the default weight when it is missing or malformed."""
+    try:
+        weight = float(str(value).strip())
+    except (TypeError, ValueError):
+        return DEFAULT_CHILD_WEIGHT
+    return weight if weight >= 0 else DEFAULT_CHILD_WEIGHT
+
+class CompletionRollup:
+    """Memoized rollup of completion over the work unit hierarchy."""
+
+    def __init__(self, own_weight=OWN_WEIGHT, graph=None):
+        self.own_weight = own_weight
+        self.graph = graph or DependencyGraph()
+        self._weights = {}
+        # Rollup keys of the units computed since their last change, and the results by key
+        self._keys = {}
+        self._memo = {}
+        self._memo_changed = False
+
+    def sync(self, jobs=1):
+        """Bring the hierarchy up to date with the index and invalidate the ancestors of changed units.
+
+        Returns the IDs of the units whose files changed.
+        """
+        work_units = list_work_units(jobs)
+        changed = self.graph.apply(work_units)
+        for work_unit in work_units:
+            if work_unit['id'] in changed:
+                self._weights[work_unit['id']] = _parse_weight(work_unit.get('rollup_weight'))
+        for wu_id in changed:
+            self.invalidate(wu_id)
+        return changed
+
+    def invalidate(self, wu_id):
+        """Forget the rollup keys of a unit and its ancestors; every other unit keeps its key."""
+        self._keys.pop(wu_id, None)
+        for ancestor in self.graph.ancestors(wu_id):
+            self._keys.pop(ancestor, None)
+
+    def weight(self, wu_id):
+        """Return the weight of a unit in the rollup of its parents."""
+        return self._weights.get(wu_id, DEFAULT_CHILD_WEIGHT)
+
+    def _key(self, wu_id, visiting):
+        """Return the rollup key of a unit, computing (or recalling) its rollup on the way."""
+        key = self._keys.get(wu_id)
+        if key is not None:
+            return key
+
+        visiting = visiting | {wu_id}
+        # A hierarchy cycle is cut where it closes
+        children = [child for child in self.graph.children(wu_id) if child not in visiting]
+        child_keys = [(child, self.weight(child), self._key(child, visiting)) for child in children]
+        material = json.dumps([wu_id, self.graph.content_hashes(wu_id), self.own_weight,
+                               [[weight, child_key] for _, weight, child_key in child_keys]])
+        key = hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+        if key not in self._memo:
+            own = self.graph.completion(wu_id)
+            total_weight = self.own_weight + sum(weight for _, weight, _ in child_keys)
+            if total_weight > 0:
+                weighted = self.own_weight * own + sum(weight * self._memo[child_key]['completion']
+                                                       for _, weight, child_key in child_keys)
+                completion = int(weighted / total_weight)
+            else:
+                completion = own
+            self._memo[key] = {'completion': completion, 'own': own}
+            self._memo_changed = True
+
+        self._keys[wu_id] = key
+        return key
+
+    def rollup(self, wu_id):
+        """Return the rollup of a unit as a dict with its own and rolled-up completion and its children."""
+        entry = self._memo[self._key(wu_id, frozenset())]
+        return {
+            'id': wu_id,
+            'own': entry['own'],
+            'completion': entry['completion'],
+            'children': [{'id': child, 'weight': self.weight(child), 'completion': self.rollup(child)['completion']}
+                         for child in self.graph.children(wu_id)]
+        }
+
+    def parents(self):
+        """Return the IDs of the units that have sub-units."""
+        return [wu_id for wu_id in self.graph.units() if self.graph.children(wu_id)]
+
+    def load_memo(self):
+        """Load memoized rollups from earlier runs."""
+        try:
+            with open(MEMO_FILE, 'r', encoding='utf-8') as f:
+                memo = json.load(f)
+        except (OSError, ValueError):
+            return
+        if memo.get('version') == MEMO_VERSION:
+            self._memo.update(memo.get('entries', {}))
+
+    def save_memo(self):
+        """Save the memoized rollups for the next run, the most recent ones when there are too many."""
+        if not self._memo_changed:
+            return
+        live = set(self._keys.values())
+        stale = [key for key in self._memo if key not in live]
+        kept = set(stale[-MAX_MEMO_ENTRIES:]) | live
+        entries = {key: value for key, value in self._memo.items() if key in kept}
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        write_text_file(MEMO_FILE, json.dumps({'version': MEMO_VERSION, 'entries': entries}, indent=2))
+        self._memo_changed = False
+
+def write_rollup(engine, wu_id):
+    """Write the Rolled-up Completion field of a parent unit. Returns True if a file changed."""
+    value = f"{engine.rollup(wu_id)['completion']}%"
+    changed = False
+    for filename in engine.graph.files(wu_id):
+        file_path = os.path.join(WORK_UNITS_DIR, filename)
+        outcome = {}
+
+        def set_rollup(data):
+            doc = parse_work_unit_bytes(data, file_path)
+            edit = set_field_edit(doc, ROLLUP_FIELD, value, after='Completion')
+            if edit is None:
+                return None
+            new_data = apply_edits(doc, [edit])
+            outcome['changed'] = new_data != data
+            return new_data
+
+        update_file(file_path, set_rollup)
+        changed = changed or outcome.get('changed', False)
+    if changed:
+        logger.info(f"Rolled-up completion of {wu_id}: {value}")
+    return changed
+
+def update_ancestor_rollups(work_unit_ids, own_weight=OWN_WEIGHT):
+    """Recompute and write the rolled-up completion of some changed work units and their ancestors.
+
+    Only units that have sub-units carry a rollup. Returns the IDs of the units that were rolled up.
+    """
+    engine = CompletionRollup(own_weight)
+    engine.load_memo()
+    engine.sync()
+    parents = []
+    for work_unit_id in work_unit_ids:
+        for wu_id in [work_unit_id] + engine.graph.ancestors(work_unit_id):
+            if wu_id not in parents and engine.graph.children(wu_id):
+                parents.append(wu_id)
+    for wu_id in parents:
+        write_rollup(engine, wu_id)
+    engine.save_memo()
+    return parents
+
+def main():
+    parser = argparse.ArgumentParser(description='Roll up work unit completion from sub-units to parents.')
+    parser.add_argument('--work-unit', help='Roll up a single work unit (and, with --write, update its ancestors)')
+    parser.add_argument('--write', action='store_true', help='Write the Rolled-up Completion fields of the parent work units')
+    parser.add_argument('--own-weight', type=float, default=OWN_WEIGHT, help="Weight of a parent's own tasks relative to a child of weight 1")
+    parser.add_argument('--json', action='store_true', help='Print the rollups as JSON')
+    args = parser.parse_args()
+
+    if args.own_weight < 0:
+        print("--own-weight must not be negative")
+        return False
+
+    engine = CompletionRollup(args.own_weight)
+    engine.load_memo()
+    engine.sync()
+
+    if args.work_unit:
+        if args.work_unit not in engine.graph.units():
+            print(f"Work unit {args.work_unit} not found")
+            return False
+        targets = [args.work_unit]
+        if args.write:
+            targets += engine.graph.ancestors(args.work_unit)
+    else:
+        targets = engine.parents()
+
+    rollups = [engine.rollup(wu_id) for wu_id in targets]
+    if args.write:
+        for rollup in rollups:
+            if rollup['children']:
+                write_rollup(engine, rollup['id'])
+    engine.save_memo()
+
+    if args.json:
+        print(json.dumps(rollups, indent=2))
+        return True
+
+    for rollup in rollups:
+        print(f"{rollup['id']}: {rollup['completion']}% (own tasks: {rollup['own']}%)")
+        for child in rollup['children']:
+            print(f"  {child['id']}: {child['completion']}% (weight {child['weight']:g})")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Dependency Graph Script
+
+This script builds an in-memory graph of the relations between work units from the work unit index:
+
+- depends_on: a unit lists another unit in its Dependencies field
+- parent: a sub-unit belongs to a parent unit (WU-013-01 under WU-013, Parent Unit fields,
+  Parent Work Unit sections and Child Work Unit items of the parent)
+- related: a unit's Relationship Type names another unit ("Related to WU-007")
+
+Dependencies order the units: a dependency comes before its dependent. Parent links form a
+separate hierarchy, since a sub-unit may itself depend on its parent. The graph answers topological
+ordering, cycle detection, transitive prerequisite/dependent queries, ancestor/descendant queries
+and the critical path, weighted by the remaining completion of each unit. Edges are kept per work unit file, so syncing with the index only touches the units
+whose files changed; ordering, cycles and the critical path are computed on demand and cached
+until the next change.
+
+Usage:
+    python dependency_graph.py [--order] [--cycles] [--critical-path] [--prerequisites WU_ID] [--dependents WU_ID] [--json]
+
+Options:
+    --order               Print the work units in dependency order
+    --cycles              Print dependency cycles
+    --critical-path       Print the chain of work units with the most remaining work
+    --prerequisites WU_ID Print every unit that must be finished before a work unit
+    --dependents WU_ID    Print every unit that waits on a work unit
+    --json                Print the results as JSON
+"""
+
+import os
+import sys
+import json
+import heapq
+import argparse
+import logging
+from collections import Counter, defaultdict, deque
+
+# Import the work unit index
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from work_unit_index import list_work_units
+from work_unit_parser import extract_work_unit_ids
+
+# Edge kinds
+DEPENDS_ON = 'depends_on'
+PARENT = 'parent'
+RELATED = 'related'
+
+logger = logging.getLogger('dependency_graph')
+
+def _completion_value(completion):
+    """Return the integer percentage of an indexed completion value."""
+    try:
+        return max(0, min(100, int(str(completion).strip().rstrip('%'))))
+    except ValueError:
+        return 0
+
+def unit_edges(work_unit):
+    """Return the (kind, source, target) edges declared by one indexed work unit.
+
+    The source of a depends_on edge is the dependent unit, the source of a parent edge the sub-unit.
+    A unit that depends on itself keeps that edge, so that it is reported as a cycle.
+    """
+    wu_id = work_unit['id']
+    if not wu_id:
+        return set()
+
+    edges = set()
+    for dependency in extract_work_unit_ids(work_unit.get('dependencies')):
+        edges.add((DEPENDS_ON, wu_id, dependency))
+    for parent in extract_work_unit_ids(work_unit.get('parents')):
+        edges.add((PARENT, wu_id, parent))
+    for child in extract_work_unit_ids(work_unit.get('children')):
+        edges.add((PARENT, child, wu_id))
+    for related in extract_work_unit_ids(work_unit.get('relationship')):
+        edges.add((RELATED, wu_id, related))
+    return {edge for edge in edges if edge[0] == DEPENDS_ON or edge[1] != edge[2]}
+
+class DependencyGraph:
+    """Relations between work units, updated one work unit file at a time."""
+
+    def __init__(self):
+        # filename -> (content hash, work unit ID, completion, declared edges)
+        self._files = {}
+        # Number of files per work unit ID and their completion values
+        self._units = Counter()
+        self._completion = defaultdict(dict)
+        # Declared edges by kind: source -> Counter of targets (counted, since duplicate files may declare the same edge)
+        self._edges = {kind: defaultdict(Counter) for kind in (DEPENDS_ON, PARENT, RELATED)}
+        # Ordering graph: a dependency -> its dependents, and the reverse
+        self._successors = defaultdict(Counter)
+        self._predecessors = defaultdict(Counter)
+        # Hierarchy: a parent -> its sub-units
+        self._children = defaultdict(Counter)
+        self._cache = {}
+
+    @classmethod
+    def from_index(cls, jobs=1):
+        """Build a graph from the (refreshed) work unit index."""
+        graph = cls()
+        graph.sync(jobs)
+        return graph
+
+    def sync(self, jobs=1):
+        """Bring the graph up to date with the index, updating only changed files. Returns the number of changes."""
+        return len(self.apply(list_work_units(jobs)))
+
+    def apply(self, work_units):
+        """Update the graph from a full listing of indexed work units.
+
+        Only added, modified and removed files are touched. Returns the IDs of the units whose files changed.
+        """
+        current = set()
+        changed = set()
+        for work_unit in work_units:
+            current.add(work_unit['path'])
+            known = self._files.get(work_unit['path'])
+            if known is None or known[0] != work_unit['content_hash']:
+                if known is not None and known[1]:
+                    changed.add(known[1])
+                self.update_unit(work_unit)
+                if work_unit['id']:
+                    changed.add(work_unit['id'])
+        for filename in set(self._files) - current:
+            if self._files[filename][1]:
+                changed.add(self._files[filename][1])
+            self.remove_file(filename)
+        return changed
+
+    def update_unit(self, work_unit):
+        """Replace the edges and completion of one work unit file."""
+        self.remove_file(work_unit['path'])
+        wu_id = work_unit['id']
+        edges = unit_edges(work_unit)
+        completion = _completion_value(work_unit.get('completion'))
+        self._files[work_unit['path']] = (work_unit.get('content_hash'), wu_id, completion, edges)
+        if wu_id:
+            self._units[wu_id] += 1
+            self._completion[wu_id][work_unit['path']] = completion
+        for edge in edges:
+            self._change_edge(edge, 1)
+        self._cache.clear()
+
+    def remove_file(self, filename):
+        """Remove the edges and completion of one work unit file."""
+        known = self._files.pop(filename, None)
+        if known is None:
+            return
+        _, wu_id, _, edges = known
+        if wu_id:
+            self._units[wu_id] -= 1
+            if not self._units[wu_id]:
+                del self._units[wu_id]
+            self._completion[wu_id].pop(filename, None)
+            if not self._completion[wu_id]:
+                del self._completion[wu_id]
+        for edge in edges:
+            self._change_edge(edge, -1)
+        self._cache.clear()
+
+    def _change_edge(self, edge, delta):
+        """Add (delta 1) or remove (delta -1) one declared edge."""
+        kind, source, target = edge
+        _adjust(self._edges[kind], source, target, delta)
+        if kind == DEPENDS_ON:
+            _adjust(self._successors, target, source, delta)
+            _adjust(self._predecessors, source, target, delta)
+        elif kind == PARENT:
+            _adjust(self._children, target, source, delta)
+
+    def units(self):
+        """Return the IDs of the work units in the graph."""
+        return sorted(self._units)
+
+    def files(self, wu_id):
+        """Return the work unit files that carry an ID (more than one for duplicated IDs)."""
+        return sorted(self._completion.get(wu_id, ()))
+
+    def content_hashes(self, wu_id):
+        """Return the content hashes of the files of a unit."""
+        return [self._files[filename][0] for filename in self.files(wu_id)]
+
+    def completion(self, wu_id):
+        """Return the completion of a unit (the least complete file counts)."""
+        completions = self._completion.get(wu_id)
+        return min(completions.values()) if completions else 0
+
+    def remaining(self, wu_id):
+        """Return the remaining work of a unit (100 minus its completion)."""
+        return 100 - self.completion(wu_id) if wu_id in self._completion else 0
+
+    def references(self, wu_id):
+        """Return the (kind, source, target) edges declared by the files of a unit."""
+        edges = set()
+        for filename in self._completion.get(wu_id, ()):
+            edges |= self._files[filename][3]
+        return sorted(edges)
+
+    def missing_references(self):
+        """Return the (kind, source, target) edges that reference a work unit that does not exist."""
+        missing = []
+        for kind, edges in self._edges.items():
+            for source, targets in edges.items():
+                for target in targets:
+                    if target not in self._units or source not in self._units:
+                        missing.append((kind, source, target))
+        return sorted(missing)
+
+    def _closure(self, wu_id, adjacency):
+        """Return every unit reachable from a unit over an adjacency map, in breadth-first order."""
+        seen = {wu_id}
+        queue = deque([wu_id])
+        reached = []
+        while queue:
+            for neighbour in sorted(adjacency.get(queue.popleft(), ())):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    reached.append(neighbour)
+                    queue.append(neighbour)
+        return reached
+
+    def prerequisites(self, wu_id):
+        """Return every unit that must come before a unit (its transitive dependencies)."""
+        return self._closure(wu_id, self._predecessors)
+
+    def dependents(self, wu_id):
+        """Return every unit that must come after a unit (its transitive dependents)."""
+        return self._closure(wu_id, self._successors)
+
+    def children(self, wu_id):
+        """Return the direct sub-units of a unit."""
+        return sorted(self._children.get(wu_id, ()))
+
+    def parents(self, wu_id):
+        """Return the direct parents of a unit."""
+        return sorted(self._edges[PARENT].get(wu_id, ()))
+
+    def ancestors(self, wu_id):
+        """Return every unit above a unit in the hierarchy, nearest first."""
+        return self._closure(wu_id, self._edges[PARENT])
+
+    def descendants(self, wu_id):
+        """Return every sub-unit below a unit in the hierarchy, nearest first."""
+        return self._closure(wu_id, self._children)
+
+    def cycles(self):
+        """Return the cycles of the ordering graph as sorted lists of unit IDs (strongly connected components)."""
+        if 'cycles' not in self._cache:
+            self._cache['cycles'] = _strongly_connected(self._successors)
+        return self._cache['cycles']
+
+    def cycle_of(self, wu_id):
+        """Return the cycle a unit is part of, or None."""
+        if 'cycle_members' not in self._cache:
+            self._cache['cycle_members'] = {member: cycle for cycle in self.cycles() for member in cycle}
+        return self._cache['cycle_members'].get(wu_id)
+
+    def topological_order(self):
+        """Return the units in dependency order, ties broken by ID.
+
+        Units on a cycle (see cycles()) are left out; each cycle is treated as a single step, so the
+        units that depend on a cycle are still ordered after everything the cycle depends on.
+        """
+        if 'order' not in self._cache:
+            # Collapse every cycle into one node, keyed by its sorted member tuple
+            def node_of(wu_id):
+                cycle = self.cycle_of(wu_id)
+                return tuple(cycle) if cycle else wu_id
+
+            members = {}
+            for wu_id in self._units:
+                members.setdefault(node_of(wu_id), []).append(wu_id)
+            successors = {node: {node_of(successor) for wu_id in wu_ids for successor in self._successors.get(wu_id, ())
+                                 if successor in self._units} - {node}
+                          for node, wu_ids in members.items()}
+            indegree = dict.fromkeys(members, 0)
+            for targets in successors.values():
+                for target in targets:
+                    indegree[target] += 1
+
+            def sort_key(node):
+                return (node[0] if isinstance(node, tuple) else node, isinstance(node, tuple))
+
+            ready = [(sort_key(node), node) for node, degree in indegree.items() if degree == 0]
+            heapq.heapify(ready)
+            order = []
+            while ready:
+                _, node = heapq.heappop(ready)
+                if not isinstance(node, tuple):
+                    order.append(node)
+                for successor in successors[node]:
+                    indegree[successor] -= 1
+                    if indegree[successor] == 0:
+                        heapq.heappush(ready, (sort_key(successor), successor))
+            self._cache['order'] = order
+        return self._cache['order']
+
+    def critical_path(self):
+        """Return (path, remaining work) of the ordered chain of units with the most remaining work."""
+        if 'critical_path' not in self._cache:
+            best = {}
+            previous = {}
+            for node in self.topological_order():
+                candidates = [(best[p], p) for p in self._predecessors.get(node, ()) if p in best]
+                base, before = max(candidates) if candidates else (0, None)
+                best[node] = base + self.remaining(node)
+                previous[node] = before
+            path = []
+            total = 0
+            if best:
+                node = max(best, key=lambda unit: (best[unit], unit))
+                total = best[node]
+                while node is not None:
+                    path.append(node)
+                    node = previous[node]
+                path.reverse()
+            self._cache['critical_path'] = (path, total)
+        return self._cache['critical_path']
+
+def _adjust(adjacency, source, target, delta):
+    """Change the count of one entry of an adjacency map, dropping it at zero."""
+    targets = adjacency[source]
+    targets[target] += delta
+    if targets[target] <= 0:
+        del targets[target]
+    if not targets:
+        del adjacency[source]
+
+def _strongly_connected(successors):
+    """Return the cycles as strongly connected components (iterative Tarjan).
+
+    A component is a cycle if it has more than one node or its single node depends on itself.
+    """
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+    for root in sorted(successors):
+        if root in index:
+            continue
+        work = [(root, iter(sorted(successors.get(root, ()))))]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, neighbours = work[-1]
+            advanced = False
+            for neighbour in neighbours:
+                if neighbour not in index:
+                    index[neighbour] = lowlink[neighbour] = counter
+                    counter += 1
+                    stack.append(neighbour)
+                    on_stack.add(neighbour)
+                    work.append((neighbour, iter(sorted(successors.get(neighbour, ())))))
+                    advanced = True
+                    break
+                if neighbour in on_stack:
+                    lowlink[node] = min(lowlink[node], index[neighbour])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1 or node in successors.get(node, ()):
+                    components.append(sorted(component))
+    return sorted(components)
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyze the dependency graph of the work units.')
+    parser.add_argument('--order', action='store_true', help='Print the work units in dependency order')
+    parser.add_argument('--cycles', action='store_true', help='Print dependency cycles')
+    parser.add_argument('--critical-path', action='store_true', help='Print the chain of work units with the most remaining work')
+    parser.add_argument('--prerequisites', metavar='WU_ID', help='Print every unit that must be finished before a work unit')
+    parser.add_argument('--dependents', metavar='WU_ID', help='Print every unit that waits on a work unit')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args()
+
+    graph = DependencyGraph.from_index()
+    results = {}
+    if args.order:
+        results['order'] = graph.topological_order()
+    if args.cycles:
+        results['cycles'] = graph.cycles()
+    if args.critical_path:
+        path, total = graph.critical_path()
+        results['critical_path'] = {'path': path, 'remaining': total}
+    if args.prerequisites:
+        results['prerequisites'] = graph.prerequisites(args.prerequisites)
+    if args.dependents:
+        results['dependents'] = graph.dependents(args.dependents)
+    if not results:
+        results['cycles'] = graph.cycles()
+        results['missing_references'] = [list(edge) for edge in graph.missing_references()]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return not graph.cycles()
+
+    for name, value in results.items():
+        print(f"{name.replace('_', ' ').title()}:")
+        if name == 'critical_path':
+            print(f"  {' -> '.join(value['path']) or '(empty)'} ({value['remaining']} percentage points of remaining work)")
+        elif not value:
+            print("  (none)")
+        else:
+            for item in value:
+                print(f"  {' -> '.join(item) if isinstance(item, (list, tuple)) else item}")
+    return not graph.cycles()
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -5,11 +5,22 @@ Documentation Updater Script
 This script updates project documentation based on completed work units.
 It analyzes the changes made in work units and updates relevant documentation files.
 
+Each work unit owns one section per documentation file, delimited by hidden markers keyed by its
+ID and the path of its file (two files may share an ID), so running the update again replaces the
+section in place. Files are only written when the
+rendered content changes; the version they replace is kept in the snapshot store (see
+snapshot_store.py).
+
+Batch runs (--all, --since) group the updates of all selected work units by documentation file
+and apply them in memory, so every file and the README are written (and snapshotted) at most once.
+
 Usage:
-    python documentation_updater.py [--work-unit WU_ID] [--dry-run]
+    python documentation_updater.py [--work-unit WU_ID | --all | --since DATE] [--dry-run]
 
 Options:
     --work-unit WU_ID   Update documentation based on a specific work unit
+    --all               Update documentation based on all work units
+    --since DATE        Update documentation based on work units last updated on or after DATE (YYYY-MM-DD)
     --dry-run           Show changes without applying them
 """
 
@@ -18,16 +29,30 @@ import re
 import sys
 import argparse
 import logging
-import shutil
+import hashlib
 from datetime import datetime
 
+# Import the work unit index for ID lookups
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from work_unit_index import find_work_unit_file, list_work_units
+from work_unit_parser import parse_work_unit
+from file_store import read_file, update_text_file
+from changelog_archive import rotate_if_needed
+from snapshot_store import save_snapshot
+from template_engine import get_template
+
 # Constants
 WORK_UNITS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "work_units")
 CORE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "_core")
 DOCS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "docs")
+README_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "README.md")
 LOGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs")
 os.makedirs(LOGS_DIR, exist_ok=True)
 
+# Hidden markers around the documentation section of each work unit
+SECTION_MARKER = "atavya-section"
+SECTION_HASH_LENGTH = 16
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -40,57 +65,90 @@ logging.basicConfig(
 
 logger = logging.getLogger('documentation_updater')
 
-def find_work_unit_file(work_unit_id):
-    """Find the file path for a work unit by its ID."""
-    for filename in os.listdir(WORK_UNITS_DIR):
-        if filename.endswith('.md') and filename != 'registry.md' and filename != 'project_tracker.md':
-            file_path = os.path.join(WORK_UNITS_DIR, filename)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                id_match = re.search(r'^\s*-\s*\*\*ID\*\*:\s*([^\n]+)', content, re.MULTILINE)
-                if id_match and id_match.group(1).strip() == work_unit_id:
-                    return file_path
-    return None
-
 def extract_work_unit_info(file_path):
     """Extract relevant information from a work unit file."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Extract basic metadata
-    id_match = re.search(r'^\s*-\s*\*\*ID\*\*:\s*([^\n]+)', content, re.MULTILINE)
-    title_match = re.search(r'^#\s+Work Unit:\s+([^\n]+)', content, re.MULTILINE)
-    description_match = re.search(r'^\s*-\s*\*\*Description\*\*:\s*([^\n]+)', content, re.MULTILINE)
-    type_match = re.search(r'^\s*-\s*\*\*Type\*\*:\s*([^\n]+)', content, re.MULTILINE)
-    
-    # Extract sections
-    description_section = re.search(r'^## Description\s*\n(.*?)^##', content, re.MULTILINE | re.DOTALL)
-    objectives_section = re.search(r'^## Objectives\s*\n(.*?)^##', content, re.MULTILINE | re.DOTALL)
-    requirements_section = re.search(r'^## Requirements\s*\n(.*?)^##', content, re.MULTILINE | re.DOTALL)
+    doc = parse_work_unit(file_path)
     
     # Extract components affected
-    components_section = re.search(r'^## Related Components\s*\n(.*?)^##', content, re.MULTILINE | re.DOTALL)
     components = []
-    if components_section:
-        component_lines = components_section.group(1).strip().split('\n')
-        for line in component_lines:
+    components_text = doc.section_text('Related Components')
+    if components_text:
+        for line in components_text.split('\n'):
             if line.strip().startswith('- '):
                 components.append(line.strip()[2:])
     
     return {
-        'id': id_match.group(1).strip() if id_match else None,
-        'title': title_match.group(1).strip() if title_match else os.path.basename(file_path),
-        'description': description_match.group(1).strip() if description_match else None,
-        'type': type_match.group(1).strip() if type_match else None,
-        'description_text': description_section.group(1).strip() if description_section else None,
-        'objectives': objectives_section.group(1).strip() if objectives_section else None,
-        'requirements': requirements_section.group(1).strip() if requirements_section else None,
+        'id': doc.get('ID'),
+        'title': doc.title or os.path.basename(file_path),
+        'description': doc.get('Description'),
+        'type': doc.get('Type'),
+        'description_text': doc.section_text('Description'),
+        'objectives': doc.section_text('Objectives'),
+        'requirements': doc.section_text('Requirements'),
         'components': components,
         'file_path': file_path
     }
 
-def update_component_documentation(component_name, work_unit_info, dry_run=False):
-    """Update documentation for a specific component based on work unit info."""
+def section_hash(body):
+    """Return the short content hash stored in a section marker."""
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()[:SECTION_HASH_LENGTH]
+
+def section_key(work_unit_info):
+    """Return the marker key of a work unit's sections: its ID and its file path relative to work_units."""
+    relative = os.path.relpath(work_unit_info['file_path'], WORK_UNITS_DIR).replace(os.sep, '/')
+    return f"{work_unit_info['id']} {relative}"
+
+def _find_section(content, key):
+    return re.search(rf'<!-- {SECTION_MARKER} {re.escape(key)} (\w+) -->\n.*?<!-- /{SECTION_MARKER} {re.escape(key)} -->\n?',
+                     content, re.DOTALL)
+
+def upsert_section(content, heading, key, body, legacy_key=None):
+    """Insert or replace the section of a work unit under a `## heading`.
+
+    Sections are wrapped in hidden markers keyed by the work unit (see section_key), e.g.
+    `<!-- atavya-section WU-013 WU-013_atavya_side_panel.md 3f2a... -->` ...
+    `<!-- /atavya-section WU-013 WU-013_atavya_side_panel.md -->`, which also record the hash of the
+    rendered section. An existing section is replaced in place, wherever it is in the file, and left
+    untouched when its hash is unchanged; a section with the older legacy_key marker (the bare ID) is
+    taken over. A new section is inserted at the top of the heading's section, creating the heading
+    if needed.
+    """
+    digest = section_hash(body)
+    block = f"<!-- {SECTION_MARKER} {key} {digest} -->\n{body}<!-- /{SECTION_MARKER} {key} -->\n"
+    existing = _find_section(content, key)
+    if existing:
+        if existing.group(1) == digest:
+            return content
+        return content[:existing.start()] + block + content[existing.end():]
+    existing = _find_section(content, legacy_key) if legacy_key else None
+    if existing:
+        return content[:existing.start()] + block + content[existing.end():]
+
+    heading_match = re.search(rf'^## {re.escape(heading)}[ \t]*\n', content, re.MULTILINE)
+    if heading_match:
+        return content[:heading_match.end()] + "\n" + block + content[heading_match.end():]
+    return content.rstrip('\n') + f"\n\n## {heading}\n\n" + block
+
+def write_if_changed(target_path, apply_update, dry_run=False):
+    """Apply a text transform to a file, snapshotting and writing it only when the content changes.
+
+    Returns True if the file changed (or, in a dry run, would change).
+    """
+    data = read_file(target_path)
+    current = data.decode('utf-8') if data is not None else None
+    if apply_update(current) == current:
+        return False
+    if dry_run:
+        return True
+
+    # Snapshot the version that is about to be overwritten
+    if data is not None:
+        save_snapshot(target_path, data)
+    update_text_file(target_path, apply_update)
+    return True
+
+def component_doc_path(component_name):
+    """Return the documentation file of a component: its existing file in docs or _core, else a new one in docs."""
     # Determine the likely documentation file
     component_file = component_name.lower().replace(' ', '_') + '.md'
     doc_path = os.path.join(DOCS_DIR, component_file)
@@ -98,243 +156,246 @@ def update_component_documentation(component_name, work_unit_info, dry_run=False
     
     # Check if documentation exists in docs or _core directory
     if os.path.exists(doc_path):
-        target_path = doc_path
+        return doc_path
     elif os.path.exists(core_path):
-        target_path = core_path
-    else:
+        return core_path
+    return doc_path
+
+def component_update(component_name, work_unit_info):
+    """Return the transform that upserts a work unit's section into a component's documentation."""
+    def apply_update(content):
+        if content is None:
+            content = f"# {component_name}\n\n"
+        
+        # Update documentation based on work unit type
+        if work_unit_info['type'] and 'enhancement' in work_unit_info['type'].lower():
+            # Add enhancement information
+            updated_content = update_for_enhancement(content, work_unit_info)
+        elif work_unit_info['type'] and 'feature' in work_unit_info['type'].lower():
+            # Add feature information
+            updated_content = update_for_feature(content, work_unit_info)
+        elif work_unit_info['type'] and 'bug' in work_unit_info['type'].lower():
+            # Add bug fix information
+            updated_content = update_for_bugfix(content, work_unit_info)
+        else:
+            # Generic update
+            updated_content = update_generic(content, work_unit_info)
+        
+        # The section of this work unit is already up to date
+        if updated_content == content:
+            return content
+        
+        # Add changelog entry
+        changelog_section = "## Changelog\n\n"
+        today = datetime.now().strftime('%Y-%m-%d')
+        changelog_entry = f"- **{today}**: Updated based on {work_unit_info['id']} - {work_unit_info['title']}\n"
+        
+        if "## Changelog" in updated_content:
+            updated_content = updated_content.replace("## Changelog\n", f"## Changelog\n{changelog_entry}")
+        else:
+            updated_content += f"\n\n{changelog_section}{changelog_entry}"
+        
+        return updated_content
+    
+    return apply_update
+
+def compose(transforms):
+    """Return a transform that applies several transforms in order."""
+    def apply_all(content):
+        for transform in transforms:
+            content = transform(content)
+        return content
+    return apply_all
+
+def update_component_documentation(component_name, work_unit_info, dry_run=False):
+    """Update documentation for a specific component based on work unit info."""
+    target_path = component_doc_path(component_name)
+    write_document(target_path, [component_update(component_name, work_unit_info)], component_name, dry_run)
+    return target_path
+
+def write_document(target_path, transforms, name, dry_run=False):
+    """Apply the updates of one or more work units to a documentation file in a single write."""
+    if not os.path.exists(target_path):
         # Create new documentation file in docs directory
-        os.makedirs(DOCS_DIR, exist_ok=True)
-        target_path = doc_path
         if not dry_run:
-            with open(target_path, 'w', encoding='utf-8') as f:
-                f.write(f"# {component_name}\n\n")
-        logger.info(f"Created new documentation file for {component_name}: {target_path}")
-    
-    # Read existing documentation
-    if os.path.exists(target_path):
-        with open(target_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    else:
-        content = f"# {component_name}\n\n"
-    
-    # Create backup
-    if not dry_run and os.path.exists(target_path):
-        backup_path = target_path + '.bak'
-        shutil.copy2(target_path, backup_path)
-        logger.info(f"Created backup of {target_path} at {backup_path}")
-    
-    # Update documentation based on work unit type
-    if work_unit_info['type'] and 'enhancement' in work_unit_info['type'].lower():
-        # Add enhancement information
-        updated_content = update_for_enhancement(content, work_unit_info)
-    elif work_unit_info['type'] and 'feature' in work_unit_info['type'].lower():
-        # Add feature information
-        updated_content = update_for_feature(content, work_unit_info)
-    elif work_unit_info['type'] and 'bug' in work_unit_info['type'].lower():
-        # Add bug fix information
-        updated_content = update_for_bugfix(content, work_unit_info)
-    else:
-        # Generic update
-        updated_content = update_generic(content, work_unit_info)
-    
-    # Add changelog entry
-    changelog_section = "## Changelog\n\n"
-    today = datetime.now().strftime('%Y-%m-%d')
-    changelog_entry = f"- **{today}**: Updated based on {work_unit_info['id']} - {work_unit_info['title']}\n"
-    
-    if "## Changelog" in updated_content:
-        updated_content = updated_content.replace("## Changelog\n", f"## Changelog\n{changelog_entry}")
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        logger.info(f"Creating new documentation file for {name}: {target_path}")
+    
+    changed = write_if_changed(target_path, compose(transforms), dry_run)
+    if not changed:
+        logger.info(f"Documentation for {name} is up to date: {target_path}")
+    elif not dry_run:
+        rotate_if_needed(target_path)
+        logger.info(f"Updated documentation for {name}: {target_path}")
     else:
-        updated_content += f"\n\n{changelog_section}{changelog_entry}"
-    
-    # Write updated documentation
-    if not dry_run:
-        with open(target_path, 'w', encoding='utf-8') as f:
-            f.write(updated_content)
-        logger.info(f"Updated documentation for {component_name}: {target_path}")
-    else:
-        logger.info(f"Would update documentation for {component_name}: {target_path}")
-    
-    return target_path
+        logger.info(f"Would update documentation for {name}: {target_path}")
+    return changed
+
+def render_section(work_unit_info, objectives_label=None):
+    """Render the section of a work unit: its title, description and (with a label) its objectives."""
+    objectives = []
+    if objectives_label and work_unit_info['objectives']:
+        objectives = [line.strip() for line in work_unit_info['objectives'].split('\n')
+                      if line.strip() and not line.strip().startswith('#')]
+    
+    return get_template('documentation_section.md').render({
+        'title': work_unit_info['title'],
+        'description': work_unit_info['description_text'],
+        'objectives_label': objectives_label,
+        'objectives': objectives
+    })
 
 def update_for_enhancement(content, work_unit_info):
     """Update documentation for an enhancement work unit."""
-    # Check if there's an Enhancements section
-    if "## Enhancements" not in content:
-        content += "\n\n## Enhancements\n\n"
-    
-    # Add enhancement information
-    enhancement_info = f"### {work_unit_info['title']}\n\n"
-    if work_unit_info['description_text']:
-        enhancement_info += f"{work_unit_info['description_text']}\n\n"
-    
-    if work_unit_info['objectives']:
-        enhancement_info += "**Key Improvements:**\n\n"
-        for line in work_unit_info['objectives'].split('\n'):
-            if line.strip() and not line.strip().startswith('#'):
-                enhancement_info += f"{line.strip()}\n"
-        enhancement_info += "\n"
-    
-    # Add the enhancement section
-    if "## Enhancements" in content:
-        content = content.replace("## Enhancements", f"## Enhancements\n\n{enhancement_info}")
-    else:
-        content += enhancement_info
-    
-    return content
+    return upsert_section(content, "Enhancements", section_key(work_unit_info),
+                          render_section(work_unit_info, "Key Improvements"), work_unit_info['id'])
 
 def update_for_feature(content, work_unit_info):
     """Update documentation for a feature work unit."""
-    # Check if there's a Features section
-    if "## Features" not in content:
-        content += "\n\n## Features\n\n"
-    
-    # Add feature information
-    feature_info = f"### {work_unit_info['title']}\n\n"
-    if work_unit_info['description_text']:
-        feature_info += f"{work_unit_info['description_text']}\n\n"
-    
-    if work_unit_info['objectives']:
-        feature_info += "**Key Capabilities:**\n\n"
-        for line in work_unit_info['objectives'].split('\n'):
-            if line.strip() and not line.strip().startswith('#'):
-                feature_info += f"{line.strip()}\n"
-        feature_info += "\n"
-    
-    # Add the feature section
-    if "## Features" in content:
-        content = content.replace("## Features", f"## Features\n\n{feature_info}")
-    else:
-        content += feature_info
-    
-    return content
+    return upsert_section(content, "Features", section_key(work_unit_info),
+                          render_section(work_unit_info, "Key Capabilities"), work_unit_info['id'])
 
 def update_for_bugfix(content, work_unit_info):
     """Update documentation for a bug fix work unit."""
-    # Check if there's a Bug Fixes section
-    if "## Bug Fixes" not in content:
-        content += "\n\n## Bug Fixes\n\n"
-    
-    # Add bug fix information
-    bugfix_info = f"### {work_unit_info['title']}\n\n"
-    if work_unit_info['description_text']:
-        bugfix_info += f"{work_unit_info['description_text']}\n\n"
-    
-    # Add the bug fix section
-    if "## Bug Fixes" in content:
-        content = content.replace("## Bug Fixes", f"## Bug Fixes\n\n{bugfix_info}")
-    else:
-        content += bugfix_info
-    
-    return content
+    return upsert_section(content, "Bug Fixes", section_key(work_unit_info), render_section(work_unit_info),
+                          work_unit_info['id'])
 
 def update_generic(content, work_unit_info):
     """Generic update for documentation."""
-    # Check if there's an Updates section
-    if "## Updates" not in content:
-        content += "\n\n## Updates\n\n"
-    
-    # Add update information
-    update_info = f"### {work_unit_info['title']}\n\n"
-    if work_unit_info['description_text']:
-        update_info += f"{work_unit_info['description_text']}\n\n"
-    
-    if work_unit_info['objectives']:
-        update_info += "**Key Changes:**\n\n"
-        for line in work_unit_info['objectives'].split('\n'):
-            if line.strip() and not line.strip().startswith('#'):
-                update_info += f"{line.strip()}\n"
-        update_info += "\n"
-    
-    # Add the update section
-    if "## Updates" in content:
-        content = content.replace("## Updates", f"## Updates\n\n{update_info}")
-    else:
-        content += update_info
-    
-    return content
+    return upsert_section(content, "Updates", section_key(work_unit_info),
+                          render_section(work_unit_info, "Key Changes"), work_unit_info['id'])
 
-def update_main_readme(work_unit_info, updated_docs, dry_run=False):
-    """Update the main README.md file with information about the work unit."""
-    readme_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "README.md")
-    
-    if not os.path.exists(readme_path):
-        logger.warning(f"README.md not found at {readme_path}")
-        return False
-    
-    with open(readme_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Create backup
-    if not dry_run:
-        backup_path = readme_path + '.bak'
-        shutil.copy2(readme_path, backup_path)
-        logger.info(f"Created backup of README.md at {backup_path}")
-    
-    # Check if there's a Recent Updates section
-    if "## Recent Updates" not in content:
-        # Find a good place to insert it (after introduction, before other sections)
-        if "## Introduction" in content:
-            content = content.replace("## Introduction", "## Introduction\n\n## Recent Updates\n\nThis section lists recent updates to the framework.\n\n")
-        else:
-            # Add at the end
-            content += "\n\n## Recent Updates\n\nThis section lists recent updates to the framework.\n\n"
-    
-    # Add update information
-    today = datetime.now().strftime('%Y-%m-%d')
-    update_info = f"- **{today}**: {work_unit_info['title']} ({work_unit_info['id']})\n"
-    
-    # Add the update to the Recent Updates section
-    if "## Recent Updates" in content:
-        # Find the position after the section header and description
-        section_match = re.search(r'## Recent Updates.*?\n\n', content, re.DOTALL)
-        if section_match:
-            insert_pos = section_match.end()
-            content = content[:insert_pos] + update_info + content[insert_pos:]
-        else:
-            # Fallback: just replace the header
-            content = content.replace("## Recent Updates", f"## Recent Updates\n\n{update_info}")
-    
-    # Update the Documentation section if it exists
-    if "## Documentation" in content and updated_docs:
-        doc_links = ""
-        for doc_path in updated_docs:
-            doc_name = os.path.basename(doc_path)
-            doc_title = os.path.splitext(doc_name)[0].replace('_', ' ').title()
-            rel_path = os.path.relpath(doc_path, os.path.dirname(readme_path))
-            doc_links += f"- [{doc_title}]({rel_path})\n"
+def readme_update(work_unit_info, updated_docs):
+    """Return the transform that records a work unit and its updated documentation in README.md."""
+    def apply_update(content):
+        # Check if there's a Recent Updates section
+        if "## Recent Updates" not in content:
+            # Find a good place to insert it (after introduction, before other sections)
+            if "## Introduction" in content:
+                content = content.replace("## Introduction", "## Introduction\n\n## Recent Updates\n\nThis section lists recent updates to the framework.\n\n")
+            else:
+                # Add at the end
+                content += "\n\n## Recent Updates\n\nThis section lists recent updates to the framework.\n\n"
+        
+        # Add update information
+        today = datetime.now().strftime('%Y-%m-%d')
+        update_info = f"- **{today}**: {work_unit_info['title']} ({work_unit_info['id']})\n"
         
-        # Find the Documentation section and add links if they don't exist
-        doc_section = re.search(r'## Documentation.*?(?=^##|\Z)', content, re.MULTILINE | re.DOTALL)
-        if doc_section:
-            doc_content = doc_section.group(0)
+        # An existing entry of the work unit keeps its date and only follows title changes
+        existing = re.search(rf'^- \*\*([\d-]+)\*\*: .*\({re.escape(work_unit_info["id"])}\)\n', content, re.MULTILINE)
+        if existing:
+            entry = f"- **{existing.group(1)}**: {work_unit_info['title']} ({work_unit_info['id']})\n"
+            content = content[:existing.start()] + entry + content[existing.end():]
+        elif "## Recent Updates" in content:
+            # Find the position after the section header and description
+            section_match = re.search(r'## Recent Updates.*?\n\n', content, re.DOTALL)
+            if section_match:
+                insert_pos = section_match.end()
+                content = content[:insert_pos] + update_info + content[insert_pos:]
+            else:
+                # Fallback: just replace the header
+                content = content.replace("## Recent Updates", f"## Recent Updates\n\n{update_info}")
+        
+        # Update the Documentation section if it exists
+        if "## Documentation" in content and updated_docs:
+            doc_links = ""
             for doc_path in updated_docs:
                 doc_name = os.path.basename(doc_path)
-                if doc_name in doc_content:
-                    # Link already exists
-                    continue
-                
-                # Add the link
                 doc_title = os.path.splitext(doc_name)[0].replace('_', ' ').title()
-                rel_path = os.path.relpath(doc_path, os.path.dirname(readme_path))
-                new_link = f"- [{doc_title}]({rel_path})\n"
-                
-                # Insert after the section header and description
-                section_header_match = re.search(r'## Documentation.*?\n\n', doc_content, re.DOTALL)
-                if section_header_match:
-                    insert_pos = section_header_match.end() + doc_section.start()
-                    content = content[:insert_pos] + new_link + content[insert_pos:]
+                rel_path = os.path.relpath(doc_path, os.path.dirname(README_FILE))
+                doc_links += f"- [{doc_title}]({rel_path})\n"
+            
+            # Find the Documentation section and add links if they don't exist
+            doc_section = re.search(r'## Documentation.*?(?=^##|\Z)', content, re.MULTILINE | re.DOTALL)
+            if doc_section:
+                doc_content = doc_section.group(0)
+                for doc_path in updated_docs:
+                    doc_name = os.path.basename(doc_path)
+                    if doc_name in doc_content:
+                        # Link already exists
+                        continue
+                    
+                    # Add the link
+                    doc_title = os.path.splitext(doc_name)[0].replace('_', ' ').title()
+                    rel_path = os.path.relpath(doc_path, os.path.dirname(README_FILE))
+                    new_link = f"- [{doc_title}]({rel_path})\n"
+                    
+                    # Insert after the section header and description
+                    section_header_match = re.search(r'## Documentation.*?\n\n', doc_content, re.DOTALL)
+                    if section_header_match:
+                        insert_pos = section_header_match.end() + doc_section.start()
+                        content = content[:insert_pos] + new_link + content[insert_pos:]
+        
+        return content
+    
+    return apply_update
+
+def update_main_readme(work_unit_info, updated_docs, dry_run=False):
+    """Update the main README.md file with information about the work unit."""
+    return write_readme([readme_update(work_unit_info, updated_docs)], work_unit_info['id'], dry_run)
+
+def write_readme(transforms, label, dry_run=False):
+    """Apply the README updates of one or more work units in a single write."""
+    if not os.path.exists(README_FILE):
+        logger.warning(f"README.md not found at {README_FILE}")
+        return False
     
-    # Write updated README
-    if not dry_run:
-        with open(readme_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        logger.info(f"Updated README.md with information about {work_unit_info['id']}")
+    changed = write_if_changed(README_FILE, compose(transforms), dry_run)
+    if not changed:
+        logger.info(f"README.md is up to date for {label}")
+    elif not dry_run:
+        logger.info(f"Updated README.md with information about {label}")
     else:
-        logger.info(f"Would update README.md with information about {work_unit_info['id']}")
+        logger.info(f"Would update README.md with information about {label}")
     
     return True
 
+def generic_documentation(work_unit_info):
+    """Return the path and content of the generic documentation file of a work unit without components."""
+    generic_doc = os.path.join(DOCS_DIR, f"{work_unit_info['id'].lower()}_documentation.md")
+    content = f"# {work_unit_info['title']}\n\n"
+    if work_unit_info['description_text']:
+        content += f"{work_unit_info['description_text']}\n\n"
+    if work_unit_info['objectives']:
+        content += f"## Objectives\n\n{work_unit_info['objectives']}\n\n"
+    if work_unit_info['requirements']:
+        content += f"## Requirements\n\n{work_unit_info['requirements']}\n\n"
+    return generic_doc, content
+
+def plan_updates(work_unit_infos):
+    """Group the documentation updates of work units by target file.
+
+    Returns ({target path: (name, [transforms])}, [README transforms]); transforms of the same file
+    are in work unit order.
+    """
+    documents = {}
+    readme_transforms = []
+    for work_unit_info in work_unit_infos:
+        updated_docs = []
+        if work_unit_info['components']:
+            for component in work_unit_info['components']:
+                target_path = component_doc_path(component)
+                documents.setdefault(target_path, (component, []))[1].append(component_update(component, work_unit_info))
+                updated_docs.append(target_path)
+        else:
+            # If no components specified, update a generic documentation file
+            generic_doc, content = generic_documentation(work_unit_info)
+            documents.setdefault(generic_doc, (work_unit_info['id'], []))[1].append(lambda current, content=content: content)
+            updated_docs.append(generic_doc)
+        readme_transforms.append(readme_update(work_unit_info, updated_docs))
+    return documents, readme_transforms
+
+def update_documentation_for_work_units(work_unit_infos, dry_run=False):
+    """Update the documentation of several work units, writing each file and README.md at most once."""
+    documents, readme_transforms = plan_updates(work_unit_infos)
+    for target_path, (name, transforms) in documents.items():
+        write_document(target_path, transforms, name, dry_run)
+    
+    # Update the main README.md
+    ids = [work_unit_info['id'] for work_unit_info in work_unit_infos]
+    write_readme(readme_transforms, ', '.join(ids) if len(ids) <= 3 else f"{len(ids)} work units", dry_run)
+    return documents
+
 def update_documentation_for_work_unit(work_unit_id, dry_run=False):
     """Update documentation based on a specific work unit."""
     # Find the work unit file
@@ -350,43 +411,57 @@ def update_documentation_for_work_unit(work_unit_id, dry_run=False):
         return False
     
     logger.info(f"Updating documentation for work unit {work_unit_id}: {work_unit_info['title']}")
+    update_documentation_for_work_units([work_unit_info], dry_run)
     
-    # Update documentation for each affected component
-    updated_docs = []
-    if work_unit_info['components']:
-        for component in work_unit_info['components']:
-            doc_path = update_component_documentation(component, work_unit_info, dry_run)
-            updated_docs.append(doc_path)
-    else:
-        # If no components specified, update a generic documentation file
-        generic_doc = os.path.join(DOCS_DIR, f"{work_unit_id.lower()}_documentation.md")
-        with open(generic_doc, 'w', encoding='utf-8') as f:
-            f.write(f"# {work_unit_info['title']}\n\n")
-            if work_unit_info['description_text']:
-                f.write(f"{work_unit_info['description_text']}\n\n")
-            if work_unit_info['objectives']:
-                f.write(f"## Objectives\n\n{work_unit_info['objectives']}\n\n")
-            if work_unit_info['requirements']:
-                f.write(f"## Requirements\n\n{work_unit_info['requirements']}\n\n")
-        updated_docs.append(generic_doc)
-        logger.info(f"Created generic documentation for {work_unit_id}: {generic_doc}")
+    logger.info(f"Documentation update for work unit {work_unit_id} completed successfully")
+    return True
+
+def select_work_unit_files(since=None):
+    """Return the files of all work units, or of those last updated on or after a YYYY-MM-DD date."""
+    return [os.path.join(WORK_UNITS_DIR, work_unit['path']) for work_unit in list_work_units()
+            if work_unit['status'] is not None and work_unit['id']
+            and (since is None or (work_unit['last_updated'] or '') >= since)]
+
+def update_documentation_for_batch(since=None, dry_run=False):
+    """Update documentation for every work unit, or for those updated since a date."""
+    work_unit_infos = []
+    for file_path in select_work_unit_files(since):
+        work_unit_info = extract_work_unit_info(file_path)
+        if work_unit_info['id']:
+            work_unit_infos.append(work_unit_info)
+        else:
+            logger.warning(f"Could not extract ID from {file_path}")
     
-    # Update the main README.md
-    update_main_readme(work_unit_info, updated_docs, dry_run)
+    if not work_unit_infos:
+        logger.info("No work units to update documentation for")
+        return True
     
-    logger.info(f"Documentation update for work unit {work_unit_id} completed successfully")
+    logger.info(f"Updating documentation for {len(work_unit_infos)} work units")
+    documents = update_documentation_for_work_units(work_unit_infos, dry_run)
+    logger.info(f"Documentation update for {len(work_unit_infos)} work units across {len(documents)} documents completed successfully")
     return True
 
 def main():
     parser = argparse.ArgumentParser(description='Update documentation based on completed work units.')
     parser.add_argument('--work-unit', help='Update documentation based on a specific work unit')
+    parser.add_argument('--all', action='store_true', help='Update documentation based on all work units')
+    parser.add_argument('--since', help='Update documentation based on work units last updated on or after a date (YYYY-MM-DD)')
     parser.add_argument('--dry-run', action='store_true', help='Show changes without applying them')
     args = parser.parse_args()
     
+    if args.since:
+        try:
+            datetime.strptime(args.since, '%Y-%m-%d')
+        except ValueError:
+            logger.error(f"Invalid date for --since: {args.since}. Use YYYY-MM-DD")
+            return False
+    
     if args.work_unit:
         return update_documentation_for_work_unit(args.work_unit, args.dry_run)
+    elif args.all or args.since:
+        return update_documentation_for_batch(args.since, args.dry_run)
     else:
-        logger.error("No work unit specified. Use --work-unit WU_ID")
+        logger.error("No work unit specified. Use --work-unit WU_ID, --all or --since DATE")
         return False
 
 if __name__ == "__main__":
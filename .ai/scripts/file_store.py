@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+File Store
+
+This module is the shared write layer for every script that modifies work units, documentation or
+the registry. A modification is a read-modify-write cycle:
+
+1. The file is read and its content hash taken as the version.
+2. The caller's transform computes the new content without holding any lock.
+3. The new content is committed under a per-file advisory lock, but only if the file still has the
+   version that was read; it is written to a temporary file and moved into place with os.replace,
+   so readers never see a partial write.
+
+If another process committed in between, the cycle is retried with the new content. The last
+attempt runs entirely under the lock, so a modification always completes and never loses an update
+made concurrently by another trigger.
+"""
+
+import os
+import hashlib
+import logging
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Constants
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")
+LOCKS_DIR = os.path.join(CACHE_DIR, "locks")
+
+# Optimistic attempts before a modification falls back to running entirely under the lock
+MAX_ATTEMPTS = 3
+
+logger = logging.getLogger('file_store')
+
+class ConcurrentModificationError(Exception):
+    """Raised when a file no longer has the version a commit expected."""
+
+def content_hash(data):
+    """Return the version of a file's content (None for a missing file)."""
+    if data is None:
+        return None
+    return hashlib.sha256(data).hexdigest()
+
+def _lock_path(file_path):
+    """Return the lock file guarding a file.
+
+    Locks live in the cache directory, keyed by the file's real path, because the file itself is
+    replaced on every commit and a lock on the old inode would not exclude the next writer.
+    """
+    key = hashlib.sha1(os.path.realpath(file_path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(LOCKS_DIR, f"{key}.lock")
+
+@contextmanager
+def file_lock(file_path):
+    """Hold the exclusive advisory lock of a file for the duration of the block."""
+    os.makedirs(LOCKS_DIR, exist_ok=True)
+    with open(_lock_path(file_path), 'a') as lock:
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+def read_file(file_path):
+    """Return the content of a file as bytes, or None if it does not exist."""
+    try:
+        with open(file_path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def read_versioned(file_path):
+    """Return (content, version) of a file; both are None if it does not exist."""
+    data = read_file(file_path)
+    return data, content_hash(data)
+
+def write_atomic(file_path, data):
+    """Write a file through a temporary file in the same directory and move it into place."""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(file_path):
+            os.chmod(temp_path, os.stat(file_path).st_mode & 0o7777)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp_path, 0o666 & ~umask)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+def commit(file_path, data, expected_version):
+    """Write data if the file still has the expected version (None: the file must not exist).
+
+    Returns the new version; raises ConcurrentModificationError if the file changed since it was read.
+    """
+    with file_lock(file_path):
+        current_version = content_hash(read_file(file_path))
+        if current_version != expected_version:
+            raise ConcurrentModificationError(f"{file_path} was modified concurrently")
+        write_atomic(file_path, data)
+    return content_hash(data)
+
+def update_file(file_path, transform):
+    """Apply a read-modify-write transform to a file.
+
+    transform receives the current content as bytes (None if the file does not exist) and returns
+    the new content, or None to leave the file untouched. It may be called more than once when
+    another process modifies the file concurrently, so it must not have side effects of its own.
+
+    Returns the resulting content of the file, or None if the transform declined to write.
+    """
+    for _ in range(MAX_ATTEMPTS):
+        data, version = read_versioned(file_path)
+        new_data = transform(data)
+        if new_data is None:
+            return None
+        if new_data == data:
+            return data
+        try:
+            commit(file_path, new_data, version)
+            return new_data
+        except ConcurrentModificationError:
+            logger.debug(f"{file_path} changed while it was being modified; retrying")
+
+    # Contended file: run the whole cycle under the lock so it cannot be overtaken again
+    with file_lock(file_path):
+        data = read_file(file_path)
+        new_data = transform(data)
+        if new_data is None:
+            return None
+        if new_data != data:
+            write_atomic(file_path, new_data)
+        return new_data
+
+def update_text_file(file_path, transform, encoding='utf-8'):
+    """Apply a read-modify-write transform to a text file; like update_file, but on strings."""
+    def transform_bytes(data):
+        text = transform(data.decode(encoding) if data is not None else None)
+        return text.encode(encoding) if text is not None else None
+
+    data = update_file(file_path, transform_bytes)
+    return data.decode(encoding) if data is not None else None
+
+def write_file(file_path, data):
+    """Replace the whole content of a file under its lock (a modification that ignores the old content)."""
+    with file_lock(file_path):
+        write_atomic(file_path, data)
+
+def write_text_file(file_path, text, encoding='utf-8'):
+    """Replace the whole content of a text file under its lock."""
+    write_file(file_path, text.encode(encoding))
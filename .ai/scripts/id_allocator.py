@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Work Unit ID Allocator
+
+This script hands out work unit IDs from a small counter file in the cache directory. The counter
+holds the next free number and is read and rewritten under an exclusive fcntl lock, so concurrent
+creations never receive the same ID and allocating does not depend on the size of the corpus.
+The counter is seeded from the work unit index only when it is missing (or unreadable).
+
+Usage:
+    python id_allocator.py [--peek] [--reserve COUNT] [--rebuild]
+
+Options:
+    --peek           Print the next ID without reserving it
+    --reserve COUNT  Reserve a block of COUNT consecutive IDs and print them
+    --rebuild        Reseed the counter from the work unit index
+"""
+
+import os
+import re
+import sys
+import argparse
+import logging
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Import the work unit index
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from work_unit_index import list_work_units
+
+# Constants
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")
+COUNTER_FILE = os.path.join(CACHE_DIR, "work_unit_id_counter")
+LOCK_FILE = COUNTER_FILE + ".lock"
+
+WORK_UNIT_NUMBER = re.compile(r'^WU-(\d+)')
+
+logger = logging.getLogger('id_allocator')
+
+def format_work_unit_id(number):
+    """Format a work unit number as an ID."""
+    return f"WU-{number:03d}"
+
+@contextmanager
+def _counter_lock():
+    """Hold an exclusive lock on the counter for the duration of the block.
+
+    The lock lives on a separate file because the counter itself is replaced on every write.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(LOCK_FILE, 'a') as lock:
+        if fcntl is None:
+            logger.warning("fcntl is not available; work unit IDs are allocated without locking")
+            yield
+            return
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+def _read_counter():
+    """Return the next free number stored in the counter, or None if it is missing or unreadable."""
+    try:
+        with open(COUNTER_FILE, 'r', encoding='utf-8') as f:
+            value = int(f.read().strip())
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        logger.warning(f"Ignoring unreadable ID counter: {COUNTER_FILE}")
+        return None
+    return value if value > 0 else None
+
+def _write_counter(value):
+    """Atomically replace the counter with a new next free number."""
+    fd, temp_path = tempfile.mkstemp(dir=CACHE_DIR, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(f"{value}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, COUNTER_FILE)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def highest_work_unit_number():
+    """Return the highest work unit number in the index, from both metadata IDs and file names."""
+    highest = 0
+    for work_unit in list_work_units():
+        for value in (work_unit['id'], work_unit['path']):
+            match = WORK_UNIT_NUMBER.match(value or '')
+            if match:
+                highest = max(highest, int(match.group(1)))
+    return highest
+
+def _seed_counter():
+    """Compute the next free number from the index (used when the counter is missing)."""
+    next_number = highest_work_unit_number() + 1
+    logger.info(f"Seeded work unit ID counter from the index: next ID is {format_work_unit_id(next_number)}")
+    return next_number
+
+def reserve_work_unit_ids(count=1):
+    """Reserve a block of consecutive work unit IDs and return them as a list."""
+    if count < 1:
+        raise ValueError("count must be at least 1")
+
+    with _counter_lock():
+        next_number = _read_counter()
+        if next_number is None:
+            next_number = _seed_counter()
+        _write_counter(next_number + count)
+
+    return [format_work_unit_id(number) for number in range(next_number, next_number + count)]
+
+def reserve_work_unit_id():
+    """Reserve a single work unit ID."""
+    return reserve_work_unit_ids(1)[0]
+
+def peek_next_work_unit_id():
+    """Return the next work unit ID without reserving it."""
+    with _counter_lock():
+        next_number = _read_counter()
+    if next_number is None:
+        next_number = highest_work_unit_number() + 1
+    return format_work_unit_id(next_number)
+
+def rebuild_counter():
+    """Reseed the counter from the index, never moving it below IDs that were already handed out."""
+    with _counter_lock():
+        next_number = max(_seed_counter(), _read_counter() or 1)
+        _write_counter(next_number)
+    return format_work_unit_id(next_number)
+
+def main():
+    parser = argparse.ArgumentParser(description='Allocate work unit IDs.')
+    parser.add_argument('--peek', action='store_true', help='Print the next ID without reserving it')
+    parser.add_argument('--reserve', type=int, metavar='COUNT', help='Reserve a block of COUNT consecutive IDs and print them')
+    parser.add_argument('--rebuild', action='store_true', help='Reseed the counter from the work unit index')
+    args = parser.parse_args()
+
+    if args.rebuild:
+        print(f"Rebuilt work unit ID counter: next ID is {rebuild_counter()}")
+    if args.reserve is not None:
+        if args.reserve < 1:
+            print("--reserve must be at least 1")
+            return False
+        for work_unit_id in reserve_work_unit_ids(args.reserve):
+            print(work_unit_id)
+    if args.peek or not (args.rebuild or args.reserve is not None):
+        print(peek_next_work_unit_id())
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Link Graph Script
+
+This script checks the markdown links between framework documents (work_units/, requirements/,
+_core/, templates/, documentation/ and the other directories under .ai/, see
+_core/document_reference_patterns.md). Every document's links and heading anchors are extracted
+once and cached per file by content hash; the graph keeps forward adjacency (the links of each
+document) and backward adjacency (the documents linking to each path).
+
+On each run only the changed documents are re-read, and only the links that touch them are
+checked again: the links of changed documents and the links pointing at changed, added or removed
+documents. The broken links are cached with the extraction, so a run in which nothing changed
+checks no links at all. The result lists broken file links, broken anchors and orphan documents
+(documents no other document links to).
+
+Links to placeholder targets used in templates and examples (e.g. `./path/to/WU-XXX_title.md`)
+are not checked.
+
+Usage:
+    python link_graph.py [--json] [--file PATH] [--no-orphans]
+
+Options:
+    --json         Print the report as JSON
+    --file PATH    Print the links of a document and the documents linking to it
+    --no-orphans   Leave orphan documents out of the report
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import logging
+from urllib.parse import unquote
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from file_store import read_file, content_hash, write_text_file
+
+# Constants
+AI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(AI_DIR, "cache")
+CACHE_FILE = os.path.join(CACHE_DIR, "link_graph.json")
+CACHE_VERSION = 2
+
+# Directories under .ai/ that hold generated or transient files rather than documents
+SKIPPED_DIRS = ('cache', 'logs', 'reports', 'notifications', 'changelogs', '__pycache__')
+
+# Documents that are entry points and need no incoming links
+ORPHAN_EXEMPT = ('README.md', 'context.md', 'VERSION.md', 'registry.md', 'project_tracker.md')
+
+LINK_PATTERN = re.compile(r'!?\[[^\]\n]*\]\(<?([^)\s>]+)>?(?:\s+"[^"]*")?\)')
+ANCHOR_TAG_PATTERN = re.compile(r'<a\s+(?:name|id)=["\']([^"\']+)["\']', re.IGNORECASE)
+HEADING_PATTERN = re.compile(r'^#{1,6}\s+(.*?)\s*#*\s*$')
+SCHEME_PATTERN = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+PLACEHOLDER_PATTERN = re.compile(r'\{[^}]*\}|XXX|YYY|path/to/')
+
+logger = logging.getLogger('link_graph')
+
+def heading_anchor(heading):
+    """Return the anchor GitHub generates for a heading."""
+    text = re.sub(r'[*_`]|\[([^\]]*)\]\([^)]*\)', r'\1', heading).strip().lower()
+    return re.sub(r'[^\w\- ]', '', text).replace(' ', '-')
+
+def extract_links(text):
+    """Return the (target, line) of every markdown link outside code blocks."""
+    links = []
+    in_code_block = False
+    for line_number, line in enumerate(text.split('\n'), 1):
+        if line.lstrip().startswith('```'):
+            in_code_block = not in_code_block
+            continue
+        if in_code_block:
+            continue
+        for match in LINK_PATTERN.finditer(line):
+            links.append((match.group(1), line_number))
+    return links
+
+def extract_anchors(text):
+    """Return the anchors of a document: heading anchors (numbered when repeated) and explicit anchor tags."""
+    anchors = []
+    counts = {}
+    in_code_block = False
+    for line in text.split('\n'):
+        if line.lstrip().startswith('```'):
+            in_code_block = not in_code_block
+            continue
+        if in_code_block:
+            continue
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            anchor = heading_anchor(heading.group(1))
+            count = counts.get(anchor, 0)
+            counts[anchor] = count + 1
+            anchors.append(anchor if count == 0 else f"{anchor}-{count}")
+        anchors.extend(ANCHOR_TAG_PATTERN.findall(line))
+    return anchors
+
+def is_checked_target(target):
+    """Check whether a link target is a local document reference that should be checked."""
+    return not (SCHEME_PATTERN.match(target) or PLACEHOLDER_PATTERN.search(target))
+
+def resolve_target(source, target):
+    """Resolve a link target of a document to (absolute path, anchor); the path is the source for `#anchor` links."""
+    path, _, anchor = target.partition('#')
+    path = unquote(path)
+    if not path:
+        return source, anchor
+    return os.path.normpath(os.path.join(os.path.dirname(source), path)), anchor
+
+class LinkGraph:
+    """Links and anchors of the framework documents, checked incrementally."""
+
+    def __init__(self, root=AI_DIR):
+        self.root = root
+        # path -> {'hash', 'mtime_ns', 'size', 'links': [[target, line]], 'anchors': [...]}
+        self.files = {}
+        # path -> [(resolved path, anchor, target, line)] and resolved path -> {linking documents}
+        self.forward = {}
+        self.backward = {}
+        # path -> broken links of that document; until a checked cache is loaded, the first sync
+        # checks every document
+        self.broken = {}
+        self._checked = False
+
+    def _relative(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, '/')
+
+    def scan(self):
+        """Return {path: (mtime_ns, size)} of every markdown document under the root."""
+        documents = {}
+        for directory, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = sorted(name for name in dirnames if name not in SKIPPED_DIRS and not name.startswith('.'))
+            for filename in filenames:
+                if filename.endswith('.md'):
+                    path = os.path.join(directory, filename)
+                    try:
+                        stat_result = os.stat(path)
+                    except OSError:
+                        continue
+                    documents[path] = (stat_result.st_mtime_ns, stat_result.st_size)
+        return documents
+
+    def load_cache(self):
+        """Load the cached per-file extraction and broken links of a previous run."""
+        try:
+            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cache.get('version') != CACHE_VERSION:
+            return
+        for relative, record in cache.get('files', {}).items():
+            path = os.path.normpath(os.path.join(self.root, relative))
+            self.files[path] = record
+            self._set_links(path)
+        if cache.get('checked'):
+            for relative, issues in cache.get('broken', {}).items():
+                path = os.path.normpath(os.path.join(self.root, relative))
+                self.broken[path] = [dict(issue, source=path) for issue in issues]
+            self._checked = True
+
+    def save_cache(self):
+        """Save the per-file extraction and the broken links for the next run."""
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        files = {self._relative(path): record for path, record in sorted(self.files.items())}
+        broken = {self._relative(path): [dict(issue, source=self._relative(path)) for issue in issues]
+                  for path, issues in sorted(self.broken.items())}
+        write_text_file(CACHE_FILE, json.dumps({'version': CACHE_VERSION, 'files': files,
+                                                'checked': self._checked, 'broken': broken}))
+
+    def _set_links(self, path):
+        """Replace the forward and backward edges of a document with those of its current record."""
+        for resolved, _, _, _ in self.forward.pop(path, ()):
+            sources = self.backward.get(resolved)
+            if sources is not None:
+                sources.discard(path)
+                if not sources:
+                    del self.backward[resolved]
+        record = self.files.get(path)
+        if record is None:
+            return
+        edges = []
+        for target, line in record['links']:
+            if is_checked_target(target):
+                resolved, anchor = resolve_target(path, target)
+                edges.append((resolved, anchor, target, line))
+                self.backward.setdefault(resolved, set()).add(path)
+        self.forward[path] = edges
+
+    def _check(self, path):
+        """Check the links of one document against the known documents."""
+        broken = []
+        for resolved, anchor, target, line in self.forward.get(path, ()):
+            record = self.files.get(resolved)
+            if record is None:
+                if not os.path.exists(resolved):
+                    broken.append({'type': 'broken_file', 'source': path, 'target': target, 'line': line})
+            elif anchor and anchor.lower() not in record['anchors']:
+                broken.append({'type': 'broken_anchor', 'source': path, 'target': target, 'line': line})
+        if broken:
+            self.broken[path] = broken
+        else:
+            self.broken.pop(path, None)
+
+    def sync(self):
+        """Bring the graph up to date with the documents on disk.
+
+        Returns the set of documents whose links were checked again.
+        """
+        documents = self.scan()
+        changed = set()
+        stat_changed = False
+        for path, (mtime_ns, size) in documents.items():
+            record = self.files.get(path)
+            if record is not None and (record['mtime_ns'], record['size']) == (mtime_ns, size):
+                continue
+            data = read_file(path)
+            if data is None:
+                continue
+            digest = content_hash(data)
+            if record is not None and record['hash'] == digest:
+                record['mtime_ns'], record['size'] = mtime_ns, size
+                stat_changed = True
+                continue
+            text = data.decode('utf-8', errors='replace')
+            self.files[path] = {'hash': digest, 'mtime_ns': mtime_ns, 'size': size,
+                                'links': extract_links(text), 'anchors': extract_anchors(text)}
+            self._set_links(path)
+            changed.add(path)
+
+        removed = set(self.files) - set(documents)
+        for path in removed:
+            del self.files[path]
+            self._set_links(path)
+            self.broken.pop(path, None)
+
+        # Recheck the links of changed documents and every link that points at a changed or removed one
+        checked_all = not self._checked
+        if checked_all:
+            affected = set(self.files)
+            self._checked = True
+        else:
+            affected = set(changed)
+            for path in changed | removed:
+                affected |= self.backward.get(path, set())
+        for path in affected:
+            if path in self.files:
+                self._check(path)
+
+        if changed or removed or stat_changed or checked_all:
+            self.save_cache()
+        logger.debug(f"Link graph synced: {len(changed)} changed, {len(removed)} removed, {len(affected)} rechecked")
+        return affected
+
+    def orphans(self):
+        """Return the documents that no other document links to."""
+        return sorted(path for path in self.files
+                      if os.path.basename(path) not in ORPHAN_EXEMPT
+                      and not (self.backward.get(path, set()) - {path}))
+
+    def links_from(self, path):
+        """Return the (resolved path, anchor, target, line) links of a document."""
+        return list(self.forward.get(os.path.abspath(path), ()))
+
+    def links_to(self, path):
+        """Return the documents that link to a path."""
+        return sorted(self.backward.get(os.path.abspath(path), ()))
+
+    def report(self, orphans=True):
+        """Return the broken links (files and anchors) and orphan documents, with paths relative to the root."""
+        broken = [dict(issue, source=self._relative(issue['source']))
+                  for path in sorted(self.broken) for issue in self.broken[path]]
+        return {
+            'documents': len(self.files),
+            'links': sum(len(edges) for edges in self.forward.values()),
+            'broken_files': [issue for issue in broken if issue['type'] == 'broken_file'],
+            'broken_anchors': [issue for issue in broken if issue['type'] == 'broken_anchor'],
+            'orphans': [self._relative(path) for path in self.orphans()] if orphans else []
+        }
+
+def load_link_graph():
+    """Return a link graph that is up to date with the documents, reusing the cache of earlier runs."""
+    graph = LinkGraph()
+    graph.load_cache()
+    graph.sync()
+    return graph
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the links between framework documents.')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    parser.add_argument('--file', help='Print the links of a document and the documents linking to it')
+    parser.add_argument('--no-orphans', action='store_true', help='Leave orphan documents out of the report')
+    args = parser.parse_args()
+
+    graph = load_link_graph()
+
+    if args.file:
+        print(f"Links from {args.file}:")
+        for resolved, anchor, target, line in graph.links_from(args.file):
+            print(f"  {line}: {target}")
+        print(f"Linked from:")
+        for source in graph.links_to(args.file):
+            print(f"  {graph._relative(source)}")
+        return True
+
+    report = graph.report(orphans=not args.no_orphans)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['documents']} documents, {report['links']} links")
+        for title, key in (('Broken file links', 'broken_files'), ('Broken anchors', 'broken_anchors')):
+            print(f"\n{title} ({len(report[key])}):")
+            for issue in report[key]:
+                print(f"  {issue['source']}:{issue['line']}: {issue['target']}")
+        if not args.no_orphans:
+            print(f"\nOrphan documents ({len(report['orphans'])}):")
+            for path in report['orphans']:
+                print(f"  {path}")
+    return not (report['broken_files'] or report['broken_anchors'])
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
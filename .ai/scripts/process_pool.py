@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Process Pool Helpers
+
+This module distributes CPU-bound per-file work (parsing, validation) over a ProcessPoolExecutor.
+Items are handed to the workers in chunks and results come back in input order, so callers that
+sort their inputs get deterministic output regardless of the number of jobs.
+"""
+
+import os
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+# Each worker receives this many chunks on average, which evens out files of different sizes
+CHUNKS_PER_JOB = 4
+
+def resolve_jobs(jobs):
+    """Return the number of worker processes for a --jobs value (0 means one per CPU)."""
+    if jobs is None:
+        return 1
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+def parallel_map(func, items, jobs=1):
+    """Apply func to every item, over a process pool when more than one job is requested.
+
+    func must be a picklable top-level function. Results are returned in the order of items.
+    """
+    items = list(items)
+    jobs = min(resolve_jobs(jobs), len(items))
+    if jobs <= 1:
+        return [func(item) for item in items]
+
+    chunksize = max(1, math.ceil(len(items) / (jobs * CHUNKS_PER_JOB)))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(func, items, chunksize=chunksize))
@@ -105,8 +105,159 @@ FRAMEWORK_INDICATORS = {
     'kubernetes': ['kubernetes', 'k8s', '.yaml', '.yml'],
 }
 
+# Directories that are never scanned, in addition to hidden ones
+IGNORED_DIRS = frozenset(['node_modules', 'venv', 'env', '__pycache__', 'dist', 'build'])
+
+# Files whose content is inspected for technologies
+MANIFEST_FILES = frozenset(['package.json', 'requirements.txt', 'gemfile', 'pom.xml',
+                            'dockerfile', 'docker-compose.yml', 'docker-compose.yaml'])
+
+def trie_pattern(strings):
+    """Return a regular expression matching any of the strings, built as a trie: common prefixes are
+    factored out (e.g. 'app.js' and 'app.py' become one branch), so each position of the searched
+    text is tried against one branch per character rather than against every string.
+
+    Where one string is a prefix of another, only the shorter one is kept, as it matches first.
+    """
+    trie = {}
+    for string in strings:
+        node = trie
+        for char in string:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def build(node):
+        if '' in node:
+            return ''
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    
+    return build(trie)
+
+# Framework indicators by indicator, and by their first character
+INDICATOR_FRAMEWORKS = defaultdict(list)
+for _framework, _indicators in FRAMEWORK_INDICATORS.items():
+    for _indicator in _indicators:
+        INDICATOR_FRAMEWORKS[_indicator].append(_framework)
+INDICATORS_BY_INITIAL = defaultdict(list)
+for _indicator in INDICATOR_FRAMEWORKS:
+    INDICATORS_BY_INITIAL[_indicator[0]].append(_indicator)
+
+# All framework indicators in one pattern; the lookahead reports every position where an indicator
+# starts, including overlapping ones, and the indicators starting there are then checked one by one
+INDICATOR_PATTERN = re.compile('(?=' + trie_pattern(INDICATOR_FRAMEWORKS) + ')')
+
+# The extension of each name in a '/'-joined list of file names, for names that have one
+EXTENSION_PATTERN = re.compile(r'\.[^./]*(?=/|\Z)')
+
+# Number of batched file extensions after which they are counted
+EXTENSION_BATCH_SIZE = 65536
+
+def match_frameworks(text):
+    """Return the frameworks that have an indicator in a lowercase name or path."""
+    frameworks = set()
+    for match in INDICATOR_PATTERN.finditer(text):
+        position = match.start()
+        for indicator in INDICATORS_BY_INITIAL[text[position]]:
+            if text.startswith(indicator, position):
+                frameworks.update(INDICATOR_FRAMEWORKS[indicator])
+    return frameworks
+
+def attention_pattern(detected):
+    """Return a pattern matching what makes a file need processing on its own: the indicators of the
+    frameworks not detected yet and the names of manifest files.
+
+    A string that contains another one (e.g. 'vue.js' and 'vue') is left out, since the shorter one
+    matches wherever it does; the pattern only selects files, which are then checked exactly.
+    """
+    strings = [indicator for indicator, frameworks in INDICATOR_FRAMEWORKS.items()
+               if not detected.issuperset(frameworks)]
+    strings = set(strings) | MANIFEST_FILES
+    strings = [string for string in strings
+               if not any(other != string and other in string for other in strings)]
+    return re.compile(trie_pattern(strings))
+
+def count_extensions(extensions, without_extension, file_extensions, technologies):
+    """Count a batch of file extensions (and files without one) and the technologies they map to."""
+    counts = Counter(extensions)
+    if without_extension:
+        counts[''] += without_extension
+    file_extensions.update(counts)
+    for ext, count in counts.items():
+        if ext in TECH_MAPPING:
+            technologies[TECH_MAPPING[ext]] += count
+
+def inspect_manifest(name, file_path, technologies):
+    """Count the technologies indicated by a manifest file (package.json, requirements.txt, ...)."""
+    if name == 'package.json':
+        technologies['Node.js'] += 1
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                package_data = json.load(f)
+                dependencies = package_data.get('dependencies', {})
+                dev_dependencies = package_data.get('devDependencies', {})
+                all_deps = list(dependencies.keys()) + list(dev_dependencies.keys())
+                for dep in all_deps:
+                    if dep in ['react', 'react-dom']:
+                        technologies['React'] += 1
+                    elif dep in ['@angular/core']:
+                        technologies['Angular'] += 1
+                    elif dep == 'vue':
+                        technologies['Vue.js'] += 1
+                    elif dep == 'express':
+                        technologies['Express.js'] += 1
+        except Exception as e:
+            logger.warning(f"Error parsing package.json: {e}")
+    
+    elif name == 'requirements.txt':
+        technologies['Python'] += 1
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                requirements = f.read().lower()
+                if 'django' in requirements:
+                    technologies['Django'] += 1
+                if 'flask' in requirements:
+                    technologies['Flask'] += 1
+                if 'fastapi' in requirements:
+                    technologies['FastAPI'] += 1
+                if 'tensorflow' in requirements or 'tf-' in requirements:
+                    technologies['TensorFlow'] += 1
+                if 'torch' in requirements:
+                    technologies['PyTorch'] += 1
+        except Exception as e:
+            logger.warning(f"Error parsing requirements.txt: {e}")
+    
+    elif name == 'gemfile':
+        technologies['Ruby'] += 1
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                gemfile = f.read().lower()
+                if 'rails' in gemfile:
+                    technologies['Ruby on Rails'] += 1
+        except Exception as e:
+            logger.warning(f"Error parsing Gemfile: {e}")
+    
+    elif name == 'pom.xml':
+        technologies['Java'] += 1
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                pom = f.read().lower()
+                if 'springframework' in pom:
+                    technologies['Spring'] += 1
+        except Exception as e:
+            logger.warning(f"Error parsing pom.xml: {e}")
+    
+    else:
+        technologies['Docker'] += 1
+
 def scan_project(project_dir):
-    """Scan the project directory to identify files and technologies."""
+    """Scan the project directory to identify files and technologies.
+
+    Directories are read with os.scandir, whose entries carry the file type, so no file is stat'ed.
+    The files of a directory are counted in batches, from their joined names; they are only gone
+    through one by one when a single search over the directory path and file names finds a
+    manifest file or an indicator of a framework that has not been detected yet.
+    """
     if not os.path.exists(project_dir):
         logger.error(f"Project directory not found: {project_dir}")
         return None
@@ -117,108 +268,91 @@ def scan_project(project_dir):
     file_extensions = Counter()
     technologies = Counter()
     directories = []
-    framework_indicators = defaultdict(int)
-    
-    # Walk through the directory
-    for root, dirs, files in os.walk(project_dir):
-        # Skip hidden directories and common directories to ignore
-        dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['node_modules', 'venv', 'env', '__pycache__', 'dist', 'build']]
+    frameworks = []
+    detected = set()
+    attention = attention_pattern(detected)
+    # Extensions of files counted in a batch; they are counted before any file is processed on its
+    # own, so that technologies keep the order in which they are first found
+    batch = []
+    without_extension = 0
+    
+    # Walk through the directory depth first, top down, like os.walk; the path of each subdirectory
+    # comes from its DirEntry, and its relative path is the part after the project directory prefix
+    prefix_length = len(os.path.join(project_dir, ''))
+    stack = [project_dir]
+    while stack:
+        root = stack.pop()
+        try:
+            with os.scandir(root) as scanner:
+                entries = list(scanner)
+        except OSError:
+            continue
         
-        # Process each file
-        for file in files:
-            # Skip hidden files
-            if file.startswith('.'):
-                continue
-            
-            file_path = os.path.join(root, file)
-            _, ext = os.path.splitext(file.lower())
-            
-            # Count file extensions
-            file_extensions[ext] += 1
-            
-            # Map to technologies
-            if ext in TECH_MAPPING:
-                technologies[TECH_MAPPING[ext]] += 1
-            
-            # Check for framework indicators
-            for framework, indicators in FRAMEWORK_INDICATORS.items():
-                for indicator in indicators:
-                    if indicator in file.lower() or indicator in file_path.lower():
-                        framework_indicators[framework] += 1
-            
-            # Check for specific files that indicate technologies
-            if file.lower() == 'package.json':
-                technologies['Node.js'] += 1
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        package_data = json.load(f)
-                        dependencies = package_data.get('dependencies', {})
-                        dev_dependencies = package_data.get('devDependencies', {})
-                        all_deps = list(dependencies.keys()) + list(dev_dependencies.keys())
-                        for dep in all_deps:
-                            if dep in ['react', 'react-dom']:
-                                technologies['React'] += 1
-                            elif dep in ['@angular/core']:
-                                technologies['Angular'] += 1
-                            elif dep == 'vue':
-                                technologies['Vue.js'] += 1
-                            elif dep == 'express':
-                                technologies['Express.js'] += 1
-                except Exception as e:
-                    logger.warning(f"Error parsing package.json: {e}")
-            
-            elif file.lower() == 'requirements.txt':
-                technologies['Python'] += 1
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        requirements = f.read().lower()
-                        if 'django' in requirements:
-                            technologies['Django'] += 1
-                        if 'flask' in requirements:
-                            technologies['Flask'] += 1
-                        if 'fastapi' in requirements:
-                            technologies['FastAPI'] += 1
-                        if 'tensorflow' in requirements or 'tf-' in requirements:
-                            technologies['TensorFlow'] += 1
-                        if 'torch' in requirements:
-                            technologies['PyTorch'] += 1
-                except Exception as e:
-                    logger.warning(f"Error parsing requirements.txt: {e}")
-            
-            elif file.lower() == 'gemfile':
-                technologies['Ruby'] += 1
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        gemfile = f.read().lower()
-                        if 'rails' in gemfile:
-                            technologies['Ruby on Rails'] += 1
-                except Exception as e:
-                    logger.warning(f"Error parsing Gemfile: {e}")
-            
-            elif file.lower() == 'pom.xml':
-                technologies['Java'] += 1
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        pom = f.read().lower()
-                        if 'springframework' in pom:
-                            technologies['Spring'] += 1
-                except Exception as e:
-                    logger.warning(f"Error parsing pom.xml: {e}")
+        subdirs = []
+        files = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if not is_dir:
+                files.append(entry.name)
+            # Skip hidden directories, common directories to ignore and symlinked directories
+            elif not entry.name.startswith('.') and entry.name not in IGNORED_DIRS and not entry.is_symlink():
+                subdirs.append(entry.path)
+        
+        # Skip hidden files; file names cannot contain '/', and no indicator does either
+        names = '/'.join(files)
+        visible = files
+        if names.startswith('.') or '/.' in names:
+            visible = [file for file in files if not file.startswith('.')]
+            names = '/'.join(visible)
+        if visible:
+            names = names.lower()
+            root_lower = root.lower()
             
-            elif file.lower() == 'dockerfile' or file.lower() == 'docker-compose.yml' or file.lower() == 'docker-compose.yaml':
-                technologies['Docker'] += 1
+            if attention.search(root_lower + '/' + names):
+                # Process each file, so that frameworks are listed in the order they are first detected
+                count_extensions(batch, without_extension, file_extensions, technologies)
+                batch = []
+                without_extension = 0
+                for file, name in zip(visible, names.split('/')):
+                    _, ext = os.path.splitext(name)
+                    file_extensions[ext] += 1
+                    if ext in TECH_MAPPING:
+                        technologies[TECH_MAPPING[ext]] += 1
+                    
+                    # Check for framework indicators in the file path
+                    file_path = root_lower + '/' + name
+                    if attention.search(file_path):
+                        matched = match_frameworks(file_path) - detected
+                        if matched:
+                            for framework in FRAMEWORK_INDICATORS:
+                                if framework in matched:
+                                    frameworks.append(framework)
+                                    detected.add(framework)
+                            attention = attention_pattern(detected)
+                    
+                    # Check for specific files that indicate technologies
+                    if name in MANIFEST_FILES:
+                        inspect_manifest(name, os.path.join(root, file), technologies)
+            else:
+                # Add the extensions of all files to the batch at once
+                extensions = EXTENSION_PATTERN.findall(names)
+                batch += extensions
+                without_extension += len(visible) - len(extensions)
+                if len(batch) >= EXTENSION_BATCH_SIZE:
+                    count_extensions(batch, without_extension, file_extensions, technologies)
+                    batch = []
+                    without_extension = 0
         
         # Add this directory if it contains files
-        if files:
-            rel_path = os.path.relpath(root, project_dir)
-            if rel_path != '.':
-                directories.append(rel_path)
-    
-    # Determine primary frameworks
-    frameworks = []
-    for framework, count in framework_indicators.items():
-        if count > 0:
-            frameworks.append(framework)
+        if files and root is not project_dir:
+            directories.append(root[prefix_length:])
+        
+        subdirs.reverse()
+        stack += subdirs
+    count_extensions(batch, without_extension, file_extensions, technologies)
     
     # Sort technologies by count
     top_technologies = [tech for tech, _ in technologies.most_common(10)]
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Registry Query Script
+
+This script answers questions about the work units from the persistent work unit index instead of
+parsing registry.md or the work unit files, e.g. "which units are In Progress under 50% that
+depend on WU-001?":
+
+    python registry_query.py --filter "status=In Progress" --filter "completion<50" --filter "dependencies=WU-001"
+
+Filters have the form FIELD OPERATOR VALUE and are combined with AND. The operators are
+=, !=, <, <=, >, >= and ~ (contains). Completion compares as a number; the dependencies field
+matches the IDs a work unit depends on (= selects units that depend on an ID, != those that do
+not, ~ those that depend on an ID containing the value). Filters, sorting and limits run in SQLite on the index's secondary indexes; the index
+itself is refreshed first, which only re-extracts files that changed.
+
+Sort fields are ascending by default; suffix a field with :desc (or prefix it with -) for descending
+order. A leading - must be attached with = so that it is not read as an option:
+
+    python registry_query.py --sort completion:desc,id
+    python registry_query.py --sort=-completion,id
+
+Usage:
+    python registry_query.py [--filter EXPR ...] [--sort FIELDS] [--fields FIELDS] [--limit N] [--format table|json|csv]
+
+Options:
+    --filter EXPR     Filter expression, e.g. "completion>=50" (repeatable)
+    --sort FIELDS     Comma-separated sort fields; FIELD:desc (or --sort=-FIELD) for descending order
+    --fields FIELDS   Comma-separated fields to output
+    --limit N         Output at most N work units
+    --format FORMAT   Output format: table (default), json or csv
+    --no-refresh      Query the index as it is, without checking the work unit files for changes
+
+Fields: id, title, status, completion, type, dependencies, last_updated, path, description,
+relationship, parents, children
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import argparse
+
+# Import the work unit index
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from work_unit_index import get_connection, refresh_index
+
+# Queryable fields: name -> (column that is output, column that is filtered and sorted on)
+FIELDS = {
+    'id': ('id', 'id'),
+    'title': ('title', 'title'),
+    'status': ('status', 'status'),
+    'completion': ('completion', 'completion_value'),
+    'type': ('type', 'type'),
+    'dependencies': ('dependencies', None),
+    'last_updated': ('last_updated', 'last_updated'),
+    'path': ('filename', 'filename'),
+    'description': ('description', 'description'),
+    'relationship': ('relationship', 'relationship'),
+    'parents': ('parents', 'parents'),
+    'children': ('children', 'children')
+}
+
+DEFAULT_FIELDS = ('id', 'status', 'completion', 'type', 'last_updated', 'path')
+
+OPERATORS = ('>=', '<=', '!=', '=', '<', '>', '~')
+FILTER_PATTERN = re.compile(r'^\s*([a-z_]+)\s*(>=|<=|!=|=|<|>|~)\s*(.*?)\s*$')
+
+def _unquote(value):
+    """Strip matching quotes around a filter value."""
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1]
+    return value
+
+def _like_pattern(value):
+    """Return a LIKE pattern matching values that contain a string."""
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+def parse_filter(expression):
+    """Translate a filter expression into a SQL condition and its parameters.
+
+    Raises ValueError for an unknown field, operator or a malformed value.
+    """
+    match = FILTER_PATTERN.match(expression)
+    if not match:
+        raise ValueError(f"Invalid filter '{expression}': expected FIELD OPERATOR VALUE with one of {' '.join(OPERATORS)}")
+    field, operator, value = match.group(1), match.group(2), _unquote(match.group(3))
+    if field not in FIELDS:
+        raise ValueError(f"Unknown field '{field}' in filter '{expression}'")
+
+    if field == 'dependencies':
+        if operator not in ('=', '~', '!='):
+            raise ValueError(f"Dependencies can only be filtered with =, ~ or !=: '{expression}'")
+        negation = 'NOT ' if operator == '!=' else ''
+        if operator == '~':
+            return (f"filename IN (SELECT filename FROM work_unit_dependencies WHERE dependency LIKE ? ESCAPE '\\')",
+                    [_like_pattern(value.upper())])
+        return (f"filename {negation}IN (SELECT filename FROM work_unit_dependencies WHERE dependency = ?)",
+                [value.upper()])
+
+    column = FIELDS[field][1]
+    if field == 'completion':
+        try:
+            value = int(value.rstrip('%'))
+        except ValueError:
+            raise ValueError(f"Completion must be compared with a number: '{expression}'")
+        if operator == '~':
+            raise ValueError(f"Completion cannot be filtered with ~: '{expression}'")
+
+    if operator == '~':
+        return f"{column} LIKE ? ESCAPE '\\'", [_like_pattern(value)]
+    if operator == '!=':
+        return f"({column} IS NULL OR {column} != ?)", [value]
+    return f"{column} {operator} ?", [value]
+
+def parse_sort(sort):
+    """Translate comma-separated sort fields (FIELD:desc or -FIELD for descending) into an ORDER BY clause."""
+    terms = []
+    for name in (part.strip() for part in sort.split(',')):
+        if not name:
+            continue
+        name, _, direction = name.partition(':')
+        direction = direction.strip().lower()
+        if direction not in ('', 'asc', 'desc'):
+            raise ValueError(f"Unknown sort direction '{direction}' (use asc or desc)")
+        descending = direction == 'desc' or name.startswith('-')
+        name = name.strip().lstrip('-+')
+        if name not in FIELDS or FIELDS[name][1] is None:
+            raise ValueError(f"Cannot sort by '{name}'")
+        terms.append(f"{FIELDS[name][1]} {'DESC' if descending else 'ASC'}")
+    return ', '.join(terms)
+
+def parse_fields(fields):
+    """Return the list of output fields named in a comma-separated string."""
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    for name in names:
+        if name not in FIELDS:
+            raise ValueError(f"Unknown field '{name}'")
+    return names
+
+def query_work_units(filters=(), sort='id', fields=DEFAULT_FIELDS, limit=None, refresh=True):
+    """Return the indexed work units matching every filter expression, as a list of dicts of the requested fields."""
+    conditions = ['status IS NOT NULL']
+    parameters = []
+    for expression in filters:
+        condition, values = parse_filter(expression)
+        conditions.append(condition)
+        parameters += values
+
+    order = parse_sort(sort) if sort else ''
+    sql = (f"SELECT {', '.join(FIELDS[name][0] for name in fields)} FROM work_units "
+           f"WHERE {' AND '.join(conditions)}")
+    if order:
+        sql += f" ORDER BY {order}, filename"
+    if limit is not None:
+        sql += " LIMIT ?"
+        parameters.append(limit)
+
+    if refresh:
+        refresh_index()
+    rows = get_connection().execute(sql, parameters).fetchall()
+    return [dict(zip(fields, tuple(row))) for row in rows]
+
+def format_table(work_units, fields):
+    """Format work units as an aligned text table."""
+    rows = [[str(work_unit[name]) if work_unit[name] is not None else '' for name in fields] for work_unit in work_units]
+    widths = [max([len(name)] + [len(row[i]) for row in rows]) for i, name in enumerate(fields)]
+    lines = ['  '.join(name.ljust(width) for name, width in zip(fields, widths)).rstrip(),
+             '  '.join('-' * width for width in widths)]
+    lines += ['  '.join(value.ljust(width) for value, width in zip(row, widths)).rstrip() for row in rows]
+    return '\n'.join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description='Query work units from the work unit index.')
+    parser.add_argument('--filter', action='append', default=[], metavar='EXPR', help='Filter expression, e.g. "completion>=50" (repeatable)')
+    parser.add_argument('--sort', default='id', help='Comma-separated sort fields; FIELD:desc (or --sort=-FIELD) for descending order')
+    parser.add_argument('--fields', default=','.join(DEFAULT_FIELDS), help='Comma-separated fields to output')
+    parser.add_argument('--limit', type=int, help='Output at most N work units')
+    parser.add_argument('--format', choices=['table', 'json', 'csv'], default='table', help='Output format')
+    parser.add_argument('--no-refresh', action='store_true', help='Query the index without checking the work unit files for changes')
+    args = parser.parse_args()
+
+    try:
+        fields = parse_fields(args.fields)
+        work_units = query_work_units(args.filter, args.sort, fields, args.limit, refresh=not args.no_refresh)
+    except ValueError as e:
+        print(e)
+        return False
+
+    if args.format == 'json':
+        print(json.dumps(work_units, indent=2, ensure_ascii=False))
+    elif args.format == 'csv':
+        writer = csv.DictWriter(sys.stdout, fieldnames=fields, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(work_units)
+    else:
+        print(format_table(work_units, fields))
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
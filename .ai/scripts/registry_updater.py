@@ -5,196 +5,304 @@ Registry Updater Script
 This script automatically updates the registry.md file when work units are created, modified, or deleted.
 It scans the work_units directory, extracts metadata from work unit files, and updates the registry accordingly.
 
+Regeneration is incremental: metadata comes from the work unit index, rendered entries are cached in a
+manifest keyed by each file's content hash, and the registry is only rewritten when its content changes.
+The output is a pure function of the work unit contents (dates come from each unit's own Last Updated
+field), so an unchanged set of work units always renders to the same bytes.
+
+Alongside registry.md the script writes registry.json, a compact sidecar with typed fields (numeric
+completion, dependency ID lists, ISO dates). Tools that need registry data should load it through
+load_registry() instead of parsing the markdown, which is only a rendered view.
+
 Usage:
-    python registry_updater.py [--check-only]
+    python registry_updater.py [--check-only] [--jobs N]
 
 Options:
     --check-only    Only check for inconsistencies without making changes
+    --jobs N        Number of processes used to extract changed work units (0 = one per CPU)
 """
 
 import os
-import re
 import sys
+import json
+import hashlib
 import argparse
 from datetime import datetime
 
+# Import the shared work unit parser
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from work_unit_parser import parse_work_unit, summarize, extract_work_unit_ids
+from work_unit_index import list_work_units
+from file_store import write_text_file, write_atomic
+from template_engine import get_template, template_fingerprint
+
 # Constants
 WORK_UNITS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "work_units")
 REGISTRY_FILE = os.path.join(WORK_UNITS_DIR, "registry.md")
+SIDECAR_FILE = os.path.join(WORK_UNITS_DIR, "registry.json")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")
+MANIFEST_FILE = os.path.join(CACHE_DIR, "registry_manifest.json")
+
+# Bump whenever the rendered entry format changes so cached entries are discarded; changes to the
+# registry templates discard them as well
+MANIFEST_VERSION = 3
+REGISTRY_TEMPLATES = ('registry_entry.md', 'registry.md')
 
-# Regular expressions for extracting metadata
-ID_PATTERN = re.compile(r'^\s*-\s*\*\*ID\*\*:\s*([^\n]+)', re.MULTILINE)
-STATUS_PATTERN = re.compile(r'^\s*-\s*\*\*Status\*\*:\s*([^\n]+)', re.MULTILINE)
-COMPLETION_PATTERN = re.compile(r'^\s*-\s*\*\*Completion\*\*:\s*([^\n]+)', re.MULTILINE)
-DESCRIPTION_PATTERN = re.compile(r'^\s*-\s*\*\*Description\*\*:\s*([^\n]+)', re.MULTILINE)
-RELATIONSHIP_PATTERN = re.compile(r'^\s*-\s*\*\*Relationship Type\*\*:\s*([^\n]+)', re.MULTILINE)
-DEPENDENCIES_PATTERN = re.compile(r'^\s*-\s*\*\*Dependencies\*\*:\s*([^\n]+)', re.MULTILINE)
-TITLE_PATTERN = re.compile(r'^#\s+Work Unit:\s+([^\n]+)', re.MULTILINE)
+# Bump whenever the fields of registry.json change
+SIDECAR_VERSION = 1
 
 def extract_metadata(file_path):
     """Extract metadata from a work unit file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Extract title as fallback for description
-        title_match = TITLE_PATTERN.search(content)
-        title = title_match.group(1) if title_match else os.path.basename(file_path)
-        
-        # Extract other metadata
-        id_match = ID_PATTERN.search(content)
-        status_match = STATUS_PATTERN.search(content)
-        completion_match = COMPLETION_PATTERN.search(content)
-        description_match = DESCRIPTION_PATTERN.search(content)
-        relationship_match = RELATIONSHIP_PATTERN.search(content)
-        dependencies_match = DEPENDENCIES_PATTERN.search(content)
-        
-        # Process completion percentage
-        completion = '0%'
-        if completion_match:
-            completion_value = completion_match.group(1).strip()
-            # Ensure it ends with %
-            if not completion_value.endswith('%'):
-                try:
-                    # Try to convert to int and add % sign
-                    completion = f"{int(completion_value)}%"
-                except ValueError:
-                    completion = '0%'
-            else:
-                completion = completion_value
-        
-        return {
-            'id': id_match.group(1).strip() if id_match else None,
-            'status': status_match.group(1).strip() if status_match else 'Proposed',
-            'completion': completion,
-            'description': description_match.group(1).strip() if description_match else title,
-            'relationship': relationship_match.group(1).strip() if relationship_match else 'Independent',
-            'dependencies': dependencies_match.group(1).strip() if dependencies_match else 'None',
-            'path': os.path.basename(file_path),
-            'title': title
-        }
+        return summarize(parse_work_unit(file_path))
     except Exception as e:
         print(f"Error extracting metadata from {file_path}: {e}")
         return None
 
-def scan_work_units():
-    """Scan the work_units directory and extract metadata from all work unit files."""
-    work_units = []
-    
+def scan_work_units(jobs=1):
+    """Return the metadata of all work unit files.
+
+    Metadata comes from the persistent work unit index, so only files that changed since the
+    last run are re-extracted, over `jobs` processes.
+    """
     if not os.path.exists(WORK_UNITS_DIR):
         print(f"Work units directory not found: {WORK_UNITS_DIR}")
-        return work_units
+        return []
     
-    for filename in os.listdir(WORK_UNITS_DIR):
-        if filename.endswith('.md') and filename != 'registry.md' and filename != 'project_tracker.md':
-            file_path = os.path.join(WORK_UNITS_DIR, filename)
-            metadata = extract_metadata(file_path)
-            if metadata:
-                work_units.append(metadata)
-    
-    return work_units
+    # Entries without a status could not be extracted; the index has already logged why
+    return [wu for wu in list_work_units(jobs) if wu['status'] is not None]
+
+def load_manifest():
+    """Load the manifest of rendered registry entries from the last run."""
+    templates = template_fingerprint(*REGISTRY_TEMPLATES)
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {'version': MANIFEST_VERSION, 'templates': templates, 'entries': {}}
+    if manifest.get('version') != MANIFEST_VERSION or manifest.get('templates') != templates:
+        return {'version': MANIFEST_VERSION, 'templates': templates, 'entries': {}}
+    return manifest
+
+def save_manifest(manifest):
+    """Write the manifest atomically so an interrupted or concurrent run cannot corrupt it."""
+    write_atomic(MANIFEST_FILE, json.dumps(manifest, ensure_ascii=False).encode('utf-8'))
+
+def _date(value):
+    """Return the date part of a `YYYY-MM-DD HH:MM` timestamp, or None if there is none."""
+    return value.split()[0] if value and value.strip() else None
+
+def fingerprint_work_units(work_units):
+    """Hash the filenames and content hashes of a set of work units, in filename order."""
+    digest = hashlib.sha256(f"registry-v{MANIFEST_VERSION}\n".encode('utf-8'))
+    for unit in sorted(work_units, key=lambda wu: wu['path']):
+        digest.update(f"{unit['path']}\0{unit['content_hash']}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def inputs_fingerprint():
+    """Hash everything registry validation depends on: every work unit and the registry file itself."""
+    digest = hashlib.sha256(fingerprint_work_units(scan_work_units()).encode('utf-8'))
+    if os.path.exists(REGISTRY_FILE):
+        with open(REGISTRY_FILE, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
 
-def generate_registry_content(work_units):
-    """Generate the content for the registry.md file."""
-    # Sort work units by ID
+def _registry_state():
+    """Return the (mtime_ns, size) of the registry file, or None if it does not exist."""
+    try:
+        stat_result = os.stat(REGISTRY_FILE)
+    except OSError:
+        return None
+    return [stat_result.st_mtime_ns, stat_result.st_size]
+
+def _iso_date(value):
+    """Return the ISO date of a `YYYY-MM-DD[ HH:MM]` timestamp, or None if it is not a valid date."""
+    date = _date(value)
+    try:
+        return datetime.strptime(date, '%Y-%m-%d').date().isoformat() if date else None
+    except ValueError:
+        return None
+
+def _completion_value(completion):
+    """Return a `NN%` completion as an integer."""
+    try:
+        return int(float((completion or '0').strip().rstrip('%')))
+    except ValueError:
+        return 0
+
+def _order_work_units(work_units):
+    """Split work units into (active, completed), each sorted by ID, in registry order."""
     completed_units = [wu for wu in work_units if wu['status'].lower() == 'completed']
     active_units = [wu for wu in work_units if wu['status'].lower() != 'completed']
     
     # Sort by ID (assuming ID format like WU-001)
     completed_units.sort(key=lambda x: x['id'] if x['id'] else '')
     active_units.sort(key=lambda x: x['id'] if x['id'] else '')
+    return active_units, completed_units
+
+def render_entry(unit):
+    """Render the registry entry of a single work unit."""
+    return get_template('registry_entry.md').render({'unit': unit, 'last_updated': _date(unit['last_updated']) or 'Unknown'})
+
+def render_entries(work_units, manifest):
+    """Return the rendered entry of every work unit, re-rendering only units whose content changed.
+
+    Returns a tuple of (entries by filename, number of re-rendered entries, number of removed entries)
+    and updates the manifest in place.
+    """
+    cached = manifest['entries']
+    entries = {}
+    rendered = 0
+    for unit in work_units:
+        cached_entry = cached.get(unit['path'])
+        if cached_entry and unit['content_hash'] and cached_entry['hash'] == unit['content_hash']:
+            entries[unit['path']] = cached_entry['entry']
+        else:
+            entries[unit['path']] = render_entry(unit)
+            rendered += 1
     
-    content = "# Work Unit Registry\n\n"
-    
-    # Active Work Units
-    content += "## Active Work Units\n\n"
-    for unit in active_units:
-        content += f"### {unit['id']}: {unit['title']}\n"
-        content += f"- **Status**: {unit['status']}\n"
-        content += f"- **Completion**: {unit['completion']}\n"
-        content += f"- **Description**: {unit['description']}\n"
-        content += f"- **Relationship Type**: {unit['relationship']}\n"
-        content += f"- **Dependencies**: {unit['dependencies']}\n"
-        content += f"- **Last Updated**: {datetime.now().strftime('%Y-%m-%d')}\n"
-        content += f"- **Path**: [./{unit['path']}](./{unit['path']})\n\n"
-    
-    # Completed Work Units
-    if completed_units:
-        content += "## Completed Work Units\n\n"
-        for unit in completed_units:
-            content += f"### {unit['id']}: {unit['title']}\n"
-            content += f"- **Status**: {unit['status']}\n"
-            content += f"- **Completion**: {unit['completion']}\n"
-            content += f"- **Description**: {unit['description']}\n"
-            content += f"- **Relationship Type**: {unit['relationship']}\n"
-            content += f"- **Dependencies**: {unit['dependencies']}\n"
-            content += f"- **Last Updated**: {datetime.now().strftime('%Y-%m-%d')}\n"
-            content += f"- **Path**: [./{unit['path']}](./{unit['path']})\n\n"
-    
-    # Generate hierarchy diagram
-    content += "## Work Unit Hierarchy\n\n```\n"
-    for unit in active_units + completed_units:
-        content += f"{unit['id']}: {unit['title']} ({unit['completion']} complete)\n\n"
-    content += "```\n\n"
-    
-    # Registry maintenance section
-    content += """## Registry Maintenance
-
-This registry is maintained to track all work units in the AI Documentation Framework. Each entry includes status, relationships, dependencies, and other metadata to provide a comprehensive overview of the framework's development.
-
-### Maintenance Protocol
-
-1. **Adding New Work Units**:
-   - Create a new entry in the appropriate section
-   - Include all required metadata
-   - Update the hierarchy diagram
-
-2. **Updating Existing Work Units**:
-   - Update the status, completion percentage, and last updated date
-   - Modify relationships and dependencies as needed
-   - Ensure the hierarchy diagram reflects any changes
-
-3. **Completing Work Units**:
-   - Move the entry from Active to Completed section
-   - Update the completion percentage to 100%
-   - Add the completion date
-
-## Last Updated
-"""
-    content += datetime.now().strftime('%Y-%m-%d')
+    removed = len(set(cached) - set(entries))
+    manifest['entries'] = {
+        unit['path']: {'hash': unit['content_hash'], 'entry': entries[unit['path']]} for unit in work_units
+    }
+    return entries, rendered, removed
+
+def generate_registry_content(work_units, entries=None):
+    """Generate the content for the registry.md file.
     
-    return content
+    Pre-rendered entries (by work unit filename) are reused where given.
+    """
+    entries = entries or {}
+    active_units, completed_units = _order_work_units(work_units)
+    
+    # Registry maintenance section, dated by the most recently updated work unit
+    dates = [_date(unit.get('last_updated')) for unit in work_units]
+    
+    return get_template('registry.md').render({
+        'active_entries': [entries.get(unit['path']) or render_entry(unit) for unit in active_units],
+        'completed_entries': [entries.get(unit['path']) or render_entry(unit) for unit in completed_units],
+        'units': active_units + completed_units,
+        'last_updated': max((date for date in dates if date), default='Unknown')
+    })
+
+def registry_record(unit):
+    """Return the typed sidecar record of a work unit."""
+    return {
+        'id': unit['id'],
+        'title': unit['title'],
+        'status': unit['status'],
+        'completion': _completion_value(unit['completion']),
+        'description': unit['description'],
+        'relationship': unit['relationship'],
+        'dependencies': extract_work_unit_ids(unit['dependencies']),
+        'type': unit.get('type'),
+        'last_updated': _iso_date(unit.get('last_updated')),
+        'path': unit['path']
+    }
+
+def generate_sidecar_content(work_units, registry_content):
+    """Generate the content of registry.json for the registry rendered from the same work units."""
+    active_units, completed_units = _order_work_units(work_units)
+    sidecar = {
+        'version': SIDECAR_VERSION,
+        'registry_sha256': hashlib.sha256(registry_content.encode('utf-8')).hexdigest(),
+        'work_units': [registry_record(unit) for unit in active_units + completed_units]
+    }
+    return json.dumps(sidecar, ensure_ascii=False, separators=(',', ':')) + '\n'
 
-def update_registry(check_only=False):
-    """Update the registry.md file with the current work units."""
-    work_units = scan_work_units()
-    new_content = generate_registry_content(work_units)
+def load_registry(verify=True):
+    """Load the typed registry records from registry.json.
+
+    Returns None if the sidecar is missing, has an unknown version or, when verify is set, was not
+    generated from the current registry.md (for example after a manual edit).
+    """
+    try:
+        with open(SIDECAR_FILE, 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if sidecar.get('version') != SIDECAR_VERSION:
+        return None
     
-    if check_only:
-        if os.path.exists(REGISTRY_FILE):
-            with open(REGISTRY_FILE, 'r', encoding='utf-8') as f:
-                current_content = f.read()
-            if current_content != new_content:
-                print("Registry is out of sync with work units.")
+    if verify:
+        try:
+            with open(REGISTRY_FILE, 'rb') as f:
+                registry_hash = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+        if registry_hash != sidecar.get('registry_sha256'):
+            return None
+    
+    return sidecar['work_units']
+
+def _write_if_changed(file_path, content):
+    """Write a text file unless it already has exactly this content. Returns True if it was written."""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
                 return False
-            else:
-                print("Registry is up to date.")
-                return True
-        else:
+    except OSError:
+        pass
+    write_text_file(file_path, content)
+    return True
+
+def update_registry(check_only=False, jobs=1):
+    """Update the registry.md file with the current work units.
+    
+    Only entries of work units whose content changed are re-rendered, and the registry file is
+    left untouched when the generated content is identical to it. If neither the work units nor
+    the registry file changed since the last run, nothing is rendered at all.
+    """
+    work_units = scan_work_units(jobs)
+    manifest = load_manifest()
+    inputs_hash = fingerprint_work_units(work_units)
+    registry_state = _registry_state()
+    
+    if (registry_state and os.path.exists(SIDECAR_FILE) and manifest.get('inputs_hash') == inputs_hash
+            and manifest.get('registry_state') == registry_state):
+        print("Registry is up to date." if check_only else f"Registry is up to date: {REGISTRY_FILE}")
+        return True
+    
+    entries, rendered, removed = render_entries(work_units, manifest)
+    new_content = generate_registry_content(work_units, entries)
+    
+    current_content = None
+    if os.path.exists(REGISTRY_FILE):
+        with open(REGISTRY_FILE, 'r', encoding='utf-8') as f:
+            current_content = f.read()
+    
+    if check_only:
+        if current_content is None:
             print("Registry file does not exist.")
             return False
-    else:
-        with open(REGISTRY_FILE, 'w', encoding='utf-8') as f:
-            f.write(new_content)
-        print(f"Registry updated successfully: {REGISTRY_FILE}")
+        if current_content != new_content:
+            print("Registry is out of sync with work units.")
+            return False
+        print("Registry is up to date.")
         return True
+    
+    updated = current_content != new_content
+    if updated:
+        write_text_file(REGISTRY_FILE, new_content)
+    _write_if_changed(SIDECAR_FILE, generate_sidecar_content(work_units, new_content))
+    
+    manifest['inputs_hash'] = inputs_hash
+    manifest['registry_state'] = _registry_state()
+    save_manifest(manifest)
+    
+    if updated:
+        print(f"Registry updated successfully: {REGISTRY_FILE} ({rendered} entries re-rendered, {removed} removed)")
+    else:
+        print(f"Registry is up to date: {REGISTRY_FILE}")
+    return True
 
 def main():
     parser = argparse.ArgumentParser(description='Update the work unit registry.')
     parser.add_argument('--check-only', action='store_true', help='Only check for inconsistencies without making changes')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of processes used to extract changed work units (0 = one per CPU)')
     args = parser.parse_args()
     
-    return update_registry(args.check_only)
+    return update_registry(args.check_only, args.jobs)
 
 if __name__ == "__main__":
     sys.exit(0 if main() else 1)
@@ -5,12 +5,17 @@ Registry Validator Script
 This script validates the consistency between work unit files and the registry.md file.
 It identifies missing or outdated registry entries, orphaned work units, and inconsistent relationships.
 
+Every issue carries the rule ID registry-consistency, its issue type, a severity and the work unit
+file it refers to, so the report can also be written as JSON or SARIF. After --fix only the work
+units that had issues are validated again.
+
 Usage:
-    python registry_validator.py [--fix] [--report-file REPORT_FILE]
+    python registry_validator.py [--fix] [--report-file REPORT_FILE] [--format FORMAT]
 
 Options:
     --fix               Automatically fix inconsistencies
     --report-file FILE  Save the validation report to a file
+    --format FORMAT     Report format: markdown (default), json or sarif
 """
 
 import os
@@ -18,18 +23,43 @@ import re
 import sys
 import json
 import argparse
+from contextlib import redirect_stdout
 from datetime import datetime
 
 # Import the registry updater to reuse functions
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from registry_updater import scan_work_units, extract_metadata, WORK_UNITS_DIR, REGISTRY_FILE
+from registry_updater import scan_work_units, extract_metadata, load_registry, WORK_UNITS_DIR, REGISTRY_FILE
+from dependency_graph import DependencyGraph, DEPENDS_ON, PARENT
+from validation_output import FORMATS, render
+from template_engine import get_template
+
+# Rule descriptor used in structured output
+RULE = {'id': 'registry-consistency', 'description': "Work units and registry.md agree; references point at existing units",
+        'severity': 'medium'}
 
 # Regular expressions for parsing registry.md
 REGISTRY_ENTRY_PATTERN = re.compile(r'###\s+([^:]+):\s+([^\n]+)\n((?:\s*-\s*\*\*[^\n]+\n)+)', re.MULTILINE)
 REGISTRY_METADATA_PATTERN = re.compile(r'\s*-\s*\*\*([^:]+)\*\*:\s*([^\n]+)', re.MULTILINE)
 
 def parse_registry():
-    """Parse the registry.md file and extract work unit entries."""
+    """Extract the work unit entries of the registry.
+    
+    Entries are loaded from the registry.json sidecar when it matches registry.md; the markdown is
+    only parsed if the sidecar is missing or stale.
+    """
+    records = load_registry()
+    if records is not None:
+        return [{
+            'id': record['id'],
+            'description': record['description'],
+            'status': record['status'],
+            'completion': f"{record['completion']}%",
+            'relationship type': record['relationship'],
+            'dependencies': ', '.join(record['dependencies']) or 'None',
+            'last updated': record['last_updated'],
+            'path': record['path']
+        } for record in records if record['id']]
+    
     if not os.path.exists(REGISTRY_FILE):
         return []
     
@@ -52,32 +82,27 @@ def parse_registry():
     
     return registry_entries
 
-def validate_registry():
-    """Validate the registry against work unit files and identify inconsistencies."""
-    work_units = scan_work_units()
-    registry_entries = parse_registry()
-    
-    # Create dictionaries for easier lookup
-    work_units_dict = {wu['id']: wu for wu in work_units if wu['id']}
-    registry_dict = {entry['id']: entry for entry in registry_entries if 'id' in entry}
+def validate_entry(wu_id, work_units_dict, registry_dict, graph=None):
+    """Validate a single work unit ID against the registry and return its issues.
     
+    With a dependency graph, every referenced unit (dependencies, parents, children and related
+    units) is checked and dependency cycles are reported.
+    """
     issues = []
+    wu = work_units_dict.get(wu_id)
+    reg_entry = registry_dict.get(wu_id)
     
     # Check for missing registry entries
-    for wu_id, wu in work_units_dict.items():
-        if wu_id not in registry_dict:
-            issues.append({
-                'type': 'missing_entry',
-                'severity': 'high',
-                'message': f"Work unit {wu_id} exists but is not in the registry",
-                'work_unit': wu
-            })
+    if wu is not None and reg_entry is None:
+        issues.append({
+            'type': 'missing_entry',
+            'severity': 'high',
+            'message': f"Work unit {wu_id} exists but is not in the registry",
+            'work_unit': wu
+        })
     
     # Check for outdated registry entries
-    for wu_id in set(work_units_dict.keys()) & set(registry_dict.keys()):
-        wu = work_units_dict[wu_id]
-        reg_entry = registry_dict[wu_id]
-        
+    if wu is not None and reg_entry is not None:
         # Check for status mismatch
         if 'status' in wu and 'status' in reg_entry and wu['status'] != reg_entry['status']:
             issues.append({
@@ -109,27 +134,86 @@ def validate_registry():
             })
     
     # Check for orphaned registry entries
-    for reg_id, reg_entry in registry_dict.items():
-        if reg_id not in work_units_dict:
-            issues.append({
-                'type': 'orphaned_entry',
-                'severity': 'high',
-                'message': f"Registry entry {reg_id} exists but the work unit file is missing",
-                'registry_entry': reg_entry
-            })
+    if wu is None and reg_entry is not None:
+        issues.append({
+            'type': 'orphaned_entry',
+            'severity': 'high',
+            'message': f"Registry entry {wu_id} exists but the work unit file is missing",
+            'registry_entry': reg_entry
+        })
     
     # Check for relationship consistency
-    for wu_id, wu in work_units_dict.items():
-        if 'relationship' in wu and wu['relationship'].startswith('Related to '):
-            related_id = wu['relationship'].replace('Related to ', '').strip()
-            if related_id not in work_units_dict:
+    if wu is not None and graph is not None:
+        for kind, source, target in graph.references(wu_id):
+            if kind == PARENT and source != wu_id:
+                missing_id, message = source, f"Work unit {wu_id} lists non-existent child unit {source}"
+            elif kind == PARENT:
+                missing_id, message = target, f"Work unit {wu_id} has non-existent parent unit {target}"
+            elif kind == DEPENDS_ON:
+                missing_id, message = target, f"Work unit {wu_id} depends on non-existent work unit {target}"
+            else:
+                missing_id, message = target, f"Work unit {wu_id} references non-existent work unit {target}"
+            if missing_id not in work_units_dict:
                 issues.append({
                     'type': 'invalid_relationship',
                     'severity': 'medium',
-                    'message': f"Work unit {wu_id} references non-existent work unit {related_id}",
+                    'message': message,
                     'work_unit': wu
                 })
+        
+        # Check for dependency cycles
+        cycle = graph.cycle_of(wu_id)
+        if cycle:
+            issues.append({
+                'type': 'dependency_cycle',
+                'severity': 'high',
+                'message': f"Work unit {wu_id} is part of a dependency cycle: {', '.join(cycle)}",
+                'work_unit': wu
+            })
+    elif wu is not None and 'relationship' in wu and wu['relationship'].startswith('Related to '):
+        related_id = wu['relationship'].replace('Related to ', '').strip()
+        if related_id not in work_units_dict:
+            issues.append({
+                'type': 'invalid_relationship',
+                'severity': 'medium',
+                'message': f"Work unit {wu_id} references non-existent work unit {related_id}",
+                'work_unit': wu
+            })
+    
+    # Locate every issue for structured output
+    for issue in issues:
+        issue['rule'] = RULE['id']
+        issue['work_unit_id'] = wu_id
+        issue['file'] = os.path.join(WORK_UNITS_DIR, wu['path']) if wu is not None else REGISTRY_FILE
+    
+    return issues
+
+def load_validation_inputs():
+    """Return the work units and registry entries, each as a dict keyed by work unit ID, and the dependency graph."""
+    work_units = scan_work_units()
+    registry_entries = parse_registry()
     
+    work_units_dict = {wu['id']: wu for wu in work_units if wu['id']}
+    registry_dict = {entry['id']: entry for entry in registry_entries if 'id' in entry}
+    graph = DependencyGraph()
+    for wu in work_units:
+        graph.update_unit(wu)
+    return work_units_dict, registry_dict, graph
+
+def validate_registry(work_unit_ids=None):
+    """Validate the registry against work unit files and identify inconsistencies.
+    
+    If work_unit_ids is given, only those IDs are checked.
+    """
+    work_units_dict, registry_dict, graph = load_validation_inputs()
+    
+    if work_unit_ids is None:
+        # Work units first, then orphaned registry entries, as in the report
+        work_unit_ids = list(work_units_dict) + [reg_id for reg_id in registry_dict if reg_id not in work_units_dict]
+    
+    issues = []
+    for wu_id in work_unit_ids:
+        issues.extend(validate_entry(wu_id, work_units_dict, registry_dict, graph))
     return issues
 
 def fix_issues(issues):
@@ -144,70 +228,45 @@ def fix_issues(issues):
 
 def generate_report(issues):
     """Generate a human-readable validation report."""
-    if not issues:
-        return "No issues found. Registry is consistent with work unit files."
-    
-    report = "# Registry Validation Report\n\n"
-    report += f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-    
     # Group issues by severity
-    high_issues = [issue for issue in issues if issue['severity'] == 'high']
-    medium_issues = [issue for issue in issues if issue['severity'] == 'medium']
-    low_issues = [issue for issue in issues if issue['severity'] == 'low']
-    
-    report += f"Found {len(issues)} issues:\n"
-    report += f"- {len(high_issues)} high severity\n"
-    report += f"- {len(medium_issues)} medium severity\n"
-    report += f"- {len(low_issues)} low severity\n\n"
-    
-    # Report high severity issues
-    if high_issues:
-        report += "## High Severity Issues\n\n"
-        for issue in high_issues:
-            report += f"- {issue['message']}\n"
-        report += "\n"
-    
-    # Report medium severity issues
-    if medium_issues:
-        report += "## Medium Severity Issues\n\n"
-        for issue in medium_issues:
-            report += f"- {issue['message']}\n"
-        report += "\n"
-    
-    # Report low severity issues
-    if low_issues:
-        report += "## Low Severity Issues\n\n"
-        for issue in low_issues:
-            report += f"- {issue['message']}\n"
-        report += "\n"
-    
-    report += "## Recommended Actions\n\n"
-    report += "1. Run `python registry_validator.py --fix` to automatically fix most issues\n"
-    report += "2. Manually review any remaining issues, especially relationship inconsistencies\n"
-    
-    return report
+    groups = []
+    for severity in ('high', 'medium', 'low'):
+        matching = [issue for issue in issues if issue['severity'] == severity]
+        groups.append({'severity': severity, 'title': severity.title(), 'count': len(matching), 'issues': matching})
+    
+    return get_template('registry_validation_report.md').render({
+        'issues': issues,
+        'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'total': len(issues),
+        'groups': groups
+    })
 
 def main():
     parser = argparse.ArgumentParser(description='Validate the work unit registry.')
     parser.add_argument('--fix', action='store_true', help='Automatically fix inconsistencies')
     parser.add_argument('--report-file', help='Save the validation report to a file')
+    parser.add_argument('--format', choices=FORMATS, default='markdown', help='Report format')
     args = parser.parse_args()
     
+    # Keep stdout parseable when it carries a JSON or SARIF report
+    status = sys.stdout if args.format == 'markdown' else sys.stderr
+    
     issues = validate_registry()
     
-    if args.fix:
-        fixed_count = fix_issues(issues)
-        print(f"Fixed {fixed_count} issues.")
-        # Re-validate to see if any issues remain
-        issues = validate_registry()
+    if args.fix and issues:
+        with redirect_stdout(status):
+            fixed_count = fix_issues(issues)
+        print(f"Fixed {fixed_count} issues.", file=status)
+        # Re-validate only the work units that had issues; the fix regenerates their registry entries
+        issues = validate_registry(list(dict.fromkeys(issue['work_unit_id'] for issue in issues)))
     
-    report = generate_report(issues)
+    report = render(issues, [RULE], args.format, generate_report(issues))
     print(report)
     
     if args.report_file:
         with open(args.report_file, 'w', encoding='utf-8') as f:
             f.write(report)
-        print(f"Report saved to {args.report_file}")
+        print(f"Report saved to {args.report_file}", file=status)
     
     return len(issues) == 0
 
@@ -3,29 +3,59 @@
 Scheduled Validation Script
 
 This script runs scheduled validation checks on the framework and generates reports.
-It can be set up as a cron job or scheduled task to run periodically.
+It can be set up as a cron job or scheduled task to run periodically. All checks are the rules of
+validation_rules.py, which run in a single parse pass over the work units.
+When nothing validation depends on changed since the last run (the work units, the registry, the
+files the work units link to, the selected rules and the scripts themselves), the previous result is
+reused and no validation work is done.
+
+With --watch the script keeps running instead: it polls work_units/, requirements/ and _core/,
+waits for a burst of edits to settle, and runs the validation rules again only on the changed work
+units, their dependency neighbours (prerequisites, dependents, parents and children, before and after
+the edit, from the dependency graph of dependency_graph.py) and the work units whose links touch a
+changed document (found through the cached link graph of link_graph.py); the corpus rules run again
+on the metadata kept in memory.
 
 Usage:
-    python scheduled_validation.py [--fix] [--report-dir REPORT_DIR]
+    python scheduled_validation.py [--fix] [--report-dir REPORT_DIR] [--force] [--format FORMAT]
+    python scheduled_validation.py --watch [--interval SECONDS] [--debounce SECONDS]
 
 Options:
     --fix                Automatically fix inconsistencies
     --report-dir DIR     Directory to save validation reports (default: ../logs)
+    --force              Run all checks even if the inputs are unchanged
+    --format FORMAT      Format of the saved report: markdown (default), json or sarif
+    --watch              Keep running and revalidate affected work units whenever files change
+    --interval SECONDS   Polling interval in watch mode (default: 0.5)
+    --debounce SECONDS   Quiet period to wait for after a change before revalidating (default: 0.3)
 """
 
 import os
 import sys
+import json
+import time
+import hashlib
 import argparse
 import logging
 from datetime import datetime
 
 # Import validation scripts
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-import registry_validator
 import registry_updater
+import validation_rules
+from validation_output import FORMATS, FORMAT_EXTENSIONS, render
+from work_unit_index import is_work_unit_file, list_work_units
+from dependency_graph import DependencyGraph
+from link_graph import load_link_graph
+from file_store import write_atomic
 
 # Set up logging
 LOGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")
+STATE_FILE = os.path.join(CACHE_DIR, "scheduled_validation.json")
+AI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+WATCHED_DIRS = [os.path.join(AI_DIR, name) for name in ("work_units", "requirements", "_core")]
 os.makedirs(LOGS_DIR, exist_ok=True)
 
 logging.basicConfig(
@@ -39,64 +69,223 @@ logging.basicConfig(
 
 logger = logging.getLogger('scheduled_validation')
 
-def run_registry_validation(fix=False, report_dir=None):
-    """Run registry validation and generate a report."""
-    logger.info("Running registry validation...")
+def run_rule_validation(fix=False, report_dir=None, report_format='markdown'):
+    """Run every validation rule in a single pass over the work units and generate one report."""
+    logger.info("Running validation rules...")
     
-    issues = registry_validator.validate_registry()
+    result = validation_rules.run_validation()
     
-    if fix:
-        logger.info("Fixing registry issues...")
-        fixed_count = registry_validator.fix_issues(issues)
-        logger.info(f"Fixed {fixed_count} registry issues.")
-        # Re-validate to see if any issues remain
-        issues = registry_validator.validate_registry()
+    if fix and result['issues']:
+        logger.info("Fixing validation issues...")
+        touched = validation_rules.fix_issues(result['issues'])
+        logger.info(f"Fixed issues in {len(touched)} files.")
+        # Re-validate only the files the fixes touched
+        result = validation_rules.revalidate(result, touched)
     
-    report = registry_validator.generate_report(issues)
+    report = render(result['issues'], validation_rules.rule_descriptors(result['rules']), report_format,
+                    validation_rules.generate_report(result))
     
     if report_dir:
         os.makedirs(report_dir, exist_ok=True)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        report_file = os.path.join(report_dir, f'registry_validation_{timestamp}.md')
+        report_file = os.path.join(report_dir, f'validation_{timestamp}{FORMAT_EXTENSIONS[report_format]}')
         with open(report_file, 'w', encoding='utf-8') as f:
             f.write(report)
-        logger.info(f"Registry validation report saved to {report_file}")
+        logger.info(f"Validation report saved to {report_file}")
     
+    issues = result['issues']
     if issues:
-        logger.warning(f"Found {len(issues)} registry issues.")
+        logger.warning(f"Found {len(issues)} issues across {len(result['rules'])} rules.")
     else:
-        logger.info("No registry issues found.")
+        logger.info("No validation issues found.")
     
     return len(issues) == 0
 
-def run_all_validations(fix=False, report_dir=None):
-    """Run all validation checks."""
+def scripts_version():
+    """Hash the (mtime_ns, size) of the framework scripts, so that a changed rule invalidates earlier results."""
+    digest = hashlib.sha256()
+    for filename in sorted(os.listdir(SCRIPTS_DIR)):
+        if filename.endswith('.py'):
+            try:
+                stat_result = os.stat(os.path.join(SCRIPTS_DIR, filename))
+            except OSError:
+                continue
+            digest.update(f"{filename}\0{stat_result.st_mtime_ns}\0{stat_result.st_size}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def link_targets_state():
+    """Return the sorted (path, exists) of every file the work units link to.
+
+    The links come from the cached link graph, which only re-reads the documents whose stat changed.
+    """
+    link_graph = load_link_graph()
+    targets = set()
+    for file_path in validation_rules.work_unit_files():
+        targets.update(path for path, _, target, _ in link_graph.links_from(file_path) if not target.startswith('#'))
+    return [(path, os.path.exists(path)) for path in sorted(targets)]
+
+def validation_fingerprint(rule_ids=None):
+    """Hash everything a validation run depends on.
+
+    Covers the work units and the registry, the resolved link targets of the work units, the selected
+    rule IDs and the version of the scripts.
+    """
+    digest = hashlib.sha256(registry_updater.inputs_fingerprint().encode('utf-8'))
+    digest.update(f"rules\0{','.join(validation_rules.select_rules(rule_ids))}\n".encode('utf-8'))
+    digest.update(f"scripts\0{scripts_version()}\n".encode('utf-8'))
+    for path, exists in link_targets_state():
+        digest.update(f"{path}\0{exists}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def load_state():
+    """Load the inputs fingerprint and result of the last validation run."""
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_state(fingerprint, valid):
+    """Record the inputs fingerprint and result of this validation run."""
+    state = {'fingerprint': fingerprint, 'valid': valid, 'timestamp': datetime.now().isoformat()}
+    write_atomic(STATE_FILE, json.dumps(state).encode('utf-8'))
+
+def run_all_validations(fix=False, report_dir=None, force=False, report_format='markdown'):
+    """Run all validation checks, skipping them if the inputs are unchanged since the last run."""
     logger.info("Starting scheduled validation...")
     
+    # Skip when nothing changed, unless a fix is requested for a previously failing run
+    state = load_state()
+    fingerprint = validation_fingerprint()
+    if not force and state.get('fingerprint') == fingerprint and (state.get('valid') or not fix):
+        logger.info(f"Inputs unchanged since the last validation ({state.get('timestamp')}), skipping.")
+        return state.get('valid', False)
+    
     # Set default report directory if not specified
     if not report_dir:
         report_dir = LOGS_DIR
     
-    # Run registry validation
-    registry_valid = run_registry_validation(fix, report_dir)
-    
-    # Add more validation checks here as they are developed
+    # Run every registered validation rule in one pass; new checks are added as rules in validation_rules.py
+    valid = run_rule_validation(fix, report_dir, report_format)
     
     # Log summary
-    if registry_valid:
+    if valid:
         logger.info("All validation checks passed.")
     else:
         logger.warning("Some validation checks failed. See reports for details.")
     
-    return registry_valid
+    # Fingerprint again only if --fix may have rewritten work units and the registry
+    save_state(validation_fingerprint() if fix else fingerprint, valid)
+    
+    return valid
+
+def snapshot_files(directories=None):
+    """Return the (mtime_ns, size) of every file under the watched directories."""
+    snapshot = {}
+    for directory in directories or WATCHED_DIRS:
+        for root, _, filenames in os.walk(directory):
+            for filename in filenames:
+                file_path = os.path.join(root, filename)
+                try:
+                    stat_result = os.stat(file_path)
+                except OSError:
+                    continue
+                snapshot[file_path] = (stat_result.st_mtime_ns, stat_result.st_size)
+    return snapshot
+
+def changed_files(previous, current):
+    """Return the paths that were added, removed or modified between two snapshots."""
+    return {path for path in previous.keys() | current.keys() if previous.get(path) != current.get(path)}
+
+def _issue_key(issue):
+    """Identify an issue across validation passes."""
+    return (issue['rule'], issue['file'], issue['message'])
+
+def work_unit_ids(result, file_paths):
+    """Return the IDs the work unit files had in a validation result."""
+    filenames = {os.path.basename(file_path) for file_path in file_paths}
+    return {metadata['id'] for file_path, (metadata, _) in result['file_results'].items()
+            if metadata is not None and metadata['id'] and os.path.basename(file_path) in filenames}
+
+def related_work_units(graph, wu_ids):
+    """Return some work unit IDs plus their prerequisites, dependents, parents and children."""
+    related = set(wu_ids)
+    for wu_id in wu_ids:
+        related.update(graph.prerequisites(wu_id), graph.dependents(wu_id), graph.parents(wu_id), graph.children(wu_id))
+    return related
+
+def watch(interval=0.5, debounce=0.3):
+    """Watch the framework directories and revalidate the affected work units until interrupted."""
+    logger.info(f"Watching {', '.join(WATCHED_DIRS)} for changes...")
+    result = validation_rules.run_validation()
+    logger.info(f"Initial validation: {len(result['issues'])} issues across {len(result['rules'])} rules.")
+    link_graph = load_link_graph()
+    graph = DependencyGraph.from_index()
+    previous = snapshot_files()
+    
+    try:
+        while True:
+            time.sleep(interval)
+            current = snapshot_files()
+            changed = changed_files(previous, current)
+            if not changed:
+                continue
+            
+            # Debounce: wait until a burst of edits has settled
+            while True:
+                time.sleep(debounce)
+                settled = snapshot_files()
+                if settled == current:
+                    break
+                changed |= changed_files(current, settled)
+                current = settled
+            previous = current
+            
+            start = time.perf_counter()
+            # Recheck the changed work units, their dependency neighbours (as declared before and after
+            # the edit) and the work units linking to a changed, added or removed document; the corpus
+            # rules rerun on the cached metadata
+            changed_units = {path for path in changed
+                             if os.path.dirname(path) == WATCHED_DIRS[0] and is_work_unit_file(os.path.basename(path))}
+            related = related_work_units(graph, work_unit_ids(result, changed_units))
+            related |= related_work_units(graph, graph.apply(list_work_units()))
+            touched = changed_units | {os.path.join(WATCHED_DIRS[0], filename)
+                                       for wu_id in related for filename in graph.files(wu_id)}
+            touched |= {path for path in link_graph.sync()
+                        if os.path.dirname(path) == WATCHED_DIRS[0] and is_work_unit_file(os.path.basename(path))}
+            updated = validation_rules.revalidate(result, touched)
+            
+            before = {_issue_key(issue) for issue in result['issues']}
+            after = {_issue_key(issue) for issue in updated['issues']}
+            added = [issue for issue in updated['issues'] if _issue_key(issue) not in before]
+            resolved = [issue for issue in result['issues'] if _issue_key(issue) not in after]
+            result = updated
+            
+            logger.info(f"{len(changed)} files changed; revalidated {len(touched)} work units in {time.perf_counter() - start:.2f}s: "
+                        f"{len(result['issues'])} issues ({len(added)} new, {len(resolved)} resolved)")
+            for issue in added:
+                logger.warning(f"New issue: {issue['message']}")
+            for issue in resolved:
+                logger.info(f"Resolved: {issue['message']}")
+    except KeyboardInterrupt:
+        logger.info("Stopped watching.")
+    return True
 
 def main():
     parser = argparse.ArgumentParser(description='Run scheduled validation checks.')
     parser.add_argument('--fix', action='store_true', help='Automatically fix inconsistencies')
     parser.add_argument('--report-dir', help='Directory to save validation reports')
+    parser.add_argument('--force', action='store_true', help='Run all checks even if the inputs are unchanged')
+    parser.add_argument('--format', choices=FORMATS, default='markdown', help='Format of the saved report')
+    parser.add_argument('--watch', action='store_true', help='Keep running and revalidate affected work units whenever files change')
+    parser.add_argument('--interval', type=float, default=0.5, help='Polling interval in watch mode')
+    parser.add_argument('--debounce', type=float, default=0.3, help='Quiet period to wait for after a change before revalidating')
     args = parser.parse_args()
     
-    return run_all_validations(args.fix, args.report_dir)
+    if args.watch:
+        return watch(args.interval, args.debounce)
+    
+    return run_all_validations(args.fix, args.report_dir, args.force, args.format)
 
 if __name__ == "__main__":
     sys.exit(0 if main() else 1)
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Snapshot Store Script
+
+This script keeps the earlier versions of documentation files in a content-addressed store under
+.ai/snapshots instead of `.bak` copies next to each file. Scripts save the current version of a
+file before they overwrite it; every distinct content is stored once as an object named by its
+hash (zlib-compressed unless disabled), and a per-document history records which content the file
+had when. Saving a version that is already the latest snapshot of the document is free.
+
+Histories are pruned to the newest MAX_SNAPSHOTS snapshots per document (and, if MAX_AGE_DAYS is
+set, to those younger than that); objects no history refers to any more are deleted. --prune refuses
+to delete anything when the history file is missing or unreadable, since every object would look
+unreferenced.
+
+Usage:
+    python snapshot_store.py --list PATH
+    python snapshot_store.py --restore PATH [--snapshot HASH]
+    python snapshot_store.py --prune [--max-snapshots N] [--max-age DAYS]
+    python snapshot_store.py --stats
+
+Options:
+    --list PATH         List the snapshots of a document, newest first
+    --restore PATH      Roll a document back to a snapshot (the latest one by default)
+    --snapshot HASH     Snapshot to restore: a content hash or a unique prefix of one
+    --prune             Apply the retention policy to all documents
+    --max-snapshots N   Number of newest snapshots kept per document (0 disables the limit)
+    --max-age DAYS      Drop snapshots older than this many days (0 disables the limit)
+    --stats             Print the number of documents, snapshots and objects and the store size
+"""
+
+import os
+import sys
+import json
+import zlib
+import argparse
+import logging
+from datetime import datetime, timedelta
+
+# Import the shared write layer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from file_store import read_file, content_hash, write_atomic, write_file, update_text_file
+
+# Constants
+AI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_ROOT = os.path.dirname(AI_DIR)
+SNAPSHOTS_DIR = os.path.join(AI_DIR, "snapshots")
+OBJECTS_DIR = os.path.join(SNAPSHOTS_DIR, "objects")
+HISTORY_FILE = os.path.join(SNAPSHOTS_DIR, "history.json")
+HISTORY_VERSION = 1
+COMPRESSED_SUFFIX = ".z"
+
+# Default retention policy
+MAX_SNAPSHOTS = 20
+MAX_AGE_DAYS = 0
+COMPRESS = True
+
+logger = logging.getLogger('snapshot_store')
+
+def document_key(file_path):
+    """Return the history key of a document: its path relative to the project root."""
+    return os.path.relpath(os.path.abspath(file_path), PROJECT_ROOT).replace(os.sep, '/')
+
+def _object_path(digest, compressed):
+    return os.path.join(OBJECTS_DIR, digest[:2], digest + (COMPRESSED_SUFFIX if compressed else ''))
+
+def _parse_history(text, strict=False):
+    """Parse the history file into {document key: [snapshots, oldest first]}.
+
+    An unreadable history (or one of another version) is treated as empty, or raises ValueError
+    when strict is set.
+    """
+    if not text:
+        if strict and text is not None:
+            raise ValueError(f"Snapshot history {HISTORY_FILE} is empty")
+        return {}
+    try:
+        history = json.loads(text)
+    except ValueError:
+        if strict:
+            raise ValueError(f"Snapshot history {HISTORY_FILE} is unreadable")
+        logger.warning(f"Ignoring unreadable snapshot history {HISTORY_FILE}")
+        return {}
+    if not isinstance(history, dict) or history.get('version') != HISTORY_VERSION:
+        if strict:
+            raise ValueError(f"Snapshot history {HISTORY_FILE} has an unknown version")
+        return {}
+    return history.get('documents', {})
+
+def _dump_history(documents):
+    return json.dumps({'version': HISTORY_VERSION, 'documents': documents}, indent=1, sort_keys=True)
+
+def load_history():
+    """Return the snapshot history of all documents."""
+    data = read_file(HISTORY_FILE)
+    return _parse_history(data.decode('utf-8') if data is not None else None)
+
+def store_object(data, compress=COMPRESS):
+    """Store a content once by its hash. Returns the hash."""
+    digest = content_hash(data)
+    if os.path.exists(_object_path(digest, True)) or os.path.exists(_object_path(digest, False)):
+        return digest
+    write_atomic(_object_path(digest, compress), zlib.compress(data) if compress else data)
+    return digest
+
+def load_object(digest):
+    """Return the content stored under a hash, or None if there is no such object."""
+    data = read_file(_object_path(digest, True))
+    if data is not None:
+        return zlib.decompress(data)
+    return read_file(_object_path(digest, False))
+
+def _delete_objects(digests):
+    """Delete the stored objects of some hashes. Returns the number of objects deleted."""
+    deleted = 0
+    for digest in digests:
+        for compressed in (True, False):
+            try:
+                os.remove(_object_path(digest, compressed))
+                deleted += 1
+            except FileNotFoundError:
+                pass
+    return deleted
+
+def _retain(snapshots, max_snapshots, max_age_days, now):
+    """Return the snapshots a retention policy keeps, oldest first."""
+    if max_age_days:
+        cutoff = (now - timedelta(days=max_age_days)).isoformat(timespec='seconds')
+        snapshots = [snapshot for snapshot in snapshots if snapshot['time'] >= cutoff]
+    if max_snapshots:
+        snapshots = snapshots[-max_snapshots:]
+    return snapshots
+
+def save_snapshot(file_path, data=None, compress=COMPRESS, max_snapshots=MAX_SNAPSHOTS, max_age_days=MAX_AGE_DAYS):
+    """Save the current version of a document (or the given content) before it is overwritten.
+
+    Returns the hash of the snapshot, or None if the document does not exist. Objects that only the
+    snapshots dropped by the retention policy referred to are deleted.
+    """
+    if data is None:
+        data = read_file(file_path)
+        if data is None:
+            return None
+    digest = store_object(data, compress)
+    key = document_key(file_path)
+    now = datetime.now()
+    outcome = {}
+
+    def add_snapshot(text):
+        documents = _parse_history(text)
+        snapshots = documents.get(key, [])
+        outcome['unreferenced'] = set()
+        if snapshots and snapshots[-1]['hash'] == digest:
+            return None
+        snapshots.append({'hash': digest, 'time': now.isoformat(timespec='seconds'), 'size': len(data)})
+        kept = _retain(snapshots, max_snapshots, max_age_days, now)
+        documents[key] = kept
+        dropped = {entry['hash'] for entry in snapshots} - {entry['hash'] for entry in kept}
+        if dropped:
+            referenced = {entry['hash'] for entries in documents.values() for entry in entries}
+            outcome['unreferenced'] = dropped - referenced
+        return _dump_history(documents)
+
+    if update_text_file(HISTORY_FILE, add_snapshot) is not None:
+        logger.info(f"Saved snapshot {digest[:12]} of {key}")
+        deleted = _delete_objects(outcome['unreferenced'])
+        if deleted:
+            logger.info(f"Deleted {deleted} unreferenced objects")
+    return digest
+
+def list_snapshots(file_path):
+    """Return the snapshots of a document, newest first."""
+    return list(reversed(load_history().get(document_key(file_path), [])))
+
+def find_snapshot(file_path, snapshot=None):
+    """Return the snapshot of a document with a hash (or unique hash prefix); the latest one by default.
+
+    Raises ValueError if there is no such snapshot or the prefix is ambiguous.
+    """
+    snapshots = list_snapshots(file_path)
+    if not snapshots:
+        raise ValueError(f"No snapshots of {document_key(file_path)}")
+    if snapshot is None:
+        return snapshots[0]
+    matches = {entry['hash']: entry for entry in snapshots if entry['hash'].startswith(snapshot)}
+    if not matches:
+        raise ValueError(f"No snapshot {snapshot} of {document_key(file_path)}")
+    if len(matches) > 1:
+        raise ValueError(f"Snapshot prefix {snapshot} is ambiguous for {document_key(file_path)}")
+    return next(iter(matches.values()))
+
+def restore_snapshot(file_path, snapshot=None):
+    """Roll a document back to a snapshot; the current version is saved as a snapshot first.
+
+    Returns the restored snapshot. Raises ValueError if the snapshot cannot be found.
+    """
+    entry = find_snapshot(file_path, snapshot)
+    data = load_object(entry['hash'])
+    if data is None:
+        raise ValueError(f"Snapshot {entry['hash'][:12]} of {document_key(file_path)} is missing from the store")
+    current = read_file(file_path)
+    if current != data:
+        if current is not None:
+            save_snapshot(file_path, current)
+        write_file(file_path, data)
+    logger.info(f"Restored {document_key(file_path)} to snapshot {entry['hash'][:12]} from {entry['time']}")
+    return entry
+
+def prune(max_snapshots=MAX_SNAPSHOTS, max_age_days=MAX_AGE_DAYS):
+    """Apply a retention policy to every document and delete unreferenced objects.
+
+    Returns (snapshots dropped, objects deleted). Nothing is deleted when there is no history file;
+    raises ValueError if the history is unreadable.
+    """
+    now = datetime.now()
+    outcome = {}
+
+    def apply_retention(text):
+        if text is None:
+            outcome.clear()
+            return None
+        documents = _parse_history(text, strict=True)
+        dropped = 0
+        for key in list(documents):
+            kept = _retain(documents[key], max_snapshots, max_age_days, now)
+            dropped += len(documents[key]) - len(kept)
+            if kept:
+                documents[key] = kept
+            else:
+                del documents[key]
+        outcome['dropped'] = dropped
+        outcome['referenced'] = {entry['hash'] for snapshots in documents.values() for entry in snapshots}
+        return _dump_history(documents) if dropped else None
+
+    update_text_file(HISTORY_FILE, apply_retention)
+    if 'referenced' not in outcome:
+        logger.warning(f"No snapshot history {HISTORY_FILE}; not deleting any objects")
+        return 0, 0
+    referenced = outcome['referenced']
+
+    deleted = 0
+    if os.path.isdir(OBJECTS_DIR):
+        for entry in os.scandir(OBJECTS_DIR):
+            if not entry.is_dir():
+                continue
+            for obj in os.scandir(entry.path):
+                digest = obj.name[:-len(COMPRESSED_SUFFIX)] if obj.name.endswith(COMPRESSED_SUFFIX) else obj.name
+                if digest not in referenced and not obj.name.startswith('.tmp-'):
+                    os.remove(obj.path)
+                    deleted += 1
+    return outcome.get('dropped', 0), deleted
+
+def stats():
+    """Return the number of documents, snapshots and objects and the total object size in bytes."""
+    documents = load_history()
+    objects = size = 0
+    if os.path.isdir(OBJECTS_DIR):
+        for entry in os.scandir(OBJECTS_DIR):
+            if entry.is_dir():
+                for obj in os.scandir(entry.path):
+                    objects += 1
+                    size += obj.stat().st_size
+    return {
+        'documents': len(documents),
+        'snapshots': sum(len(snapshots) for snapshots in documents.values()),
+        'objects': objects,
+        'bytes': size
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the snapshots of documentation files.')
+    parser.add_argument('--list', metavar='PATH', help='List the snapshots of a document, newest first')
+    parser.add_argument('--restore', metavar='PATH', help='Roll a document back to a snapshot (the latest one by default)')
+    parser.add_argument('--snapshot', metavar='HASH', help='Snapshot to restore: a content hash or a unique prefix of one')
+    parser.add_argument('--prune', action='store_true', help='Apply the retention policy to all documents')
+    parser.add_argument('--max-snapshots', type=int, default=MAX_SNAPSHOTS, help='Number of newest snapshots kept per document (0 disables the limit)')
+    parser.add_argument('--max-age', type=int, default=MAX_AGE_DAYS, help='Drop snapshots older than this many days (0 disables the limit)')
+    parser.add_argument('--stats', action='store_true', help='Print the number of documents, snapshots and objects and the store size')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    if args.list:
+        snapshots = list_snapshots(args.list)
+        if not snapshots:
+            print(f"No snapshots of {document_key(args.list)}")
+            return True
+        for entry in snapshots:
+            print(f"{entry['hash'][:12]}  {entry['time']}  {entry['size']} bytes")
+        return True
+
+    if args.restore:
+        try:
+            restore_snapshot(args.restore, args.snapshot)
+        except ValueError as e:
+            print(e)
+            return False
+        return True
+
+    if args.prune:
+        try:
+            dropped, deleted = prune(args.max_snapshots, args.max_age)
+        except ValueError as e:
+            print(f"{e}; not pruning")
+            return False
+        print(f"Dropped {dropped} snapshots and deleted {deleted} objects")
+        return True
+
+    if args.stats:
+        result = stats()
+        print(f"{result['documents']} documents, {result['snapshots']} snapshots, "
+              f"{result['objects']} objects ({result['bytes']} bytes)")
+        return True
+
+    parser.print_help()
+    return False
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
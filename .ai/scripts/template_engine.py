@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Template Engine
+
+This module renders the files the scripts generate (the registry, validation and completion
+reports, update notifications, documentation sections and new work units) from templates in the
+templates directory. Output templates live in templates/output as `<name>.tmpl` and use a small
+syntax:
+
+    {{ name }}, {{ name.field }}              the value, converted with str()
+    {% for name in expression %} ... {% endfor %}
+    {% if [not] expression %} ... {% elif ... %} ... {% else %} ... {% endif %}
+    {# comment #}
+
+The newline after a block tag or comment is dropped, as is the indentation before it. A `-` inside
+the delimiters ({%- ... -%}, {{- ... -}}) strips all whitespace before or after the tag.
+
+Documents with bracket placeholders, like templates/work_unit_template.md, are compiled with a
+placeholder map instead: every placeholder becomes a variable, and all of them are filled in one
+pass over the template.
+
+Each template is compiled once into a Python function that writes its output piece by piece, so
+rendering is linear in the size of the output. Compiled code is kept in memory and cached on disk
+in cache/templates, keyed by the template content and placeholder map, so later runs skip
+compilation as well.
+
+Usage:
+    python template_engine.py [--check] [--clear-cache]
+
+Options:
+    --check         Compile every output template and report syntax errors
+    --clear-cache   Delete the compiled templates cached on disk
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import marshal
+import hashlib
+import argparse
+import logging
+
+# Import the shared write layer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from file_store import read_file, write_atomic
+
+# Constants
+AI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATES_DIR = os.path.join(AI_DIR, "templates")
+OUTPUT_TEMPLATES_DIR = os.path.join(TEMPLATES_DIR, "output")
+TEMPLATE_SUFFIX = ".tmpl"
+CACHE_DIR = os.path.join(AI_DIR, "cache", "templates")
+
+# Bump whenever the generated code changes so cached compilations are discarded
+ENGINE_VERSION = 1
+
+TAG_PATTERN = re.compile(r'\{\{(-?)\s*(.*?)\s*(-?)\}\}|\{%(-?)\s*(.*?)\s*(-?)%\}|\{#(-?).*?(-?)#\}', re.DOTALL)
+PATH_PATTERN = re.compile(r'^[A-Za-z_]\w*(?:\.\w+)*$')
+FOR_PATTERN = re.compile(r'^for\s+([A-Za-z_]\w*)\s+in\s+(.+)$')
+IF_PATTERN = re.compile(r'^(if|elif)\s+(.+)$')
+
+logger = logging.getLogger('template_engine')
+
+class TemplateError(Exception):
+    """Raised when a template cannot be compiled or refers to an undefined value."""
+
+def _lookup(context, name):
+    try:
+        return context[name]
+    except KeyError:
+        raise TemplateError(f"Undefined template variable '{name}'") from None
+
+def _attr(value, name):
+    if isinstance(value, dict):
+        return value[name]
+    return getattr(value, name)
+
+# Names available to compiled templates
+RUNTIME = {'_lookup': _lookup, '_attr': _attr, '_str': str}
+
+def _tokenize(source):
+    """Split template source into text, var, block and comment tokens and apply whitespace control."""
+    tokens = []
+    position = 0
+    for match in TAG_PATTERN.finditer(source):
+        if match.start() > position:
+            tokens.append(['text', source[position:match.start()]])
+        opener = match.group(0)[:2]
+        if opener == '{{':
+            tokens.append(['var', match.group(2), match.group(1), match.group(3)])
+        elif opener == '{%':
+            tokens.append(['block', match.group(5), match.group(4), match.group(6)])
+        else:
+            tokens.append(['comment', None, match.group(7), match.group(8)])
+        position = match.end()
+    if position < len(source):
+        tokens.append(['text', source[position:]])
+
+    for index, token in enumerate(tokens):
+        if token[0] == 'text':
+            continue
+        previous = tokens[index - 1] if index > 0 and tokens[index - 1][0] == 'text' else None
+        following = tokens[index + 1] if index + 1 < len(tokens) and tokens[index + 1][0] == 'text' else None
+        if token[2] and previous:
+            previous[1] = previous[1].rstrip()
+        if token[3] and following:
+            following[1] = following[1].lstrip()
+        if token[0] == 'var':
+            continue
+
+        # Block tags and comments take the indentation before them and the newline after them
+        if not token[2] and previous:
+            line_start = previous[1].rfind('\n') + 1
+            if (line_start > 0 or index == 1) and not previous[1][line_start:].strip():
+                previous[1] = previous[1][:line_start]
+        if not token[3] and following and following[1].startswith('\n'):
+            following[1] = following[1][1:]
+    return tokens
+
+class _CodeGenerator:
+    """Translates template tokens into the source of a render(context, write) function."""
+
+    def __init__(self, name):
+        self.name = name
+        self.lines = ['def render(ctx, write):']
+        # Open blocks: [kind, number of statements in the current branch]
+        self.blocks = []
+        self.scope = []
+
+    def emit(self, line):
+        self.lines.append('    ' * (len(self.blocks) + 1) + line)
+        if self.blocks:
+            self.blocks[-1][1] += 1
+
+    def expression(self, text):
+        text = text.strip()
+        if not PATH_PATTERN.match(text):
+            raise TemplateError(f"Invalid expression '{text}' in template {self.name}")
+        root, *fields = text.split('.')
+        code = f"l_{root}" if root in self.scope else f"_lookup(ctx, {root!r})"
+        for field in fields:
+            code = f"_attr({code}, {field!r})"
+        return code
+
+    def condition(self, text):
+        text = text.strip()
+        if text.startswith('not '):
+            return f"not {self.expression(text[4:])}"
+        return self.expression(text)
+
+    def close_branch(self):
+        if self.blocks[-1][1] == 0:
+            self.emit('pass')
+
+    def block(self, statement):
+        for_match = FOR_PATTERN.match(statement)
+        if_match = IF_PATTERN.match(statement)
+        if for_match:
+            name, iterable = for_match.groups()
+            self.emit(f"for l_{name} in {self.expression(iterable)}:")
+            self.blocks.append(['for', 0])
+            self.scope.append(name)
+        elif if_match and if_match.group(1) == 'if':
+            self.emit(f"if {self.condition(if_match.group(2))}:")
+            self.blocks.append(['if', 0])
+        elif if_match or statement == 'else':
+            if not self.blocks or self.blocks[-1][0] not in ('if', 'else'):
+                raise TemplateError(f"Unexpected {{% {statement} %}} in template {self.name}")
+            if self.blocks[-1][0] == 'else':
+                raise TemplateError(f"{{% {statement} %}} after {{% else %}} in template {self.name}")
+            self.close_branch()
+            self.blocks.pop()
+            self.emit(f"elif {self.condition(if_match.group(2))}:" if if_match else 'else:')
+            self.blocks.append(['if' if if_match else 'else', 0])
+        elif statement in ('endfor', 'endif'):
+            expected = ('for',) if statement == 'endfor' else ('if', 'else')
+            if not self.blocks or self.blocks[-1][0] not in expected:
+                raise TemplateError(f"Unexpected {{% {statement} %}} in template {self.name}")
+            self.close_branch()
+            if self.blocks.pop()[0] == 'for':
+                self.scope.pop()
+        else:
+            raise TemplateError(f"Unknown tag {{% {statement} %}} in template {self.name}")
+
+    def source(self):
+        if self.blocks:
+            raise TemplateError(f"Unclosed {{% {self.blocks[-1][0]} %}} in template {self.name}")
+        if len(self.lines) == 1:
+            self.lines.append('    pass')
+        return '\n'.join(self.lines) + '\n'
+
+def compile_source(source, name='<template>'):
+    """Return the Python source of the render function of a template."""
+    generator = _CodeGenerator(name)
+    for token in _tokenize(source):
+        if token[0] == 'text':
+            if token[1]:
+                generator.emit(f"write({token[1]!r})")
+        elif token[0] == 'var':
+            generator.emit(f"write(_str({generator.expression(token[1])}))")
+        elif token[0] == 'block':
+            generator.block(token[1])
+    return generator.source()
+
+def compile_placeholders(source, placeholders):
+    """Return the Python source of the render function of a document with bracket placeholders.
+
+    placeholders maps each placeholder string to the variable that replaces it.
+    """
+    generator = _CodeGenerator('<placeholders>')
+    if placeholders:
+        pattern = re.compile('|'.join(re.escape(placeholder) for placeholder in sorted(placeholders, key=len, reverse=True)))
+        position = 0
+        for match in pattern.finditer(source):
+            if match.start() > position:
+                generator.emit(f"write({source[position:match.start()]!r})")
+            generator.emit(f"write(_str({generator.expression(placeholders[match.group(0)])}))")
+            position = match.end()
+        source = source[position:]
+    if source:
+        generator.emit(f"write({source!r})")
+    return generator.source()
+
+class Template:
+    """A compiled template."""
+
+    def __init__(self, name, function):
+        self.name = name
+        self._render = function
+
+    def render(self, context):
+        """Render the template to a string."""
+        parts = []
+        self._render(context, parts.append)
+        return ''.join(parts)
+
+# Compiled templates of this process: (path, placeholders) -> (mtime_ns, size, template)
+_templates = {}
+
+def _compile(path, source, placeholders):
+    """Return the code object of a template, from the disk cache when it was compiled before."""
+    key_material = json.dumps([ENGINE_VERSION, sys.implementation.cache_tag, placeholders], sort_keys=True)
+    key = hashlib.sha256(key_material.encode('utf-8') + b'\0' + source).hexdigest()[:16]
+    # One cache file per template and placeholder map, so each map only replaces its own compilations
+    variant = hashlib.sha256(json.dumps(placeholders, sort_keys=True).encode('utf-8')).hexdigest()[:8]
+    prefix = f"{os.path.basename(path)}-{variant}-"
+    cache_file = os.path.join(CACHE_DIR, f"{prefix}{key}.code")
+
+    data = read_file(cache_file)
+    if data is not None:
+        try:
+            return marshal.loads(data)
+        except (EOFError, ValueError, TypeError):
+            logger.warning(f"Discarding unreadable compiled template {cache_file}")
+
+    text = source.decode('utf-8')
+    python_source = compile_placeholders(text, placeholders) if placeholders is not None else compile_source(text, path)
+    code = compile(python_source, path, 'exec')
+
+    # Replace the compilations of earlier versions of the template with this placeholder map
+    if os.path.isdir(CACHE_DIR):
+        for filename in os.listdir(CACHE_DIR):
+            if filename.startswith(prefix) and filename != os.path.basename(cache_file):
+                try:
+                    os.remove(os.path.join(CACHE_DIR, filename))
+                except OSError:
+                    pass
+    write_atomic(cache_file, marshal.dumps(code))
+    logger.debug(f"Compiled template {path}")
+    return code
+
+def _load(path, placeholders=None):
+    key = (path, json.dumps(placeholders, sort_keys=True) if placeholders is not None else None)
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        raise TemplateError(f"Template not found: {path}") from None
+    cached = _templates.get(key)
+    if cached and cached[:2] == (stat_result.st_mtime_ns, stat_result.st_size):
+        return cached[2]
+
+    source = read_file(path)
+    if source is None:
+        raise TemplateError(f"Template not found: {path}")
+    namespace = dict(RUNTIME)
+    exec(_compile(path, source, placeholders), namespace)
+    template = Template(os.path.basename(path), namespace['render'])
+    _templates[key] = (stat_result.st_mtime_ns, stat_result.st_size, template)
+    return template
+
+def get_template(name):
+    """Return the compiled output template `name` (templates/output/<name>.tmpl)."""
+    return _load(os.path.join(OUTPUT_TEMPLATES_DIR, name + TEMPLATE_SUFFIX))
+
+def get_placeholder_template(path, placeholders):
+    """Return a document with bracket placeholders compiled with a {placeholder: variable} map."""
+    return _load(path, placeholders)
+
+def template_fingerprint(*names):
+    """Hash the sources of output templates, for caches of rendered output."""
+    digest = hashlib.sha256(f"templates-v{ENGINE_VERSION}\n".encode('utf-8'))
+    for name in names:
+        digest.update(read_file(os.path.join(OUTPUT_TEMPLATES_DIR, name + TEMPLATE_SUFFIX)) or b'')
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def render(name, context):
+    """Render the output template `name` to a string."""
+    return get_template(name).render(context)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile and check output templates.')
+    parser.add_argument('--check', action='store_true', help='Compile every output template and report syntax errors')
+    parser.add_argument('--clear-cache', action='store_true', help='Delete the compiled templates cached on disk')
+    args = parser.parse_args()
+
+    if args.clear_cache:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        print(f"Cleared compiled templates: {CACHE_DIR}")
+
+    if args.check or not args.clear_cache:
+        ok = True
+        for filename in sorted(os.listdir(OUTPUT_TEMPLATES_DIR)):
+            if not filename.endswith(TEMPLATE_SUFFIX):
+                continue
+            try:
+                get_template(filename[:-len(TEMPLATE_SUFFIX)])
+                print(f"OK     {filename}")
+            except (TemplateError, SyntaxError) as e:
+                print(f"ERROR  {filename}: {e}")
+                ok = False
+        return ok
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
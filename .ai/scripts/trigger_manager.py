@@ -14,30 +14,50 @@ This script provides a central interface to execute all framework triggers:
 9. Work Unit Validation Trigger
 10. Work Unit Status Update Trigger
 
+Triggers normally run in a fresh Python process. With --serve the manager instead becomes a
+long-running daemon on a local Unix socket that keeps the trigger modules and the work unit index
+loaded and runs each trigger in-process; --client sends a trigger to that daemon. The daemon has to
+be restarted to pick up changes to the scripts themselves.
+
 Usage:
     python trigger_manager.py --trigger TRIGGER_NAME [--args ARGS]
+    python trigger_manager.py --serve [--socket PATH]
+    python trigger_manager.py --client --trigger TRIGGER_NAME [--args ARGS] [--socket PATH]
 
 Options:
     --trigger TRIGGER_NAME    Name of the trigger to execute
     --args ARGS               Arguments to pass to the trigger script
+    --serve                   Run as a daemon that executes triggers received on the socket
+    --client                  Send the trigger to a running daemon (runs it locally if none is listening)
+    --socket PATH             Path of the daemon's Unix socket
 """
 
 import os
+import io
 import sys
+import json
+import shlex
+import socket
 import argparse
 import logging
+import importlib
 import subprocess
+import socketserver
+from contextlib import redirect_stdout, redirect_stderr
 from datetime import datetime
 
 # Constants
 SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
 LOGS_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "logs")
+CACHE_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "cache")
+SOCKET_PATH = os.path.join(CACHE_DIR, "trigger_manager.sock")
 os.makedirs(LOGS_DIR, exist_ok=True)
 
 # Set up logging
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
         logging.FileHandler(os.path.join(LOGS_DIR, 'trigger_manager.log')),
         logging.StreamHandler()
@@ -119,7 +139,7 @@ def execute_trigger(trigger_name, args=None):
     # Build command
     cmd = [sys.executable, script_path]
     if args:
-        cmd.extend(args.split())
+        cmd.extend(shlex.split(args))
     
     logger.info(f"Executing trigger: {trigger_name}")
     logger.info(f"Command: {' '.join(cmd)}")
@@ -150,6 +170,146 @@ def execute_trigger(trigger_name, args=None):
         print(f"Error executing trigger: {e}")
         return False
 
+def _import_script(module_name):
+    """Import (once per process) a module from the scripts directory."""
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.append(SCRIPTS_DIR)
+    return importlib.import_module(module_name)
+
+def run_trigger_in_process(trigger_name, args=None):
+    """Run a trigger script's main() in the current process, capturing its output.
+
+    Returns a dict with the success flag, return code and captured stdout/stderr. Log records emitted
+    while the trigger runs are written to the captured stderr as well.
+    """
+    if trigger_name not in TRIGGERS:
+        return {
+            'success': False,
+            'returncode': 2,
+            'stdout': '',
+            'stderr': f"Unknown trigger: {trigger_name}\nAvailable triggers: {', '.join(TRIGGERS.keys())}\n"
+        }
+    
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    saved_argv = sys.argv
+    sys.argv = [os.path.join(SCRIPTS_DIR, TRIGGERS[trigger_name]['script'])] + (shlex.split(args) if args else [])
+    
+    logger.info(f"Executing trigger in-process: {trigger_name}")
+    logger.info(f"Arguments: {' '.join(sys.argv[1:])}")
+    
+    log_handler = logging.StreamHandler(stderr)
+    log_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logging.getLogger().addHandler(log_handler)
+    
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                result = _import_script(os.path.splitext(TRIGGERS[trigger_name]['script'])[0]).main()
+                returncode = 0 if result or result is None else 1
+            except SystemExit as e:
+                returncode = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                if isinstance(e.code, str):
+                    print(e.code, file=sys.stderr)
+    except Exception as e:
+        logger.error(f"Error executing trigger: {e}")
+        stderr.write(f"Error executing trigger: {e}\n")
+        returncode = 1
+    finally:
+        logging.getLogger().removeHandler(log_handler)
+        sys.argv = saved_argv
+    
+    if returncode != 0:
+        logger.error(f"Trigger execution failed with code {returncode}")
+    else:
+        logger.info(f"Trigger execution completed successfully")
+    
+    return {
+        'success': returncode == 0,
+        'returncode': returncode,
+        'stdout': stdout.getvalue(),
+        'stderr': stderr.getvalue()
+    }
+
+class TriggerRequestHandler(socketserver.StreamRequestHandler):
+    """Handle one JSON request line of the form {"trigger": NAME, "args": ARGS}."""
+    
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            request = json.loads(line)
+            response = run_trigger_in_process(request['trigger'], request.get('args'))
+        except (ValueError, KeyError, TypeError) as e:
+            response = {'success': False, 'returncode': 2, 'stdout': '', 'stderr': f"Invalid request: {e}\n"}
+        
+        # Keep the index warm for the next request
+        try:
+            _import_script('work_unit_index').refresh_index()
+        except Exception as e:
+            logger.warning(f"Error refreshing work unit index: {e}")
+        
+        self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+def _socket_in_use(socket_path):
+    """Check whether a daemon is already accepting connections on the socket."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socket_path)
+        return True
+    except OSError:
+        return False
+
+def serve(socket_path=SOCKET_PATH):
+    """Run the trigger daemon, handling requests one at a time until interrupted."""
+    if os.path.exists(socket_path):
+        if _socket_in_use(socket_path):
+            logger.error(f"Trigger daemon already running on {socket_path}")
+            print(f"Trigger daemon already running on {socket_path}")
+            return False
+        os.remove(socket_path)
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    
+    # Load the work unit index up front so the first trigger does not pay for it
+    changed, _ = _import_script('work_unit_index').refresh_index()
+    logger.info(f"Work unit index loaded ({len(changed)} entries refreshed)")
+    
+    server = socketserver.UnixStreamServer(socket_path, TriggerRequestHandler)
+    logger.info(f"Trigger daemon listening on {socket_path}")
+    print(f"Trigger daemon listening on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Trigger daemon stopped")
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+    return True
+
+def send_trigger(trigger_name, args=None, socket_path=SOCKET_PATH):
+    """Send a trigger to the daemon and print its output.
+
+    Falls back to executing the trigger in a subprocess if no daemon is listening.
+    """
+    request = json.dumps({'trigger': trigger_name, 'args': args}).encode('utf-8') + b'\n'
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socket_path)
+            client.sendall(request)
+            with client.makefile('rb') as reader:
+                response = json.loads(reader.readline())
+    except (OSError, ValueError) as e:
+        logger.warning(f"Trigger daemon not available on {socket_path} ({e}), executing trigger directly")
+        return execute_trigger(trigger_name, args)
+    
+    if response['stdout']:
+        print(response['stdout'], end='')
+    if response['stderr']:
+        print(response['stderr'], end='', file=sys.stderr)
+    if not response['success']:
+        print(f"Trigger execution failed with code {response['returncode']}")
+    return response['success']
+
 def list_triggers():
     """List all available triggers with descriptions and examples."""
     print("\nAvailable Triggers:\n")
@@ -169,12 +329,21 @@ def main():
     parser.add_argument('--trigger', help='Name of the trigger to execute')
     parser.add_argument('--args', help='Arguments to pass to the trigger script')
     parser.add_argument('--list', action='store_true', help='List all available triggers')
+    parser.add_argument('--serve', action='store_true', help='Run as a daemon that executes triggers received on the socket')
+    parser.add_argument('--client', action='store_true', help='Send the trigger to a running daemon')
+    parser.add_argument('--socket', default=SOCKET_PATH, help='Path of the daemon\'s Unix socket')
     args = parser.parse_args()
     
+    if args.serve:
+        return serve(args.socket)
+    
     if args.list or not args.trigger:
         list_triggers()
         return True
     
+    if args.client:
+        return send_trigger(args.trigger, args.args, args.socket)
+    
     return execute_trigger(args.trigger, args.args)
 
 if __name__ == "__main__":
@@ -14,12 +14,17 @@ Options:
 """
 
 import os
-import re
 import sys
 import argparse
 import logging
 from datetime import datetime
 
+# Import the work unit index for ID lookups
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from work_unit_index import find_work_unit_file
+from work_unit_parser import parse_work_unit, parse_work_unit_bytes, set_field_edit, apply_edits
+from file_store import update_file
+
 # Constants
 WORK_UNITS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "work_units")
 TEMPLATE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates", "work_unit_template.md")
@@ -35,9 +40,11 @@ logging.basicConfig(
 
 logger = logging.getLogger('update_work_units')
 
-# Regular expressions for parsing work unit files
-REQUIREMENT_PATTERN = re.compile(r'(#+\s+\d+\.\d+\s+[^\n]+\n(?:- \*\*[^\n]+\n)+)', re.MULTILINE)
-RESPONSIBILITY_PATTERN = re.compile(r'- \*\*Responsibility Assignment\*\*:', re.MULTILINE)
+# Lines added to requirements that have no responsibility assignment
+RESPONSIBILITY_LINES = (
+    "- **Responsibility Assignment**:\n"
+    "  - **AI Assistant**: Implement and validate this requirement\n"
+)
 
 def load_work_units():
     """Load all work unit files except registry.md."""
@@ -57,79 +64,53 @@ def load_work_units():
     
     return work_units
 
-def extract_work_unit_id(content):
-    """Extract the work unit ID from the content."""
-    id_match = re.search(r'^\s*-\s*\*\*ID\*\*:\s*([^\n]+)', content, re.MULTILINE)
-    return id_match.group(1).strip() if id_match else None
+def responsibility_edit(doc, requirement):
+    """Return the edit that adds a responsibility assignment to a requirement, or None if it has one."""
+    if 'Responsibility Assignment' in requirement.fields:
+        return None  # Already has responsibility assignment
+    
+    # Insert before the implementation details, or after the last field if there are none
+    details = requirement.fields.get('Implementation Details')
+    position = details.start if details else requirement.fields_end
+    prefix = '' if doc.data[:position].endswith(b'\n') else '\n'
+    return (position, position, prefix + RESPONSIBILITY_LINES)
 
-def add_responsibility_to_requirement(requirement_block):
-    """Add responsibility assignment to a requirement block if it doesn't exist."""
-    if RESPONSIBILITY_PATTERN.search(requirement_block):
-        return requirement_block  # Already has responsibility assignment
-    
-    # Find where to insert the responsibility section
-    lines = requirement_block.split('\n')
-    insert_index = -1
-    
-    for i, line in enumerate(lines):
-        if line.strip().startswith('- **Implementation Details**:'):
-            insert_index = i
-            break
-    
-    if insert_index == -1:
-        # If no implementation details, add before the last line
-        insert_index = len(lines) - 1
+def has_all_responsibilities(doc):
+    """Check whether every requirement already has a responsibility assignment."""
+    return all('Responsibility Assignment' in requirement.fields for requirement in doc.requirements)
+
+def add_responsibility_assignments(data, file_path=None):
+    """Return work unit content with responsibility assignments added to every requirement."""
+    doc = parse_work_unit_bytes(data, file_path)
+    if has_all_responsibilities(doc):
+        return data
     
-    # Insert responsibility assignment
-    responsibility_lines = [
-        '- **Responsibility Assignment**:',
-        '  - **AI Assistant**: Implement and validate this requirement',
-    ]
+    edits = [responsibility_edit(doc, requirement) for requirement in doc.requirements]
     
-    updated_lines = lines[:insert_index] + responsibility_lines + lines[insert_index:]
-    return '\n'.join(updated_lines)
+    # Update the last updated date
+    edits.append(set_field_edit(doc, 'Last Updated', datetime.now().strftime("%Y-%m-%d"), after=None))
+    return apply_edits(doc, edits)
 
 def update_work_unit(work_unit, dry_run=False):
     """Update a work unit file to include responsibility assignments."""
-    with open(work_unit['path'], 'r', encoding='utf-8') as f:
-        content = f.read()
+    doc = parse_work_unit(work_unit['path'])
     
     # Extract work unit ID
-    work_unit_id = extract_work_unit_id(content)
+    work_unit_id = doc.get('ID')
     if not work_unit_id:
         logger.warning(f"Could not extract ID from {work_unit['filename']}")
         return False
     
     # Check if the file already has the latest format
-    has_all_responsibilities = True
-    for req_match in REQUIREMENT_PATTERN.finditer(content):
-        req_block = req_match.group(1)
-        if not RESPONSIBILITY_PATTERN.search(req_block):
-            has_all_responsibilities = False
-            break
-    
-    if has_all_responsibilities:
+    if has_all_responsibilities(doc):
         logger.info(f"{work_unit_id} already has responsibility assignments for all requirements")
         return True
     
-    # Update each requirement block
-    updated_content = content
-    for req_match in REQUIREMENT_PATTERN.finditer(content):
-        req_block = req_match.group(1)
-        updated_req_block = add_responsibility_to_requirement(req_block)
-        updated_content = updated_content.replace(req_block, updated_req_block)
-    
-    # Update the last updated date
-    last_updated_pattern = re.compile(r'^\s*-\s*\*\*Last Updated\*\*:\s*([^\n]+)', re.MULTILINE)
-    if last_updated_pattern.search(updated_content):
-        updated_content = last_updated_pattern.sub(f'- **Last Updated**: {datetime.now().strftime("%Y-%m-%d")}', updated_content)
-    
     if dry_run:
         logger.info(f"Would update {work_unit_id} with responsibility assignments")
         return True
     else:
-        with open(work_unit['path'], 'w', encoding='utf-8') as f:
-            f.write(updated_content)
+        update_file(work_unit['path'], lambda data: add_responsibility_assignments(data, work_unit['path']))
         logger.info(f"Updated {work_unit_id} with responsibility assignments")
         return True
 
@@ -143,7 +124,8 @@ def main():
     
     if args.work_unit:
         # Update only the specified work unit
-        target_work_units = [wu for wu in work_units if extract_work_unit_id(open(wu['path'], 'r', encoding='utf-8').read()) == args.work_unit]
+        file_path = find_work_unit_file(args.work_unit)
+        target_work_units = [wu for wu in work_units if wu['path'] == file_path]
         if not target_work_units:
             logger.error(f"Work unit {args.work_unit} not found")
             return False
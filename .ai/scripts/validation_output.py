@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Validation Output
+
+This module renders validation issues as structured JSON or SARIF 2.1.0 for dashboards and code
+scanning tools, next to the markdown reports of the validators. Every issue carries a stable rule
+ID (the validation rule that reported it), its issue type, a severity and, where known, the file
+and line it refers to. Paths are relative to the project root.
+
+Severities map to SARIF levels: high -> error, medium -> warning, low -> note.
+"""
+
+import os
+import json
+from datetime import datetime
+from pathlib import Path
+
+# Constants
+AI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_ROOT = os.path.dirname(AI_DIR)
+
+TOOL_NAME = 'atavya-validation'
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+SARIF_LEVELS = {'high': 'error', 'medium': 'warning', 'low': 'note'}
+
+FORMATS = ('markdown', 'json', 'sarif')
+FORMAT_EXTENSIONS = {'markdown': '.md', 'json': '.json', 'sarif': '.sarif'}
+
+def relative_path(file_path):
+    """Return a path relative to the project root, with forward slashes."""
+    if not file_path:
+        return None
+    return os.path.relpath(os.path.abspath(file_path), PROJECT_ROOT).replace(os.sep, '/')
+
+def issue_record(issue):
+    """Return the structured form of an issue."""
+    return {
+        'rule': issue['rule'],
+        'type': issue.get('type'),
+        'severity': issue.get('severity', 'medium'),
+        'message': issue['message'],
+        'work_unit_id': issue.get('work_unit_id'),
+        'file': relative_path(issue.get('file')),
+        'line': issue.get('line')
+    }
+
+def to_json(issues, rules):
+    """Render issues as a JSON document with per-severity counts.
+
+    rules is a list of {'id', 'description', 'severity'} descriptors of the rules that ran.
+    """
+    records = [issue_record(issue) for issue in issues]
+    return json.dumps({
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'rules': rules,
+        'summary': {severity: sum(1 for record in records if record['severity'] == severity)
+                    for severity in SARIF_LEVELS},
+        'issues': records
+    }, indent=2, ensure_ascii=False)
+
+def to_sarif(issues, rules):
+    """Render issues as a SARIF 2.1.0 log with one run."""
+    rule_index = {rule['id']: index for index, rule in enumerate(rules)}
+    results = []
+    for issue in issues:
+        record = issue_record(issue)
+        result = {
+            'ruleId': record['rule'],
+            'level': SARIF_LEVELS.get(record['severity'], 'warning'),
+            'message': {'text': record['message']},
+            'properties': {'issueType': record['type'], 'severity': record['severity']}
+        }
+        if record['rule'] in rule_index:
+            result['ruleIndex'] = rule_index[record['rule']]
+        if record['work_unit_id']:
+            result['properties']['workUnitId'] = record['work_unit_id']
+        if record['file']:
+            location = {'artifactLocation': {'uri': record['file'], 'uriBaseId': '%SRCROOT%'}}
+            if record['line']:
+                location['region'] = {'startLine': record['line']}
+            result['locations'] = [{'physicalLocation': location}]
+        results.append(result)
+
+    return json.dumps({
+        '$schema': SARIF_SCHEMA,
+        'version': '2.1.0',
+        'runs': [{
+            'tool': {'driver': {
+                'name': TOOL_NAME,
+                'rules': [{
+                    'id': rule['id'],
+                    'shortDescription': {'text': rule['description']},
+                    'defaultConfiguration': {'level': SARIF_LEVELS.get(rule['severity'], 'warning')}
+                } for rule in rules]
+            }},
+            'originalUriBaseIds': {'%SRCROOT%': {'uri': Path(PROJECT_ROOT).as_uri().rstrip('/') + '/'}},
+            'results': results
+        }]
+    }, indent=2, ensure_ascii=False)
+
+def render(issues, rules, output_format, markdown):
+    """Render issues in an output format; markdown is the validator's own report."""
+    if output_format == 'json':
+        return to_json(issues, rules)
+    if output_format == 'sarif':
+        return to_sarif(issues, rules)
+    return markdown
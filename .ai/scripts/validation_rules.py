@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+Validation Rules
+
+This module is a pluggable rule engine for framework validation. Every work unit file is read and
+parsed once; all file rules run against that shared parsed model, and the corpus rules (which need
+every work unit, such as the registry comparison) run once afterwards on the metadata collected
+during the same pass. The issues of all rules are merged into one report.
+
+A rule is registered with the @rule decorator:
+
+    @rule('my-check', "What the rule checks", severity='medium')
+    def check_something(context):
+        yield {'type': 'something_wrong', 'message': "...", 'line': 12}
+
+File rules receive a FileContext (the parsed document plus shared derived data); corpus rules
+(scope=CORPUS) receive a CorpusContext. A rule can also register a fix, which returns the edits
+that resolve its issues in a file.
+
+Built-in rules:
+    registry-consistency   Work units and registry.md agree; references point at existing units
+    duplicate-ids          No two work unit files share an ID
+    completion-tracking    Every requirement has a Completion field
+    completion-math        Task and overall percentages match their subtasks
+    status-consistency     The work unit status agrees with the completion of its tasks
+    broken-links           Relative links in work units point at existing files
+
+After --fix only the files that the fixes touched are parsed and checked again. Reports can be
+written as markdown, JSON or SARIF (see validation_output.py); rule IDs are stable.
+
+Usage:
+    python validation_rules.py [--fix] [--rules RULE_IDS] [--report-file FILE] [--format FORMAT] [--jobs N]
+
+Options:
+    --fix               Automatically fix the issues of rules that have a fix
+    --rules RULE_IDS    Comma-separated rule IDs to run (default: all)
+    --report-file FILE  Save the validation report to a file
+    --format FORMAT     Report format: markdown (default), json or sarif
+    --jobs N            Number of processes used to check work unit files (0 = one per CPU)
+"""
+
+import os
+import sys
+import argparse
+import logging
+from dataclasses import dataclass
+from contextlib import redirect_stdout
+from datetime import datetime
+from functools import partial
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from work_unit_index import is_work_unit_file
+from work_unit_parser import parse_work_unit_bytes, summarize, set_field_edit, apply_edits
+from completion_engine import calculate_completion
+from dependency_graph import DependencyGraph
+from registry_validator import parse_registry, validate_entry
+from registry_updater import update_registry
+from file_store import read_file, update_file, content_hash
+from process_pool import parallel_map
+from validation_output import FORMATS, render
+from link_graph import extract_links, is_checked_target, resolve_target
+from template_engine import get_template
+
+# Constants
+WORK_UNITS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "work_units")
+REGISTRY_FILE = os.path.join(WORK_UNITS_DIR, "registry.md")
+
+# Rule scopes
+FILE = 'file'
+CORPUS = 'corpus'
+
+SEVERITIES = ('high', 'medium', 'low')
+
+logger = logging.getLogger('validation_rules')
+
+@dataclass
+class Rule:
+    """A registered validation rule."""
+    rule_id: str
+    description: str
+    severity: str
+    scope: str
+    check: object
+    fix: object = None
+
+RULES = {}
+
+def rule(rule_id, description, severity='medium', scope=FILE):
+    """Register a rule; the decorated function yields (or returns) the rule's issues."""
+    def register(check):
+        RULES[rule_id] = Rule(rule_id, description, severity, scope, check)
+        return check
+    return register
+
+def fixer(rule_id):
+    """Register the fix of a file rule; the decorated function returns the edits for the rule's issues."""
+    def register(fix):
+        RULES[rule_id].fix = fix
+        return fix
+    return register
+
+class FileContext:
+    """One parsed work unit file, shared by every file rule."""
+
+    def __init__(self, file_path, data):
+        self.file_path = file_path
+        self.data = data
+        self.doc = parse_work_unit_bytes(data, file_path)
+        self.work_unit_id = self.doc.get('ID') or os.path.basename(file_path)
+        self._derived = {}
+
+    def derived(self, name, compute):
+        """Return data derived from the document, computed once for all rules that need it."""
+        if name not in self._derived:
+            self._derived[name] = compute(self.doc)
+        return self._derived[name]
+
+    def field_line(self, name, task=None):
+        """Return the line of a metadata (or task) field, or of the task heading when the field is missing."""
+        fields = task.fields if task is not None else self.doc.metadata
+        target = fields.get(name)
+        if target is not None:
+            return self.doc.line_number(target.start)
+        return self.doc.line_number(task.start) if task is not None else None
+
+class CorpusContext:
+    """The metadata of every work unit collected during the file pass, shared by every corpus rule."""
+
+    def __init__(self, work_units):
+        self.work_units = work_units
+        self.work_units_by_id = {wu['id']: wu for wu in work_units if wu['id']}
+        self._registry = None
+        self._graph = None
+
+    @property
+    def registry(self):
+        """The registry entries keyed by work unit ID, parsed once."""
+        if self._registry is None:
+            self._registry = {entry['id']: entry for entry in parse_registry() if 'id' in entry}
+        return self._registry
+
+    @property
+    def graph(self):
+        """The dependency graph of the work units, built once."""
+        if self._graph is None:
+            self._graph = DependencyGraph()
+            for wu in self.work_units:
+                self._graph.update_unit(wu)
+        return self._graph
+
+def _finish_issue(issue, selected_rule, file_path=None, work_unit_id=None):
+    """Fill in the rule, severity and location defaults of an issue."""
+    issue.setdefault('severity', selected_rule.severity)
+    issue.setdefault('file', file_path)
+    issue.setdefault('work_unit_id', work_unit_id)
+    issue.setdefault('line', None)
+    issue['rule'] = selected_rule.rule_id
+    return issue
+
+def check_file(file_path, rule_ids):
+    """Parse one work unit file and run the file rules on it.
+
+    Returns a tuple of (metadata for the corpus rules, issues); the metadata is None if the file is gone.
+    Runs in worker processes when validation uses several jobs.
+    """
+    data = read_file(file_path)
+    if data is None:
+        return None, []
+    try:
+        context = FileContext(file_path, data)
+    except UnicodeDecodeError as e:
+        logger.warning(f"Error parsing {file_path}: {e}")
+        return None, []
+
+    issues = []
+    for rule_id in rule_ids:
+        selected_rule = RULES[rule_id]
+        for issue in selected_rule.check(context) or ():
+            issues.append(_finish_issue(issue, selected_rule, file_path, context.work_unit_id))
+
+    metadata = summarize(context.doc)
+    metadata['content_hash'] = content_hash(data)
+    metadata['file_path'] = file_path
+    return metadata, issues
+
+def work_unit_files():
+    """Return the paths of all work unit files, in filename order."""
+    return [os.path.join(WORK_UNITS_DIR, filename)
+            for filename in sorted(os.listdir(WORK_UNITS_DIR)) if is_work_unit_file(filename)]
+
+def select_rules(rule_ids=None):
+    """Return the IDs of the rules to run, raising ValueError for an unknown rule."""
+    if rule_ids is None:
+        return list(RULES)
+    for rule_id in rule_ids:
+        if rule_id not in RULES:
+            raise ValueError(f"Unknown validation rule '{rule_id}'")
+    return list(rule_ids)
+
+def rule_descriptors(rule_ids):
+    """Return the {'id', 'description', 'severity'} descriptors of rules, for structured output."""
+    return [{'id': rule_id, 'description': RULES[rule_id].description, 'severity': RULES[rule_id].severity}
+            for rule_id in rule_ids]
+
+def _check_files(file_paths, rule_ids, jobs):
+    """Run the file rules on some files; returns {file path: (metadata, issues)}."""
+    file_rules = [rule_id for rule_id in rule_ids if RULES[rule_id].scope == FILE]
+    return dict(zip(file_paths, parallel_map(partial(check_file, rule_ids=file_rules), file_paths, jobs)))
+
+def _assemble(rule_ids, file_results):
+    """Merge the per-file results and run the corpus rules on the collected metadata."""
+    issues = []
+    work_units = []
+    for file_path in sorted(file_results):
+        metadata, file_issues = file_results[file_path]
+        if metadata is not None:
+            work_units.append(metadata)
+        issues.extend(file_issues)
+
+    corpus = CorpusContext(work_units)
+    for rule_id in rule_ids:
+        selected_rule = RULES[rule_id]
+        if selected_rule.scope == CORPUS:
+            for issue in selected_rule.check(corpus) or ():
+                issues.append(_finish_issue(issue, selected_rule))
+
+    return {'issues': issues, 'rules': rule_ids, 'files': len(file_results), 'file_results': file_results}
+
+def run_validation(rule_ids=None, jobs=1):
+    """Run the selected rules (default: all) over every work unit in a single parse pass.
+
+    Returns a dict with the merged issues, the rules that ran, the number of files checked and the
+    per-file results that revalidate reuses.
+    """
+    rule_ids = select_rules(rule_ids)
+    return _assemble(rule_ids, _check_files(work_unit_files(), rule_ids, jobs))
+
+def revalidate(result, touched_files, jobs=1):
+    """Validate again after some files changed, e.g. after a fix.
+
+    Only the touched work unit files (and files that appeared since) are parsed and checked again;
+    the results of every other file are reused. The corpus rules run again on the updated metadata.
+    """
+    current = work_unit_files()
+    touched = {os.path.abspath(file_path) for file_path in touched_files}
+    file_results = {file_path: outcome for file_path, outcome in result['file_results'].items() if file_path in current}
+    recheck = [file_path for file_path in current
+               if os.path.abspath(file_path) in touched or file_path not in file_results]
+    file_results.update(_check_files(recheck, result['rules'], jobs))
+    return _assemble(result['rules'], file_results)
+
+def fix_file(file_path, rule_ids):
+    """Apply the fixes of the selected file rules to one work unit. Returns True if the file changed.
+
+    The rules are re-checked on the file as it is when the fix is committed, one rule after another,
+    so each fix sees the result of the previous one.
+    """
+    fixable = [RULES[rule_id] for rule_id in rule_ids if RULES[rule_id].scope == FILE and RULES[rule_id].fix]
+    outcome = {}
+
+    def apply_fixes(data):
+        original = data
+        for selected_rule in fixable:
+            context = FileContext(file_path, data)
+            issues = list(selected_rule.check(context) or ())
+            if issues:
+                data = apply_edits(context.doc, selected_rule.fix(context, issues))
+        outcome['changed'] = data != original
+        return data if outcome['changed'] else None
+
+    update_file(file_path, apply_fixes)
+    return outcome.get('changed', False)
+
+def fix_issues(issues, rule_ids=None):
+    """Fix the issues of a validation run. Returns the set of files that were changed."""
+    rule_ids = select_rules(rule_ids)
+    touched = set()
+    fixable = {rule_id for rule_id in rule_ids if RULES[rule_id].fix}
+    for file_path in sorted({issue['file'] for issue in issues if issue['rule'] in fixable and issue['file']}):
+        if fix_file(file_path, rule_ids):
+            touched.add(file_path)
+
+    # The registry is regenerated from the work units, which the fixes above may have changed
+    registry_issues = any(issue['rule'] == 'registry-consistency' for issue in issues)
+    if 'registry-consistency' in rule_ids and (registry_issues or touched):
+        update_registry(check_only=False)
+        touched.add(REGISTRY_FILE)
+    return touched
+
+def generate_report(result):
+    """Generate a human-readable report of a validation run, grouped by severity."""
+    issues = result['issues']
+    groups = []
+    for severity in SEVERITIES:
+        matching = []
+        for issue in issues:
+            if issue['severity'] != severity:
+                continue
+            location = ''
+            if issue['file']:
+                location = f" ({os.path.basename(issue['file'])}{':' + str(issue['line']) if issue['line'] else ''})"
+            matching.append(dict(issue, location=location))
+        groups.append({'severity': severity, 'title': severity.title(), 'count': len(matching), 'issues': matching})
+
+    return get_template('validation_report.md').render({
+        'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'files': result['files'],
+        'rule_count': len(result['rules']),
+        'rules': ', '.join(result['rules']),
+        'issues': issues,
+        'total': len(issues),
+        'groups': groups
+    })
+
+# Built-in rules
+
+@rule('registry-consistency', "Work units and registry.md agree; references point at existing units",
+      severity='medium', scope=CORPUS)
+def check_registry_consistency(corpus):
+    work_units_dict = corpus.work_units_by_id
+    registry_dict = corpus.registry
+    # Work units first, then orphaned registry entries, as in the registry report
+    for wu_id in list(work_units_dict) + [reg_id for reg_id in registry_dict if reg_id not in work_units_dict]:
+        for issue in validate_entry(wu_id, work_units_dict, registry_dict, corpus.graph):
+            wu = work_units_dict.get(wu_id)
+            issue.pop('work_unit', None)
+            issue.pop('registry_entry', None)
+            issue['file'] = wu['file_path'] if wu else REGISTRY_FILE
+            issue['work_unit_id'] = wu_id
+            yield issue
+
+@rule('duplicate-ids', "No two work unit files share an ID", severity='high', scope=CORPUS)
+def check_duplicate_ids(corpus):
+    files_by_id = {}
+    for wu in corpus.work_units:
+        if wu['id']:
+            files_by_id.setdefault(wu['id'], []).append(wu)
+    for wu_id, work_units in files_by_id.items():
+        if len(work_units) < 2:
+            continue
+        for wu in work_units:
+            others = ', '.join(other['path'] for other in work_units if other is not wu)
+            yield {
+                'type': 'duplicate_id',
+                'message': f"Work unit ID {wu_id} of {wu['path']} is also used by {others}",
+                'file': wu['file_path'],
+                'work_unit_id': wu_id,
+                'line': 1
+            }
+
+@rule('completion-tracking', "Every requirement has a Completion field", severity='medium')
+def check_completion_tracking(context):
+    for task in context.doc.requirements:
+        if task.get('Completion') is None:
+            yield {
+                'type': 'missing_completion',
+                'message': f"Requirement {task.task_id} of {context.work_unit_id} is missing completion tracking",
+                'line': context.doc.line_number(task.start),
+                'task_id': task.task_id
+            }
+
+@fixer('completion-tracking')
+def fix_completion_tracking(context, issues):
+    missing = {issue['task_id'] for issue in issues}
+    return [set_field_edit(context.doc, 'Completion', '0%', task=task)
+            for task in context.doc.requirements if task.task_id in missing]
+
+@rule('completion-math', "Task and overall percentages match their subtasks", severity='medium')
+def check_completion_math(context):
+    result = context.derived('completion', calculate_completion)
+    if not result['tasks']:
+        return
+    for task_result in result['tasks']:
+        task = context.doc.find_task(task_result['task_id'])
+        recorded = task.get('Completion')
+        if recorded != f"{task_result['completion']}%":
+            yield {
+                'type': 'task_completion_mismatch',
+                'message': f"Task {task.task_id} of {context.work_unit_id} is at {recorded}, "
+                           f"but its subtasks add up to {task_result['completion']}%",
+                'line': context.field_line('Completion', task)
+            }
+    recorded = context.doc.get('Completion')
+    if recorded is None:
+        yield {
+            'type': 'missing_work_unit_completion',
+            'message': f"Work unit {context.work_unit_id} is missing its overall completion percentage",
+            'line': context.field_line('Status')
+        }
+    elif recorded != f"{result['overall']}%":
+        yield {
+            'type': 'completion_mismatch',
+            'message': f"Work unit {context.work_unit_id} completion is {recorded}, "
+                       f"but its tasks add up to {result['overall']}%",
+            'line': context.field_line('Completion')
+        }
+
+@fixer('completion-math')
+def fix_completion_math(context, issues):
+    edits = list(calculate_completion(context.doc)['edits'])
+    if any(issue['type'] == 'missing_work_unit_completion' for issue in issues):
+        edits.append(set_field_edit(context.doc, 'Completion', f"{calculate_completion(context.doc)['overall']}%"))
+    return edits
+
+def _expected_status(context):
+    """Return the status the task completion implies, or None if it does not imply one."""
+    result = context.derived('completion', calculate_completion)
+    percentages = [task_result['completion'] for task_result in result['tasks']]
+    if not percentages:
+        return None
+    if all(percentage == 100 for percentage in percentages):
+        return 'Completed'
+    if all(percentage == 0 for percentage in percentages):
+        return 'Not Started'
+    return 'In Progress'
+
+@rule('status-consistency', "The work unit status agrees with the completion of its tasks", severity='medium')
+def check_status_consistency(context):
+    status = context.doc.get('Status')
+    expected = _expected_status(context)
+    if expected == 'Completed' and status != 'Completed':
+        yield {
+            'type': 'status_inconsistency',
+            'message': f"All tasks of {context.work_unit_id} are completed, but its status is '{status}' instead of 'Completed'",
+            'line': context.field_line('Status'),
+            'expected': 'Completed'
+        }
+    elif expected in ('Not Started', 'In Progress') and status == 'Completed':
+        yield {
+            'type': 'status_inconsistency',
+            'message': f"Work unit {context.work_unit_id} is 'Completed', but not all of its tasks are",
+            'line': context.field_line('Status'),
+            'expected': 'In Progress'
+        }
+
+@fixer('status-consistency')
+def fix_status_consistency(context, issues):
+    return [set_field_edit(context.doc, 'Status', issue['expected'], after=None) for issue in issues]
+
+def link_targets(file_path, text):
+    """Yield the (target, line, resolved path) of every checked file link in a work unit."""
+    for target, line_number in extract_links(text):
+        if target.startswith('#') or not is_checked_target(target):
+            continue
+        path, _ = resolve_target(os.path.abspath(file_path), target)
+        yield target, line_number, path
+
+@rule('broken-links', "Relative links in work units point at existing files", severity='low')
+def check_broken_links(context):
+    for target, line_number, path in link_targets(context.file_path, context.doc.text):
+        if not os.path.exists(path):
+            yield {
+                'type': 'broken_link',
+                'message': f"Link to {target} in {context.work_unit_id} points at a missing file",
+                'line': line_number,
+                'target': target
+            }
+
+def main():
+    parser = argparse.ArgumentParser(description='Run all validation rules in a single pass.')
+    parser.add_argument('--fix', action='store_true', help='Automatically fix the issues of rules that have a fix')
+    parser.add_argument('--rules', help='Comma-separated rule IDs to run (default: all)')
+    parser.add_argument('--report-file', help='Save the validation report to a file')
+    parser.add_argument('--format', choices=FORMATS, default='markdown', help='Report format')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of processes used to check work unit files (0 = one per CPU)')
+    args = parser.parse_args()
+
+    # Keep stdout parseable when it carries a JSON or SARIF report
+    status = sys.stdout if args.format == 'markdown' else sys.stderr
+
+    rule_ids = [rule_id.strip() for rule_id in args.rules.split(',')] if args.rules else None
+    try:
+        result = run_validation(rule_ids, args.jobs)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return False
+
+    if args.fix and result['issues']:
+        with redirect_stdout(status):
+            touched = fix_issues(result['issues'], result['rules'])
+        print(f"Fixed issues in {len(touched)} files.", file=status)
+        result = revalidate(result, touched, args.jobs)
+
+    report = render(result['issues'], rule_descriptors(result['rules']), args.format, generate_report(result))
+    print(report)
+
+    if args.report_file:
+        with open(args.report_file, 'w', encoding='utf-8') as f:
+            f.write(report)
+        print(f"Report saved to {args.report_file}", file=status)
+
+    return not result['issues']
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
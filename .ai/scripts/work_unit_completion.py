@@ -27,6 +27,11 @@ from datetime import datetime
 # Import registry updater
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from registry_updater import update_registry
+from work_unit_index import find_work_unit_file
+from work_unit_parser import parse_work_unit_bytes, set_field_edit, changelog_entry_edit, apply_edits
+from file_store import update_file
+from changelog_archive import rotate_if_needed
+from template_engine import get_template
 import documentation_updater
 
 # Constants
@@ -46,58 +51,31 @@ logging.basicConfig(
 
 logger = logging.getLogger('work_unit_completion')
 
-def find_work_unit_file(work_unit_id):
-    """Find the file path for a work unit by its ID."""
-    for filename in os.listdir(WORK_UNITS_DIR):
-        if filename.endswith('.md') and filename != 'registry.md' and filename != 'project_tracker.md':
-            file_path = os.path.join(WORK_UNITS_DIR, filename)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                id_match = re.search(r'^\s*-\s*\*\*ID\*\*:\s*([^\n]+)', content, re.MULTILINE)
-                if id_match and id_match.group(1).strip() == work_unit_id:
-                    return file_path
-    return None
+def mark_completed(data, file_path=None):
+    """Return work unit content with status Completed, completion 100% and a changelog entry."""
+    doc = parse_work_unit_bytes(data, file_path)
+    today = datetime.now().strftime('%Y-%m-%d')
+    
+    edits = [
+        # Update status
+        set_field_edit(doc, 'Status', 'Completed', after=None),
+        # Update completion percentage; if no completion field exists, add it after status
+        set_field_edit(doc, 'Completion', '100%'),
+        # Update last updated date
+        set_field_edit(doc, 'Last Updated', today, after=None),
+        # Add to changelog
+        changelog_entry_edit(doc, today, "Work unit completed and marked as 100% complete.")
+    ]
+    return apply_edits(doc, edits)
 
 def update_work_unit_status(file_path, dry_run=False):
     """Update the work unit status to Completed and set completion to 100%."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Update status
-    status_pattern = re.compile(r'^\s*-\s*\*\*Status\*\*:\s*([^\n]+)', re.MULTILINE)
-    updated_content = status_pattern.sub('- **Status**: Completed', content)
-    
-    # Update completion percentage
-    completion_pattern = re.compile(r'^\s*-\s*\*\*Completion\*\*:\s*([^\n]+)', re.MULTILINE)
-    if completion_pattern.search(updated_content):
-        updated_content = completion_pattern.sub('- **Completion**: 100%', updated_content)
-    else:
-        # If no completion field exists, add it after status
-        updated_content = updated_content.replace('- **Status**: Completed', '- **Status**: Completed\n- **Completion**: 100%')
-    
-    # Update last updated date
-    last_updated_pattern = re.compile(r'^\s*-\s*\*\*Last Updated\*\*:\s*([^\n]+)', re.MULTILINE)
-    today = datetime.now().strftime('%Y-%m-%d')
-    if last_updated_pattern.search(updated_content):
-        updated_content = last_updated_pattern.sub(f'- **Last Updated**: {today}', updated_content)
-    
-    # Add to changelog
-    changelog_section = "## Changelog"
-    changelog_entry = f"\n- **{today}**: Work unit completed and marked as 100% complete."
-    
-    if changelog_section in updated_content:
-        # Add entry to existing changelog
-        updated_content = updated_content.replace(changelog_section, f"{changelog_section}{changelog_entry}")
-    else:
-        # Add changelog section at the end
-        updated_content += f"\n\n{changelog_section}{changelog_entry}"
-    
     if dry_run:
         logger.info(f"Would update work unit status to Completed and set completion to 100%")
         return True
     else:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(updated_content)
+        update_file(file_path, lambda data: mark_completed(data, file_path))
+        rotate_if_needed(file_path)
         logger.info(f"Updated work unit status to Completed and set completion to 100%")
         return True
 
@@ -119,27 +97,13 @@ def generate_completion_report(work_unit_id, file_path, dry_run=False):
     objectives = objectives_section.group(1).strip() if objectives_section else "No objectives listed"
     
     # Generate report
-    report = f"# Work Unit Completion Report: {work_unit_id}\n\n"
-    report += f"## Overview\n\n"
-    report += f"- **Work Unit**: {title}\n"
-    report += f"- **ID**: {work_unit_id}\n"
-    report += f"- **Description**: {description}\n"
-    report += f"- **Status**: Completed\n"
-    report += f"- **Completion**: 100%\n"
-    report += f"- **Completion Date**: {datetime.now().strftime('%Y-%m-%d')}\n\n"
-    
-    report += f"## Objectives Achieved\n\n{objectives}\n\n"
-    
-    report += f"## Implementation Summary\n\n"
-    report += f"The work unit has been fully implemented according to the requirements and specifications.\n\n"
-    
-    report += f"## Next Steps\n\n"
-    report += f"1. Review the implementation to ensure it meets all requirements\n"
-    report += f"2. Update dependent work units if necessary\n"
-    report += f"3. Consider creating follow-up work units for any identified enhancements\n\n"
-    
-    report += f"## Generated by\n\n"
-    report += f"This completion report was automatically generated by the AI Documentation Framework's work unit completion script."
+    report = get_template('completion_report.md').render({
+        'id': work_unit_id,
+        'title': title,
+        'description': description,
+        'objectives': objectives,
+        'date': datetime.now().strftime('%Y-%m-%d')
+    })
     
     # Save report
     if not dry_run:
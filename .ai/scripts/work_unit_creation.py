@@ -21,7 +21,6 @@ Options:
 """
 
 import os
-import re
 import sys
 import argparse
 import logging
@@ -30,7 +29,9 @@ from datetime import datetime
 # Import other triggers
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from registry_updater import update_registry
+from id_allocator import reserve_work_unit_id, peek_next_work_unit_id
 import documentation_updater
+from template_engine import get_placeholder_template
 
 # Try to import the validator
 try:
@@ -43,6 +44,20 @@ except ImportError:
 WORK_UNITS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "work_units")
 TEMPLATE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates", "work_unit_template.md")
 LOGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs")
+
+# Placeholders of the work unit template and the variables that fill them
+DESCRIPTION_PLACEHOLDER = "[Provide a clear, concise description of the work unit. Explain what this work unit aims to accomplish and why it's important.]"
+TEMPLATE_PLACEHOLDERS = {
+    '[Title]': 'title',
+    '[Work Unit ID, e.g., WU-007]': 'id',
+    '[Enhancement/Feature/Bug Fix/Documentation]': 'type',
+    '[Proposed/In Progress/Completed]': 'status',
+    '[0-100%]': 'completion',
+    '[YYYY-MM-DD]': 'date',
+    '[High/Medium/Low]': 'priority',
+    '[AI Assistant/Human Project Manager]': 'assignee',
+    DESCRIPTION_PLACEHOLDER: 'description'
+}
 os.makedirs(LOGS_DIR, exist_ok=True)
 
 # Set up logging
@@ -57,43 +72,23 @@ logging.basicConfig(
 
 logger = logging.getLogger('work_unit_creation')
 
-def get_next_work_unit_id():
-    """Get the next available work unit ID."""
-    # Find all existing work unit files
-    work_unit_ids = []
-    if os.path.exists(WORK_UNITS_DIR):
-        for filename in os.listdir(WORK_UNITS_DIR):
-            if filename.endswith('.md') and filename != 'registry.md' and filename != 'project_tracker.md':
-                file_path = os.path.join(WORK_UNITS_DIR, filename)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    id_match = re.search(r'^\s*-\s*\*\*ID\*\*:\s*([^\n]+)', content, re.MULTILINE)
-                    if id_match:
-                        work_unit_ids.append(id_match.group(1).strip())
-    
-    # Extract numeric parts of IDs
-    numeric_ids = []
-    for wu_id in work_unit_ids:
-        if wu_id.startswith('WU-'):
-            try:
-                numeric_ids.append(int(wu_id[3:]))
-            except ValueError:
-                pass
-    
-    # Determine next ID
-    next_id = 1
-    if numeric_ids:
-        next_id = max(numeric_ids) + 1
-    
-    return f"WU-{next_id:03d}"
+def get_next_work_unit_id(dry_run=False):
+    """Reserve the next work unit ID (or only look it up on a dry run)."""
+    if dry_run:
+        return peek_next_work_unit_id()
+    return reserve_work_unit_id()
+
+def create_work_unit(title, work_unit_type, description, dry_run=False, work_unit_id=None):
+    """Create a new work unit file from template.
 
-def create_work_unit(title, work_unit_type, description, dry_run=False):
-    """Create a new work unit file from template."""
+    Bulk creation can pass an ID from a block reserved with id_allocator.reserve_work_unit_ids.
+    """
     # Ensure work units directory exists
     os.makedirs(WORK_UNITS_DIR, exist_ok=True)
     
     # Get next work unit ID
-    work_unit_id = get_next_work_unit_id()
+    if work_unit_id is None:
+        work_unit_id = get_next_work_unit_id(dry_run)
     
     # Create file name
     file_name = f"{work_unit_id}_{title.lower().replace(' ', '_')}.md"
@@ -104,31 +99,27 @@ def create_work_unit(title, work_unit_type, description, dry_run=False):
         logger.error(f"Template file not found: {TEMPLATE_FILE}")
         return None
     
-    # Read template
-    with open(TEMPLATE_FILE, 'r', encoding='utf-8') as f:
-        template = f.read()
-    
-    # Replace placeholders
-    today = datetime.now().strftime('%Y-%m-%d')
-    content = template.replace('[Title]', title)
-    content = content.replace('[Work Unit ID, e.g., WU-007]', work_unit_id)
-    content = content.replace('[Enhancement/Feature/Bug Fix/Documentation]', work_unit_type)
-    content = content.replace('[Proposed/In Progress/Completed]', 'Proposed')
-    content = content.replace('[YYYY-MM-DD]', today)
-    content = content.replace('[High/Medium/Low]', 'Medium')
-    content = content.replace('[AI Assistant/Human Project Manager]', 'AI Assistant')
-    
-    # Add completion percentage
-    content = content.replace('- **Status**: Proposed', '- **Status**: Proposed\n- **Completion**: 0%')
-    
-    # Replace description if provided
-    if description:
-        content = content.replace('[Provide a clear, concise description of the work unit. Explain what this work unit aims to accomplish and why it\'s important.]', description)
-    
-    # Write to file
+    # Fill in the placeholders of the template in one pass
+    content = get_placeholder_template(TEMPLATE_FILE, TEMPLATE_PLACEHOLDERS).render({
+        'title': title,
+        'id': work_unit_id,
+        'type': work_unit_type,
+        'status': 'Proposed',
+        'completion': '0%',
+        'date': datetime.now().strftime('%Y-%m-%d'),
+        'priority': 'Medium',
+        'assignee': 'AI Assistant',
+        'description': description or DESCRIPTION_PLACEHOLDER
+    })
+    
+    # Write to file; never overwrite an existing work unit
     if not dry_run:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        try:
+            with open(file_path, 'x', encoding='utf-8') as f:
+                f.write(content)
+        except FileExistsError:
+            logger.error(f"Work unit file already exists: {file_path}")
+            return None
         logger.info(f"Created new work unit: {file_path}")
     else:
         logger.info(f"Would create new work unit: {file_path}")
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Work Unit Index Script
+
+This script maintains a persistent SQLite index of work unit metadata so that other scripts
+can resolve work unit IDs without reading every file in the work_units directory.
+Each entry records the file's mtime, size and content hash and is re-extracted only when the
+mtime or size change. Secondary indexes on status, type, completion, last update and on a table
+of dependency edges let queries (see registry_query.py) be answered without scanning every entry.
+
+Usage:
+    python work_unit_index.py [--rebuild] [--lookup WU_ID] [--jobs N]
+
+Options:
+    --rebuild        Discard the existing index and rebuild it from scratch
+    --lookup WU_ID   Print the file path of a work unit
+    --jobs N         Number of processes used to extract changed files (0 = one per CPU)
+"""
+
+import os
+import sys
+import hashlib
+import sqlite3
+import argparse
+import logging
+
+# Import the shared work unit parser
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from work_unit_parser import parse_work_unit_bytes, summarize, extract_work_unit_ids
+from process_pool import parallel_map
+
+# Constants
+WORK_UNITS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "work_units")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")
+INDEX_FILE = os.path.join(CACHE_DIR, "work_unit_index.sqlite")
+EXCLUDED_FILES = ('registry.md', 'project_tracker.md')
+
+# Bump whenever the table layout or the extracted summary changes; older indexes are dropped and rebuilt
+SCHEMA_VERSION = 7
+
+INDEXED_FIELDS = ('id', 'title', 'status', 'completion', 'description', 'relationship', 'dependencies',
+                  'type', 'last_updated', 'parents', 'children', 'rollup_weight')
+
+logger = logging.getLogger('work_unit_index')
+
+_connection = None
+
+def is_work_unit_file(filename):
+    """Check whether a file in the work_units directory is a work unit."""
+    return filename.endswith('.md') and filename not in EXCLUDED_FILES
+
+def _create_schema(conn):
+    """Create the index tables, dropping any layout from an older schema version."""
+    conn.execute("DROP TABLE IF EXISTS work_units")
+    conn.execute("DROP TABLE IF EXISTS work_unit_dependencies")
+    conn.execute("""
+        CREATE TABLE work_units (
+            filename TEXT PRIMARY KEY,
+            id TEXT,
+            title TEXT,
+            status TEXT,
+            completion TEXT,
+            description TEXT,
+            relationship TEXT,
+            dependencies TEXT,
+            type TEXT,
+            last_updated TEXT,
+            parents TEXT,
+            children TEXT,
+            rollup_weight TEXT,
+            completion_value INTEGER,
+            content_hash TEXT,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE work_unit_dependencies (
+            filename TEXT NOT NULL,
+            dependency TEXT NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX work_units_id ON work_units(id)")
+    conn.execute("CREATE INDEX work_units_status ON work_units(status, completion_value)")
+    conn.execute("CREATE INDEX work_units_type ON work_units(type)")
+    conn.execute("CREATE INDEX work_units_completion ON work_units(completion_value)")
+    conn.execute("CREATE INDEX work_units_last_updated ON work_units(last_updated)")
+    conn.execute("CREATE INDEX work_unit_dependencies_dependency ON work_unit_dependencies(dependency)")
+    conn.execute("CREATE INDEX work_unit_dependencies_filename ON work_unit_dependencies(filename)")
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+
+def get_connection():
+    """Open (once per process) the index database and make sure its schema is current."""
+    global _connection
+    if _connection is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(INDEX_FILE, timeout=30)
+        conn.row_factory = sqlite3.Row
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            _create_schema(conn)
+        _connection = conn
+    return _connection
+
+def close_connection():
+    """Close the cached index connection."""
+    global _connection
+    if _connection is not None:
+        _connection.close()
+        _connection = None
+
+def extract_file(file_path):
+    """Read one work unit file and return its (metadata, content hash).
+
+    Runs in worker processes when the index is refreshed with several jobs.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        return summarize(parse_work_unit_bytes(data, file_path)), hashlib.sha256(data).hexdigest()
+    except (OSError, UnicodeDecodeError) as e:
+        logger.warning(f"Error extracting metadata from {file_path}: {e}")
+        return {}, None
+
+def _completion_value(completion):
+    """Return the integer percentage of a completion value, or None if it is not a percentage."""
+    try:
+        return int((completion or '').strip().rstrip('%'))
+    except ValueError:
+        return None
+
+def _store(conn, filename, stat_result, metadata, content_hash):
+    """Store the extracted metadata of one work unit file in the index."""
+    columns = ('filename',) + INDEXED_FIELDS + ('completion_value', 'content_hash', 'mtime_ns', 'size')
+    conn.execute(
+        f"INSERT OR REPLACE INTO work_units ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        (filename,) + tuple(metadata.get(field) for field in INDEXED_FIELDS) +
+        (_completion_value(metadata.get('completion')), content_hash, stat_result.st_mtime_ns, stat_result.st_size)
+    )
+    conn.execute("DELETE FROM work_unit_dependencies WHERE filename = ?", (filename,))
+    conn.executemany(
+        "INSERT INTO work_unit_dependencies (filename, dependency) VALUES (?, ?)",
+        [(filename, dependency) for dependency in extract_work_unit_ids(metadata.get('dependencies'))]
+    )
+
+def refresh_index(jobs=1):
+    """Bring the index up to date, re-extracting only files whose mtime or size changed.
+
+    With more than one job the changed files are extracted over a process pool; the index itself
+    is only written by this process. Returns a tuple of (changed filenames, removed filenames).
+    """
+    conn = get_connection()
+    # Plain tuples: building Row objects for every entry would dominate a refresh with no changes
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    known = {filename: (mtime_ns, size)
+             for filename, mtime_ns, size in cursor.execute("SELECT filename, mtime_ns, size FROM work_units")}
+
+    seen = set()
+    changed = []
+    if os.path.isdir(WORK_UNITS_DIR):
+        with os.scandir(WORK_UNITS_DIR) as entries:
+            for entry in entries:
+                if not is_work_unit_file(entry.name) or not entry.is_file():
+                    continue
+                stat_result = entry.stat()
+                seen.add(entry.name)
+                if known.get(entry.name) != (stat_result.st_mtime_ns, stat_result.st_size):
+                    changed.append((entry.name, stat_result))
+    else:
+        logger.warning(f"Work units directory not found: {WORK_UNITS_DIR}")
+
+    removed = sorted(set(known) - seen)
+    if changed or removed:
+        changed.sort(key=lambda item: item[0])
+        extracted = parallel_map(extract_file, [os.path.join(WORK_UNITS_DIR, name) for name, _ in changed], jobs)
+        with conn:
+            conn.executemany("DELETE FROM work_units WHERE filename = ?", [(name,) for name in removed])
+            conn.executemany("DELETE FROM work_unit_dependencies WHERE filename = ?", [(name,) for name in removed])
+            for (filename, stat_result), (metadata, content_hash) in zip(changed, extracted):
+                _store(conn, filename, stat_result, metadata, content_hash)
+        logger.debug(f"Work unit index refreshed: {len(changed)} changed, {len(removed)} removed")
+
+    return [filename for filename, _ in changed], removed
+
+def rebuild_index(jobs=1):
+    """Discard every index entry and re-extract all work units."""
+    conn = get_connection()
+    with conn:
+        conn.execute("DELETE FROM work_units")
+        conn.execute("DELETE FROM work_unit_dependencies")
+    return refresh_index(jobs)
+
+def _is_fresh(row):
+    """Check whether an index row still matches its file on disk."""
+    try:
+        stat_result = os.stat(os.path.join(WORK_UNITS_DIR, row['filename']))
+    except OSError:
+        return False
+    return (stat_result.st_mtime_ns, stat_result.st_size) == (row['mtime_ns'], row['size'])
+
+def _lookup(work_unit_id):
+    """Return the first index row for a work unit ID, or None."""
+    return get_connection().execute(
+        "SELECT filename, mtime_ns, size FROM work_units WHERE id = ? ORDER BY filename LIMIT 1",
+        (work_unit_id,)
+    ).fetchone()
+
+def find_work_unit_file(work_unit_id):
+    """Find the file path for a work unit by its ID.
+
+    The indexed entry is trusted if its file is unchanged; otherwise the index is refreshed first.
+    """
+    row = _lookup(work_unit_id)
+    if row is None or not _is_fresh(row):
+        refresh_index()
+        row = _lookup(work_unit_id)
+
+    return os.path.join(WORK_UNITS_DIR, row['filename']) if row else None
+
+def list_work_units(jobs=1):
+    """Return the metadata of every indexed work unit, refreshing changed entries first.
+
+    Work units whose metadata could not be extracted have a None status.
+    """
+    refresh_index(jobs)
+    rows = get_connection().execute(
+        f"SELECT filename, content_hash, {', '.join(INDEXED_FIELDS)} FROM work_units ORDER BY filename"
+    ).fetchall()
+
+    work_units = []
+    for row in rows:
+        work_unit = {field: row[field] for field in INDEXED_FIELDS}
+        work_unit['path'] = row['filename']
+        work_unit['content_hash'] = row['content_hash']
+        work_units.append(work_unit)
+    return work_units
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintain the persistent work unit index.')
+    parser.add_argument('--rebuild', action='store_true', help='Discard the existing index and rebuild it from scratch')
+    parser.add_argument('--lookup', help='Print the file path of a work unit')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of processes used to extract changed files (0 = one per CPU)')
+    args = parser.parse_args()
+
+    if args.rebuild:
+        changed, _ = rebuild_index(args.jobs)
+        print(f"Rebuilt work unit index with {len(changed)} work units: {INDEX_FILE}")
+    else:
+        changed, removed = refresh_index(args.jobs)
+        print(f"Work unit index refreshed: {len(changed)} changed, {len(removed)} removed")
+
+    if args.lookup:
+        file_path = find_work_unit_file(args.lookup)
+        if not file_path:
+            print(f"Work unit {args.lookup} not found")
+            return False
+        print(file_path)
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
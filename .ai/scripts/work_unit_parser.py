@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+"""
+Work Unit Parser
+
+This module reads a work unit markdown file once and turns it into a structured document model:
+metadata fields, sections, task/requirement blocks, subtasks with their [✓]/[~]/[ ] state and
+changelog entries. Every element records byte offsets into the source so that scripts can patch
+the file in place instead of re-running regular expressions over the whole text.
+
+Edits are (start, end, replacement) byte ranges built from those offsets and targeted at one parsed
+element (a metadata field, a field of task 2.3, a subtask marker), so an edit can never rewrite a
+line of the same shape elsewhere in the file. All edits to a file are applied by one splice pass.
+
+Usage:
+    python work_unit_parser.py FILE
+
+Arguments:
+    FILE    Path of the work unit file to parse and summarize
+"""
+
+import os
+import re
+import sys
+import json
+from dataclasses import dataclass, field
+
+# Line-level patterns; each is applied to a single line at most once
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.+?)\s*$')
+TASK_HEADING_PATTERN = re.compile(r'^(\d+(?:\.\d+)+)\.?\s+(.*)$')
+FIELD_PATTERN = re.compile(r'^(\s*)-\s*\*\*([^*]+?)\*\*:[ \t]*(.*?)\s*$')
+LIST_ITEM_PATTERN = re.compile(r'^(\s*)[-*]\s+(.*?)\s*$')
+CHECKBOX_PATTERN = re.compile(r'^\[([ xX✓~])\]\s*')
+VERB_PATTERN = re.compile(r'^(?:(.*?)(?:\s+-\s+|\s+))?(Will implement|Implementing|Implements)\s+(\[.*)$')
+FENCE_PATTERN = re.compile(r'^\s*(```|~~~)')
+WORK_UNIT_ID_PATTERN = re.compile(r'\bWU-\d+(?:-\d+)*\b')
+SUB_UNIT_ID_PATTERN = re.compile(r'^(WU-\d+(?:-\d+)*)-\d+$')
+CHILD_UNIT_PATTERN = re.compile(r'^\s*-\s*\*\*Child (?:Work )?Units?\*\*:(.*)$', re.MULTILINE)
+DESCRIPTION_PATTERN = re.compile(r'^\s*-\s*\*\*Description\*\*:\s*([^\n]+)', re.MULTILINE)
+
+TITLE_PREFIX = 'Work Unit:'
+
+# Subtask states, derived from checkbox markers or legacy implementation verbs
+COMPLETED = 'completed'
+IN_PROGRESS = 'in_progress'
+NOT_STARTED = 'not_started'
+
+MARKER_STATES = {'✓': COMPLETED, 'x': COMPLETED, 'X': COMPLETED, '~': IN_PROGRESS, ' ': NOT_STARTED}
+VERB_STATES = {'Implements': COMPLETED, 'Implementing': IN_PROGRESS, 'Will implement': NOT_STARTED}
+MARKER_VERBS = {'[✓]': 'Implements', '[~]': 'Implementing', '[ ]': 'Will implement'}
+
+@dataclass
+class Field:
+    """A `- **Name**: value` line, with any nested lines that belong to it."""
+    name: str
+    value: str
+    start: int
+    end: int
+    value_start: int
+    value_end: int
+    items: list = field(default_factory=list)
+
+@dataclass
+class Section:
+    """A markdown heading and the range it covers.
+
+    `end` stops at the next heading of the same or a higher level, `body_end` at the next heading of any level.
+    """
+    level: int
+    title: str
+    start: int
+    body_start: int
+    end: int = None
+    body_end: int = None
+
+@dataclass
+class Subtask:
+    """A top-level list item under a task's Implementation Details.
+
+    `line_end` is the end of the item line, or of the verb line for a legacy caption/verb pair.
+    `verb_start`/`verb_end` locate the verb of a nested verb item under an unmarked caption.
+    """
+    text: str
+    caption: str
+    state: str
+    start: int
+    end: int
+    line_end: int
+    item_start: int
+    indent: str
+    marker: str = None
+    marker_start: int = None
+    marker_end: int = None
+    verb: str = None
+    reference: str = None
+    legacy_pair: bool = False
+    verb_start: int = None
+    verb_end: int = None
+
+@dataclass
+class Task:
+    """A numbered task/requirement heading (e.g. `#### 1.2 Title`) and its fields."""
+    task_id: str
+    title: str
+    level: int
+    start: int
+    body_start: int
+    end: int = None
+    fields: dict = field(default_factory=dict)
+    fields_end: int = None
+    subtasks: list = field(default_factory=list)
+
+    def get(self, name, default=None):
+        """Return the value of a task field."""
+        task_field = self.fields.get(name)
+        return task_field.value if task_field else default
+
+@dataclass
+class ChangelogEntry:
+    """A `- **date**: message` entry in the Changelog section."""
+    date: str
+    message: str
+    start: int
+    end: int
+
+@dataclass
+class WorkUnitDocument:
+    """Structured view of a work unit file."""
+    path: str
+    data: bytes
+    title: str = None
+    metadata: dict = field(default_factory=dict)
+    sections: list = field(default_factory=list)
+    tasks: list = field(default_factory=list)
+    changelog: list = field(default_factory=list)
+    changelog_section: Section = None
+    _text: str = field(default=None, repr=False)
+
+    @property
+    def text(self):
+        """The decoded document text."""
+        if self._text is None:
+            self._text = self.data.decode('utf-8')
+        return self._text
+
+    @property
+    def requirements(self):
+        """Tasks that carry a field block (Status, Completion, ...) directly under their heading."""
+        return [task for task in self.tasks if task.fields]
+
+    def get(self, name, default=None):
+        """Return the value of a metadata field."""
+        metadata_field = self.metadata.get(name)
+        return metadata_field.value if metadata_field else default
+
+    def slice(self, start, end):
+        """Return the decoded text between two byte offsets."""
+        return self.data[start:end].decode('utf-8')
+
+    def line_number(self, offset):
+        """Return the 1-based line number of a byte offset."""
+        return self.data.count(b'\n', 0, offset) + 1
+
+    def section(self, title):
+        """Return the first section with the given title, or None."""
+        for section in self.sections:
+            if section.title == title:
+                return section
+        return None
+
+    def section_text(self, title):
+        """Return the stripped text of a section up to its first sub-heading, or None."""
+        section = self.section(title)
+        if section is None:
+            return None
+        return self.slice(section.body_start, section.body_end).strip()
+
+    def find_task(self, task_id):
+        """Return the task with the given ID (e.g. "1.2"), or None."""
+        for task in self.tasks:
+            if task.task_id == task_id:
+                return task
+        return None
+
+def _byte_index(line, index, is_ascii):
+    """Convert a character index within a line to a byte index."""
+    return index if is_ascii else len(line[:index].encode('utf-8'))
+
+def _split_subtask_text(text):
+    """Split a subtask item into (marker, caption, verb, reference)."""
+    marker = None
+    checkbox_match = CHECKBOX_PATTERN.match(text)
+    if checkbox_match:
+        marker = text[:3]
+        text = text[checkbox_match.end():]
+
+    verb_match = VERB_PATTERN.match(text)
+    if verb_match:
+        return marker, (verb_match.group(1) or '').strip(), verb_match.group(2), verb_match.group(3)
+    return marker, text.strip(), None, None
+
+def parse_work_unit_bytes(data, path=None):
+    """Parse the raw bytes of a work unit file into a WorkUnitDocument."""
+    doc = WorkUnitDocument(path=path, data=data)
+    loose_metadata = {}
+    has_metadata_section = False
+    open_sections = []
+    top_section = None
+    task = None
+    current_field = None
+    items_indent = None
+    subtask = None
+    changelog_entry = None
+    in_fence = False
+
+    offset = 0
+    for raw in data.splitlines(keepends=True):
+        start = offset
+        offset += len(raw)
+        line = raw.decode('utf-8').rstrip('\r\n')
+        is_ascii = raw.isascii()
+
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+            current_field = subtask = changelog_entry = None
+            continue
+        if in_fence:
+            continue
+
+        heading_match = HEADING_PATTERN.match(line)
+        if heading_match:
+            level = len(heading_match.group(1))
+            title = heading_match.group(2)
+            while open_sections and open_sections[-1].level >= level:
+                open_sections.pop().end = start
+            if doc.sections:
+                doc.sections[-1].body_end = start
+            section = Section(level, title, start, offset)
+            doc.sections.append(section)
+            open_sections.append(section)
+
+            if level == 1 and doc.title is None and title.startswith(TITLE_PREFIX):
+                doc.title = title[len(TITLE_PREFIX):].strip()
+            if level <= 2:
+                top_section = title if level == 2 else None
+                if title == 'Metadata' and level == 2:
+                    has_metadata_section = True
+                elif title == 'Changelog' and level == 2 and doc.changelog_section is None:
+                    doc.changelog_section = section
+
+            if task is not None:
+                task.end = start
+                task = None
+            task_match = TASK_HEADING_PATTERN.match(title) if level >= 3 else None
+            if task_match:
+                task = Task(task_match.group(1), task_match.group(2).strip(), level, start, offset)
+                doc.tasks.append(task)
+            current_field = subtask = changelog_entry = None
+            continue
+
+        if not line.strip():
+            current_field = subtask = changelog_entry = None
+            continue
+
+        indent = len(line) - len(line.lstrip())
+        if indent == 0:
+            current_field = subtask = changelog_entry = None
+            field_match = FIELD_PATTERN.match(line)
+            if not field_match:
+                continue
+
+            name = field_match.group(2).strip()
+            value = field_match.group(3)
+            if top_section == 'Changelog' and task is None:
+                changelog_entry = ChangelogEntry(name, value, start, offset)
+                doc.changelog.append(changelog_entry)
+                continue
+
+            current_field = Field(
+                name, value, start, offset,
+                start + _byte_index(line, field_match.start(3), is_ascii),
+                start + _byte_index(line, field_match.end(3), is_ascii)
+            )
+            items_indent = None
+            if task is not None:
+                task.fields.setdefault(name, current_field)
+                task.fields_end = offset
+            elif top_section == 'Metadata':
+                doc.metadata.setdefault(name, current_field)
+            else:
+                loose_metadata.setdefault(name, current_field)
+            continue
+
+        # Indented line: continuation of the current field or changelog entry
+        if changelog_entry is not None:
+            changelog_entry.end = offset
+            continue
+        if current_field is None:
+            continue
+        current_field.end = offset
+        if task is not None and task.fields.get(current_field.name) is current_field:
+            task.fields_end = offset
+
+        item_match = LIST_ITEM_PATTERN.match(line)
+        if item_match and (items_indent is None or indent <= items_indent):
+            items_indent = indent
+            current_field.items.append(item_match.group(2))
+
+            if task is not None and current_field.name == 'Implementation Details':
+                if FIELD_PATTERN.match(line):
+                    # A `**Name**: value` item (e.g. a child work unit link) is not a subtask
+                    subtask = None
+                    continue
+                text = item_match.group(2)
+                marker, caption, verb, reference = _split_subtask_text(text)
+                item_start = start + _byte_index(line, item_match.start(2), is_ascii)
+
+                # Legacy layout: a caption item followed by a sibling item holding only the verb
+                previous = task.subtasks[-1] if task.subtasks else None
+                if (verb and not marker and not caption and previous is not None and previous.state is None
+                        and previous.end == start):
+                    previous.verb = verb
+                    previous.reference = reference
+                    previous.state = VERB_STATES[verb]
+                    previous.legacy_pair = True
+                    previous.end = offset
+                    previous.line_end = start + len(raw.rstrip(b'\r\n'))
+                    subtask = previous
+                    continue
+
+                if marker:
+                    state = MARKER_STATES[marker[1]]
+                else:
+                    state = VERB_STATES.get(verb)
+                subtask = Subtask(
+                    text, caption, state, start, offset,
+                    start + len(raw.rstrip(b'\r\n')), item_start, line[:indent],
+                    marker=marker,
+                    marker_start=item_start if marker else None,
+                    marker_end=item_start + len(marker.encode('utf-8')) if marker else None,
+                    verb=verb if not marker else None,
+                    reference=reference
+                )
+                task.subtasks.append(subtask)
+            continue
+
+        if subtask is not None:
+            # Nested line under a subtask; an unmarked subtask may take its state from a verb child
+            subtask.end = offset
+            if subtask.state is None and item_match:
+                text = item_match.group(2)
+                checkbox_match = CHECKBOX_PATTERN.match(text)
+                verb_offset = checkbox_match.end() if checkbox_match else 0
+                verb_match = VERB_PATTERN.match(text[verb_offset:])
+                if verb_match:
+                    subtask.state = VERB_STATES[verb_match.group(2)]
+                    subtask.verb = verb_match.group(2)
+                    subtask.verb_start = start + _byte_index(
+                        line, item_match.start(2) + verb_offset + verb_match.start(2), is_ascii)
+                    subtask.verb_end = subtask.verb_start + len(subtask.verb)
+
+    for section in open_sections:
+        section.end = len(data)
+    if doc.sections:
+        doc.sections[-1].body_end = len(data)
+    if task is not None:
+        task.end = len(data)
+    if not has_metadata_section:
+        doc.metadata = loose_metadata
+
+    return doc
+
+def parse_work_unit(file_path):
+    """Read and parse a work unit file."""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    return parse_work_unit_bytes(data, file_path)
+
+def splice(data, edits):
+    """Apply (start, end, replacement) byte-range edits to data in a single pass.
+
+    Edits may be given in any order but must not overlap. Replacements may be str or bytes.
+    """
+    parts = []
+    position = 0
+    for start, end, replacement in sorted(edits, key=lambda edit: (edit[0], edit[1])):
+        if start < position:
+            raise ValueError(f"Overlapping edit at byte {start}")
+        parts.append(data[position:start])
+        parts.append(replacement.encode('utf-8') if isinstance(replacement, str) else replacement)
+        position = end
+    parts.append(data[position:])
+    return b''.join(parts)
+
+def field_value_edit(target_field, value):
+    """Return the edit that replaces the inline value of a field."""
+    return (target_field.value_start, target_field.value_end, value)
+
+def field_insert_edit(doc, after, name, value):
+    """Return the edit that inserts a new `- **Name**: value` line after a field and its nested lines."""
+    prefix = '' if doc.data[:after.end].endswith(b'\n') else '\n'
+    return (after.end, after.end, f"{prefix}- **{name}**: {value}\n")
+
+def set_field_edit(doc, name, value, task=None, after='Status'):
+    """Return the edit that sets a field of the work unit metadata, or of a task when one is given.
+
+    Only the targeted field is touched; a field of the same name elsewhere in the file is left alone.
+    A missing field is inserted after the `after` field; None is returned if that is missing too.
+    """
+    fields = task.fields if task is not None else doc.metadata
+    existing = fields.get(name)
+    if existing is not None:
+        return field_value_edit(existing, value)
+    anchor = fields.get(after) if after else None
+    if anchor is None:
+        return None
+    return field_insert_edit(doc, anchor, name, value)
+
+def changelog_entry_edit(doc, date, message):
+    """Return the edit that prepends a `- **date**: message` entry to the changelog.
+
+    A Changelog section is appended to the end of the document if it has none.
+    """
+    if doc.changelog_section is None:
+        return (len(doc.data), len(doc.data), f"\n\n## Changelog\n\n- **{date}**: {message}\n")
+    position = doc.changelog_section.body_start
+    return (position, position, f"\n- **{date}**: {message}\n")
+
+def apply_edits(doc, edits):
+    """Apply edits (None entries are skipped) to a parsed work unit and return the new file content."""
+    return splice(doc.data, [edit for edit in edits if edit is not None])
+
+def subtask_marker_edit(subtask, marker):
+    """Return the edit that gives a subtask the marker `[✓]`, `[~]` or `[ ]`.
+
+    Legacy verb layouts ("Caption - Implements [ref]", or a caption item followed by a verb item)
+    are rewritten to the single-line `- [✓] Caption - [ref]` form. A caption whose state comes from a
+    nested verb item keeps that layout; the nested verb is replaced instead, so the item has one state.
+    """
+    if subtask.marker:
+        return (subtask.marker_start, subtask.marker_end, marker)
+    if subtask.verb_start is not None:
+        return (subtask.verb_start, subtask.verb_end, MARKER_VERBS[marker])
+    if subtask.reference is not None:
+        line = f"{subtask.indent}- {marker} {subtask.caption} - {subtask.reference}" if subtask.caption \
+            else f"{subtask.indent}- {marker} {subtask.reference}"
+        return (subtask.start, subtask.line_end, line)
+    return (subtask.item_start, subtask.item_start, f"{marker} ")
+
+def extract_work_unit_ids(text):
+    """Return the work unit IDs referenced in a piece of text, in order of appearance."""
+    ids = []
+    for wu_id in WORK_UNIT_ID_PATTERN.findall(text or ''):
+        if wu_id not in ids:
+            ids.append(wu_id)
+    return ids
+
+def normalize_completion(value):
+    """Normalize a completion value to the `NN%` form used by the registry."""
+    if not value:
+        return '0%'
+    value = value.strip()
+    if value.endswith('%'):
+        return value
+    try:
+        return f"{int(value)}%"
+    except ValueError:
+        return '0%'
+
+def extract_relations(doc):
+    """Return the parent and child work unit IDs of a parsed work unit.
+
+    A sub-unit ID names its parent (WU-013-01 is a child of WU-013); parents are also read from the
+    Parent Unit field and the Parent Work Unit section, children from `Child Work Unit` items.
+    """
+    own_id = doc.get('ID')
+    parents = []
+    sub_unit_match = SUB_UNIT_ID_PATTERN.match(own_id or '')
+    if sub_unit_match:
+        parents.append(sub_unit_match.group(1))
+    parent_field = doc.metadata.get('Parent Unit')
+    if parent_field:
+        parents += extract_work_unit_ids(' '.join([parent_field.value] + parent_field.items))
+    parents += extract_work_unit_ids(doc.section_text('Parent Work Unit'))
+
+    children = []
+    for match in CHILD_UNIT_PATTERN.finditer(doc.text):
+        children += extract_work_unit_ids(match.group(1))
+
+    def unique(ids):
+        return [wu_id for index, wu_id in enumerate(ids) if wu_id != own_id and wu_id not in ids[:index]]
+
+    return {'parents': unique(parents), 'children': unique(children)}
+
+def summarize(doc):
+    """Return the registry-level metadata of a parsed work unit as a dict."""
+    basename = os.path.basename(doc.path) if doc.path else None
+    title = doc.title or basename
+
+    dependencies_field = doc.metadata.get('Dependencies')
+    dependencies = 'None'
+    if dependencies_field:
+        dependencies = dependencies_field.value or ', '.join(dependencies_field.items) or 'None'
+
+    relations = extract_relations(doc)
+
+    # The registry uses the first Description field in the file, wherever it appears
+    description_match = DESCRIPTION_PATTERN.search(doc.text)
+
+    return {
+        'id': doc.get('ID'),
+        'status': doc.get('Status') or 'Proposed',
+        'completion': normalize_completion(doc.get('Completion')),
+        'description': description_match.group(1).strip() if description_match else title,
+        'relationship': doc.get('Relationship Type') or 'Independent',
+        'dependencies': dependencies,
+        'type': doc.get('Type'),
+        'created': doc.get('Created'),
+        'last_updated': doc.get('Last Updated'),
+        'path': basename,
+        'title': title,
+        'parents': ', '.join(relations['parents']),
+        'children': ', '.join(relations['children']),
+        'rollup_weight': doc.get('Rollup Weight')
+    }
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__)
+        return False
+
+    doc = parse_work_unit(sys.argv[1])
+    summary = summarize(doc)
+    summary['sections'] = len(doc.sections)
+    summary['tasks'] = len(doc.tasks)
+    summary['subtasks'] = sum(len(task.subtasks) for task in doc.tasks)
+    summary['changelog_entries'] = len(doc.changelog)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
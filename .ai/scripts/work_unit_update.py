@@ -21,7 +21,6 @@ Options:
 """
 
 import os
-import re
 import sys
 import argparse
 import logging
@@ -30,6 +29,13 @@ from datetime import datetime
 # Import other triggers
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from registry_updater import update_registry
+from work_unit_index import find_work_unit_file
+from work_unit_parser import parse_work_unit, parse_work_unit_bytes, set_field_edit, changelog_entry_edit, apply_edits
+from completion_engine import calculate_completion
+from file_store import read_file, update_file
+from changelog_archive import rotate_if_needed
+from completion_rollup import update_ancestor_rollups
+from template_engine import get_template
 
 # Try to import the validator
 try:
@@ -43,6 +49,9 @@ WORK_UNITS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__
 LOGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs")
 os.makedirs(LOGS_DIR, exist_ok=True)
 
+# Requirement completion words and the percentages the completion engine reads
+REQUIREMENT_COMPLETION = {'completed': '100%', 'not completed': '0%'}
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -55,52 +64,44 @@ logging.basicConfig(
 
 logger = logging.getLogger('work_unit_update')
 
-def find_work_unit_file(work_unit_id):
-    """Find the file path for a work unit by its ID."""
-    for filename in os.listdir(WORK_UNITS_DIR):
-        if filename.endswith('.md') and filename != 'registry.md' and filename != 'project_tracker.md':
-            file_path = os.path.join(WORK_UNITS_DIR, filename)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                id_match = re.search(r'^\s*-\s*\*\*ID\*\*:\s*([^\n]+)', content, re.MULTILINE)
-                if id_match and id_match.group(1).strip() == work_unit_id:
-                    return file_path
-    return None
+def _work_unit_label(doc):
+    """Return the work unit ID of a parsed work unit for logging, falling back to its file name."""
+    return doc.get('ID') or os.path.basename(doc.path)
+
+def _modify(file_path, transform, dry_run):
+    """Run a transform through the shared write layer, or only on the current content on a dry run."""
+    if dry_run:
+        return transform(read_file(file_path))
+    return update_file(file_path, transform)
 
 def update_requirement_completion(file_path, requirement_id, completion_status, dry_run=False):
-    """Update the completion status of a specific requirement."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    """Update the completion of a specific requirement (a percentage, or Completed / Not Completed)."""
+    completion_status = REQUIREMENT_COMPLETION.get(completion_status.strip().lower(), completion_status.strip())
     
-    # Extract work unit ID for logging
-    id_match = re.search(r'^\s*-\s*\*\*ID\*\*:\s*([^\n]+)', content, re.MULTILINE)
-    work_unit_id = id_match.group(1).strip() if id_match else os.path.basename(file_path)
+    def set_requirement_completion(data):
+        doc = parse_work_unit_bytes(data, file_path)
+        
+        # Find the requirement
+        requirement = doc.find_task(requirement_id)
+        if requirement is None:
+            return None
+        
+        # Update completion status; if no completion field exists, add it after status
+        edit = set_field_edit(doc, 'Completion', completion_status, task=requirement)
+        if edit is None:
+            return None
+        return apply_edits(doc, [edit])
     
-    # Find the requirement
-    requirement_pattern = re.compile(r'####\s+' + re.escape(requirement_id) + r'\s+[^\n]+\n((?:- \*\*[^\n]+\n)+)', re.MULTILINE)
-    req_match = requirement_pattern.search(content)
+    updated = _modify(file_path, set_requirement_completion, dry_run)
     
-    if not req_match:
+    # Extract work unit ID for logging
+    work_unit_id = _work_unit_label(parse_work_unit(file_path))
+    
+    if updated is None:
         logger.error(f"Requirement {requirement_id} not found in {work_unit_id}")
         return False
     
-    req_block = req_match.group(1)
-    
-    # Update completion status
-    completion_pattern = re.compile(r'- \*\*Completion\*\*:\s*([^\n]+)')
-    if completion_pattern.search(req_block):
-        updated_req_block = completion_pattern.sub(f'- **Completion**: {completion_status}', req_block)
-    else:
-        # If no completion field exists, add it after status
-        updated_req_block = req_block.replace('- **Status**:', f'- **Status**:\n- **Completion**: {completion_status}')
-    
-    # Replace the requirement block in the content
-    updated_content = content.replace(req_block, updated_req_block)
-    
-    # Write updated content
     if not dry_run:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(updated_content)
         logger.info(f"Updated requirement {requirement_id} completion to {completion_status} in {work_unit_id}")
     else:
         logger.info(f"Would update requirement {requirement_id} completion to {completion_status} in {work_unit_id}")
@@ -108,87 +109,53 @@ def update_requirement_completion(file_path, requirement_id, completion_status,
     return True
 
 def calculate_completion_percentage(file_path):
-    """Calculate the overall completion percentage based on individual requirements."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Find all requirement blocks
-    requirement_pattern = re.compile(r'####\s+\d+\.\d+\s+[^\n]+\n((?:- \*\*[^\n]+\n)+)', re.MULTILINE)
-    requirements = []
-    
-    for req_match in requirement_pattern.finditer(content):
-        req_block = req_match.group(1)
-        completion_match = re.search(r'- \*\*Completion\*\*:\s*([^\n]+)', req_block)
-        if completion_match and completion_match.group(1).strip() == 'Completed':
-            requirements.append({'completed': True})
-        else:
-            requirements.append({'completed': False})
-    
-    if not requirements:
-        return 0
-    
-    completed = sum(1 for req in requirements if req['completed'])
-    return int((completed / len(requirements)) * 100)
+    """Calculate the overall completion percentage from the tasks, as the completion engine does."""
+    return calculate_completion(parse_work_unit(file_path))['overall']
 
 def update_work_unit(file_path, status=None, completion=None, dry_run=False):
     """Update a work unit file with new status and completion percentage."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    updated_content = content
-    
-    # Extract work unit ID for logging
-    id_match = re.search(r'^\s*-\s*\*\*ID\*\*:\s*([^\n]+)', content, re.MULTILINE)
-    work_unit_id = id_match.group(1).strip() if id_match else os.path.basename(file_path)
-    
-    # Update status if provided
-    if status:
-        status_pattern = re.compile(r'^\s*-\s*\*\*Status\*\*:\s*([^\n]+)', re.MULTILINE)
-        if status_pattern.search(updated_content):
-            updated_content = status_pattern.sub(f'- **Status**: {status}', updated_content)
-            logger.info(f"Updated status to {status} for {work_unit_id}")
-    
-    # Update completion percentage if provided
-    if completion:
-        completion_pattern = re.compile(r'^\s*-\s*\*\*Completion\*\*:\s*([^\n]+)', re.MULTILINE)
-        if completion_pattern.search(updated_content):
-            updated_content = completion_pattern.sub(f'- **Completion**: {completion}', updated_content)
-            logger.info(f"Updated completion to {completion} for {work_unit_id}")
-        else:
-            # If no completion field exists, add it after status
-            updated_content = updated_content.replace('- **Status**:', f'- **Status**:\n- **Completion**: {completion}')
-            logger.info(f"Added completion {completion} for {work_unit_id}")
-    
-    # Update last updated date
-    last_updated_pattern = re.compile(r'^\s*-\s*\*\*Last Updated\*\*:\s*([^\n]+)', re.MULTILINE)
     today = datetime.now().strftime('%Y-%m-%d')
-    if last_updated_pattern.search(updated_content):
-        updated_content = last_updated_pattern.sub(f'- **Last Updated**: {today}', updated_content)
     
     # Add to changelog
-    changelog_section = "## Changelog"
-    changelog_entry = f"\n- **{today}**: "
-    
     if status and completion:
-        changelog_entry += f"Updated status to {status} and completion to {completion}."
+        changelog_message = f"Updated status to {status} and completion to {completion}."
     elif status:
-        changelog_entry += f"Updated status to {status}."
+        changelog_message = f"Updated status to {status}."
     elif completion:
-        changelog_entry += f"Updated completion to {completion}."
+        changelog_message = f"Updated completion to {completion}."
     else:
-        changelog_entry += f"Work unit updated."
+        changelog_message = f"Work unit updated."
     
-    if changelog_section in updated_content:
-        # Add entry to existing changelog
-        updated_content = updated_content.replace(changelog_section, f"{changelog_section}{changelog_entry}")
-    else:
-        # Add changelog section at the end
-        updated_content += f"\n\n{changelog_section}{changelog_entry}"
+    def apply_update(data):
+        doc = parse_work_unit_bytes(data, file_path)
+        edits = []
+        
+        # Update status if provided
+        if status:
+            edits.append(set_field_edit(doc, 'Status', status, after=None))
+        
+        # Update completion percentage if provided; if no completion field exists, add it after status
+        if completion:
+            edits.append(set_field_edit(doc, 'Completion', completion))
+        
+        # Update last updated date
+        edits.append(set_field_edit(doc, 'Last Updated', today, after=None))
+        
+        edits.append(changelog_entry_edit(doc, today, changelog_message))
+        return apply_edits(doc, edits)
+    
+    _modify(file_path, apply_update, dry_run)
+    if not dry_run:
+        rotate_if_needed(file_path)
+    
+    # Extract work unit ID for logging
+    work_unit_id = _work_unit_label(parse_work_unit(file_path))
+    if status:
+        logger.info(f"Updated status to {status} for {work_unit_id}")
+    if completion:
+        logger.info(f"Updated completion to {completion} for {work_unit_id}")
     
-    # Write updated content
     if not dry_run:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(updated_content)
         logger.info(f"Updated work unit file: {file_path}")
     else:
         logger.info(f"Would update work unit file: {file_path}")
@@ -197,17 +164,12 @@ def update_work_unit(file_path, status=None, completion=None, dry_run=False):
 
 def generate_update_notification(work_unit_id, status=None, completion=None, dry_run=False):
     """Generate a notification about the work unit update."""
-    notification = f"# Work Unit Update Notification\n\n"
-    notification += f"## Work Unit: {work_unit_id}\n\n"
-    notification += f"This work unit was updated on {datetime.now().strftime('%Y-%m-%d')}.\n\n"
-    
-    if status:
-        notification += f"- Status updated to: **{status}**\n"
-    
-    if completion:
-        notification += f"- Completion updated to: **{completion}**\n"
-    
-    notification += f"\nThis notification was automatically generated by the AI Documentation Framework's work unit update script."
+    notification = get_template('update_notification.md').render({
+        'id': work_unit_id,
+        'date': datetime.now().strftime('%Y-%m-%d'),
+        'status': status,
+        'completion': completion
+    })
     
     # Save notification
     if not dry_run:
@@ -228,12 +190,12 @@ def main():
     parser = argparse.ArgumentParser(description='Update an existing work unit.')
     parser.add_argument('--work-unit', required=True, help='The ID of the work unit to update (e.g., WU-006)')
     parser.add_argument('--status', help='New status (Proposed, In Progress, Completed)')
-    parser.add_argument('--completion', help='Completion percentage (e.g., 25%)')
+    parser.add_argument('--completion', help='Completion percentage (e.g., 25%%)')
     parser.add_argument('--requirement', help='Specific requirement ID to update (e.g., 1.1)')
-    parser.add_argument('--requirement-completion', help='Completion status for the requirement (Completed/Not Completed)')
+    parser.add_argument('--requirement-completion', help='Completion for the requirement: a percentage, or Completed/Not Completed (100%%/0%%)')
     parser.add_argument('--dry-run', action='store_true', help='Show changes without applying them')
     parser.add_argument('--skip-validation', action='store_true', help='Skip validation of the work unit')
-    parser.add_argument('--recalculate', action='store_true', help='Recalculate overall completion based on requirements')
+    parser.add_argument('--recalculate', action='store_true', help='Recalculate overall completion from the tasks')
     args = parser.parse_args()
     
     # Validate arguments
@@ -278,6 +240,10 @@ def main():
     # Generate update notification
     notification = generate_update_notification(args.work_unit, args.status, args.completion, args.dry_run)
     
+    # Roll the new completion up to the parent work units
+    if not args.dry_run and args.completion:
+        update_ancestor_rollups([args.work_unit])
+    
     # Update registry
     if not args.dry_run:
         update_registry(check_only=False)
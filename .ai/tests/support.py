@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Shared fixtures for the framework script tests.
+
+WorkUnitTreeTestCase points the scripts at a temporary .ai tree (work_units/, cache/ and
+snapshots/) for the duration of each test, so tests never read or write the real framework files.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+import file_store
+import template_engine
+import work_unit_index
+
+WORK_UNIT_TEMPLATE = """# Work Unit: {wu_id} {title}
+
+## Metadata
+- **ID**: {wu_id}
+- **Status**: {status}
+- **Completion**: {completion}
+- **Dependencies**: {dependencies}
+- **Last Updated**: 2025-03-28
+
+## Description
+
+{title} work.
+
+## Changelog
+
+- **2025-03-28**: Created
+"""
+
+def work_unit_text(wu_id, title='Sample', status='In Progress', completion='0%', dependencies='None'):
+    """Render a minimal work unit document."""
+    return WORK_UNIT_TEMPLATE.format(wu_id=wu_id, title=title, status=status, completion=completion,
+                                     dependencies=dependencies)
+
+class WorkUnitTreeTestCase(unittest.TestCase):
+    """Run each test against an empty temporary .ai tree."""
+
+    # Extra (module, attribute, path below the temporary .ai directory) patches of a test case
+    PATCHES = ()
+
+    def setUp(self):
+        self.ai_dir = tempfile.mkdtemp(prefix='atavya-test-')
+        self.addCleanup(shutil.rmtree, self.ai_dir, True)
+        self.work_units_dir = os.path.join(self.ai_dir, 'work_units')
+        self.cache_dir = os.path.join(self.ai_dir, 'cache')
+        os.makedirs(self.work_units_dir)
+
+        work_unit_index.close_connection()
+        self.addCleanup(work_unit_index.close_connection)
+        patches = [
+            (work_unit_index, 'WORK_UNITS_DIR', 'work_units'),
+            (work_unit_index, 'CACHE_DIR', 'cache'),
+            (work_unit_index, 'INDEX_FILE', 'cache/work_unit_index.sqlite'),
+            (file_store, 'CACHE_DIR', 'cache'),
+            (file_store, 'LOCKS_DIR', 'cache/locks'),
+            (template_engine, 'CACHE_DIR', 'cache/templates'),
+        ] + list(self.PATCHES)
+        for module, attribute, relative in patches:
+            patcher = mock.patch.object(module, attribute, os.path.join(self.ai_dir, *relative.split('/')))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def path(self, filename):
+        """Return the path of a file in the temporary work_units directory."""
+        return os.path.join(self.work_units_dir, filename)
+
+    def write_unit(self, filename, text):
+        """Write a work unit file, making sure its stat changes even within one clock tick."""
+        file_path = self.path(filename)
+        previous = os.stat(file_path).st_mtime_ns if os.path.exists(file_path) else None
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        if previous is not None and os.stat(file_path).st_mtime_ns == previous:
+            os.utime(file_path, ns=(previous + 1000, previous + 1000))
+        return file_path
+
+    def read_unit(self, filename):
+        with open(self.path(filename), 'r', encoding='utf-8') as f:
+            return f.read()
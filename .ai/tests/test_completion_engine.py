@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the completion engine.
+
+Usage:
+    python -m pytest .ai/tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from work_unit_parser import parse_work_unit_bytes, splice, CHILD_UNIT_PATTERN
+from completion_engine import calculate_completion
+
+WORK_UNIT = """# Work Unit: WU-900 Side Panel
+
+## Metadata
+- **ID**: WU-900
+- **Status**: In Progress
+- **Completion**: 30%
+
+## Tasks
+
+#### 1.1 Field Management
+- **Priority**: High
+- **Status**: In Progress
+- **Completion**: 30%
+- **Implementation Details**:
+  - **Child Work Unit**: [WU-900-01: Field Panel](./WU-900-01_field_panel.md) (Status: In Progress, Completion: 30%)
+    - Implements [US-SP-EXT-001: Field Panel](../requirements/side_panel.md#us-sp-ext-001)
+  - [x] Created field panel scaffolding
+  - [ ] Pending: Testing
+"""
+
+TRACKED_TASK = """
+#### 1.2 Navigation
+- **Priority**: High
+- **Status**: In Progress
+- **Completion**: 0%
+- **Implementation Details**:
+  - [✓] Built navigation tree
+  - Keyboard support - Implementing [US-SP-NAV-004: Keyboard](../requirements/side_panel.md#us-sp-nav-004)
+"""
+
+def recalculate(text):
+    data = text.encode('utf-8')
+    result = calculate_completion(parse_work_unit_bytes(data))
+    return result, splice(data, result['edits']).decode('utf-8')
+
+class ChildUnitFieldTest(unittest.TestCase):
+
+    def test_child_unit_field_is_not_a_subtask(self):
+        doc = parse_work_unit_bytes(WORK_UNIT.encode('utf-8'))
+        captions = [subtask.caption for subtask in doc.tasks[0].subtasks]
+        self.assertEqual(captions, ['Created field panel scaffolding', 'Pending: Testing'])
+
+    def test_child_unit_line_survives_recalculation(self):
+        _, updated = recalculate(WORK_UNIT)
+        match = CHILD_UNIT_PATTERN.search(updated)
+        self.assertIsNotNone(match)
+        self.assertIn('  - **Child Work Unit**: [WU-900-01: Field Panel]', updated)
+
+    def test_hand_maintained_task_keeps_its_percentage(self):
+        result, updated = recalculate(WORK_UNIT)
+        self.assertEqual(result['tasks'][0]['completion'], 30)
+        self.assertEqual(updated, WORK_UNIT)
+
+class TrackedTaskTest(unittest.TestCase):
+
+    def test_inline_verb_is_normalized_to_marker(self):
+        result, updated = recalculate(WORK_UNIT + TRACKED_TASK)
+        self.assertEqual(result['tasks'][1]['completion'], 75)
+        self.assertIn('  - [~] Keyboard support - [US-SP-NAV-004: Keyboard]', updated)
+        self.assertIn('  - **Child Work Unit**: [WU-900-01: Field Panel]', updated)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the completion rollup from sub-units to parents.
+
+Usage:
+    python -m pytest .ai/tests
+"""
+
+import os
+import sys
+import json
+import unittest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from support import WorkUnitTreeTestCase, work_unit_text
+import completion_rollup
+from completion_rollup import CompletionRollup, update_ancestor_rollups, ROLLUP_FIELD
+from work_unit_parser import parse_work_unit
+
+class CompletionRollupTest(WorkUnitTreeTestCase):
+
+    PATCHES = (
+        (completion_rollup, 'WORK_UNITS_DIR', 'work_units'),
+        (completion_rollup, 'CACHE_DIR', 'cache'),
+        (completion_rollup, 'MEMO_FILE', 'cache/completion_rollup.json'),
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.write_unit('WU-100_parent.md', work_unit_text('WU-100', 'Parent', completion='40%'))
+        self.write_unit('WU-100-01_child.md', work_unit_text('WU-100-01', 'Child', completion='100%'))
+        self.write_unit('WU-100-01-01_grandchild.md', work_unit_text('WU-100-01-01', 'Grandchild', completion='0%'))
+
+    def weighted(self, wu_id, title, completion, weight):
+        """Render a work unit with a Rollup Weight field."""
+        text = work_unit_text(wu_id, title, completion=completion)
+        return text.replace('- **Dependencies**', f"- **Rollup Weight**: {weight}\n- **Dependencies**")
+
+    def memo_entries(self):
+        with open(completion_rollup.MEMO_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)['entries']
+
+    def rolled_up(self, filename):
+        field = parse_work_unit(self.path(filename)).metadata.get(ROLLUP_FIELD)
+        return field.value if field is not None else None
+
+    def test_rollup_averages_own_and_child_completion(self):
+        engine = CompletionRollup()
+        engine.sync()
+        self.assertEqual(engine.rollup('WU-100-01')['completion'], 50)
+        self.assertEqual(engine.rollup('WU-100')['completion'], 45)
+        self.assertEqual(engine.parents(), ['WU-100', 'WU-100-01'])
+
+    def test_changed_child_updates_its_ancestors(self):
+        self.assertEqual(update_ancestor_rollups(['WU-100-01-01']), ['WU-100-01', 'WU-100'])
+        self.assertEqual(self.rolled_up('WU-100-01_child.md'), '50%')
+        self.assertEqual(self.rolled_up('WU-100_parent.md'), '45%')
+        self.assertIsNone(self.rolled_up('WU-100-01-01_grandchild.md'))
+
+    def test_changed_parent_updates_its_own_rollup(self):
+        update_ancestor_rollups(['WU-100-01-01'])
+        self.write_unit('WU-100_parent.md', work_unit_text('WU-100', 'Parent', completion='4%'))
+
+        self.assertEqual(update_ancestor_rollups(['WU-100']), ['WU-100'])
+        self.assertEqual(self.rolled_up('WU-100_parent.md'), '27%')
+
+    def test_children_count_by_their_rollup_weight(self):
+        self.write_unit('WU-100-01_child.md', self.weighted('WU-100-01', 'Child', '100%', 3))
+        self.write_unit('WU-100-02_sibling.md', self.weighted('WU-100-02', 'Sibling', '100%', 'heavy'))
+        engine = CompletionRollup()
+        engine.sync()
+        self.assertEqual(engine.weight('WU-100-01'), 3.0)
+        # A malformed weight falls back to the default
+        self.assertEqual(engine.weight('WU-100-02'), 1.0)
+        # (40 + 3 * 50 + 100) / 5
+        self.assertEqual(engine.rollup('WU-100')['completion'], 58)
+
+        # With no weight on a unit's own tasks, a parent is as complete as its children
+        engine = CompletionRollup(own_weight=0)
+        engine.sync()
+        self.assertEqual(engine.rollup('WU-100-01')['completion'], 0)
+        self.assertEqual(engine.rollup('WU-100-01-01')['completion'], 0)
+
+    def test_unchanged_hierarchy_reuses_the_memo(self):
+        self.write_unit('WU-100-02_sibling.md', work_unit_text('WU-100-02', 'Sibling', completion='100%'))
+        # The first run writes the rollup fields, so the parents are rolled up once more from their new content
+        update_ancestor_rollups(['WU-100-01-01', 'WU-100-02'])
+        update_ancestor_rollups(['WU-100-01-01', 'WU-100-02'])
+
+        entries = self.memo_entries()
+        mtime_ns = os.stat(completion_rollup.MEMO_FILE).st_mtime_ns
+        update_ancestor_rollups(['WU-100-01-01', 'WU-100-02'])
+        self.assertEqual(os.stat(completion_rollup.MEMO_FILE).st_mtime_ns, mtime_ns)
+
+        self.write_unit('WU-100-01-01_grandchild.md', work_unit_text('WU-100-01-01', 'Grandchild', completion='60%'))
+        engine = CompletionRollup()
+        engine.load_memo()
+        engine.sync()
+        self.assertEqual(engine.rollup('WU-100')['completion'], 73)
+        engine.save_memo()
+        # Only the changed grandchild and its ancestors needed new entries; the sibling's is reused
+        self.assertEqual(len(set(self.memo_entries()) - set(entries)), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the work unit dependency graph.
+
+Usage:
+    python -m pytest .ai/tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from dependency_graph import DependencyGraph, DEPENDS_ON
+
+def indexed_unit(wu_id, dependencies='None', completion='0%', parents='', children='', relationship='Independent',
+                 path=None, content_hash=None):
+    """Return a work unit as listed by the work unit index."""
+    return {'id': wu_id, 'path': path or f"{wu_id}_unit.md", 'content_hash': content_hash or wu_id,
+            'dependencies': dependencies, 'completion': completion, 'parents': parents, 'children': children,
+            'relationship': relationship}
+
+def build_graph(*work_units):
+    graph = DependencyGraph()
+    graph.apply(work_units)
+    return graph
+
+class OrderingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = build_graph(
+            indexed_unit('WU-001', completion='0%'),
+            indexed_unit('WU-002', 'WU-001', completion='50%'),
+            indexed_unit('WU-003', 'WU-001', completion='100%'),
+            indexed_unit('WU-004', 'WU-002, WU-003', completion='80%'),
+        )
+
+    def test_dependencies_come_first_and_ties_are_broken_by_id(self):
+        self.assertEqual(self.graph.topological_order(), ['WU-001', 'WU-002', 'WU-003', 'WU-004'])
+        self.assertEqual(self.graph.cycles(), [])
+
+    def test_transitive_prerequisites_and_dependents(self):
+        self.assertEqual(self.graph.prerequisites('WU-004'), ['WU-002', 'WU-003', 'WU-001'])
+        self.assertEqual(self.graph.dependents('WU-001'), ['WU-002', 'WU-003', 'WU-004'])
+
+    def test_critical_path_follows_the_most_remaining_work(self):
+        self.assertEqual(self.graph.critical_path(), (['WU-001', 'WU-002', 'WU-004'], 170))
+
+    def test_changed_unit_invalidates_the_cached_results(self):
+        self.graph.critical_path()
+        self.graph.update_unit(indexed_unit('WU-003', 'WU-001', completion='0%'))
+        self.assertEqual(self.graph.critical_path(), (['WU-001', 'WU-003', 'WU-004'], 220))
+
+class CycleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = build_graph(
+            indexed_unit('WU-009'),
+            indexed_unit('WU-010', 'WU-009, WU-012'),
+            indexed_unit('WU-011', 'WU-010'),
+            indexed_unit('WU-012', 'WU-011'),
+            indexed_unit('WU-013', 'WU-011'),
+            indexed_unit('WU-020', 'WU-020'),
+        )
+
+    def test_cycles_and_self_dependencies_are_detected(self):
+        self.assertEqual(self.graph.cycles(), [['WU-010', 'WU-011', 'WU-012'], ['WU-020']])
+        self.assertEqual(self.graph.cycle_of('WU-011'), ['WU-010', 'WU-011', 'WU-012'])
+        self.assertIsNone(self.graph.cycle_of('WU-013'))
+
+    def test_order_treats_a_cycle_as_one_step(self):
+        self.assertEqual(self.graph.topological_order(), ['WU-009', 'WU-013'])
+
+    def test_removing_an_edge_breaks_the_cycle(self):
+        self.graph.update_unit(indexed_unit('WU-010', 'WU-009'))
+        self.assertEqual(self.graph.cycles(), [['WU-020']])
+        self.assertEqual(self.graph.topological_order(), ['WU-009', 'WU-010', 'WU-011', 'WU-012', 'WU-013'])
+
+class HierarchyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = build_graph(
+            indexed_unit('WU-013', children='WU-013-01'),
+            indexed_unit('WU-013-01', parents='WU-013', dependencies='WU-013'),
+            indexed_unit('WU-013-01-01', parents='WU-013-01'),
+            indexed_unit('WU-014', relationship='Related to WU-404'),
+        )
+
+    def test_parent_links_form_a_separate_hierarchy(self):
+        self.assertEqual(self.graph.children('WU-013'), ['WU-013-01'])
+        self.assertEqual(self.graph.ancestors('WU-013-01-01'), ['WU-013-01', 'WU-013'])
+        self.assertEqual(self.graph.descendants('WU-013'), ['WU-013-01', 'WU-013-01-01'])
+        # A sub-unit may depend on its parent without forming a cycle
+        self.assertEqual(self.graph.cycles(), [])
+
+    def test_missing_references_are_reported(self):
+        self.assertEqual(list(self.graph.missing_references()), [('related', 'WU-014', 'WU-404')])
+
+    def test_apply_only_reports_changed_files(self):
+        listing = [
+            indexed_unit('WU-013', children='WU-013-01'),
+            indexed_unit('WU-013-01', parents='WU-013', dependencies='None', content_hash='changed'),
+            indexed_unit('WU-013-01-01', parents='WU-013-01'),
+        ]
+        self.assertEqual(self.graph.apply(listing), {'WU-013-01', 'WU-014'})
+        self.assertNotIn('WU-014', self.graph.units())
+        self.assertNotIn((DEPENDS_ON, 'WU-013-01', 'WU-013'), self.graph.references('WU-013-01'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared write layer.
+
+Usage:
+    python -m pytest .ai/tests
+"""
+
+import os
+import sys
+import stat
+import unittest
+import multiprocessing
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from support import WorkUnitTreeTestCase
+import file_store
+from file_store import (commit, update_file, update_text_file, read_versioned, content_hash, write_atomic,
+                        ConcurrentModificationError, MAX_ATTEMPTS)
+
+def increment(data):
+    return str(int(data or b'0') + 1).encode('utf-8')
+
+def increment_in_process(file_path, count):
+    for _ in range(count):
+        update_file(file_path, increment)
+
+class FileStoreTest(WorkUnitTreeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.file_path = self.path('WU-001_core.md')
+        with open(self.file_path, 'wb') as f:
+            f.write(b'version 1\n')
+
+    def overwrite(self, data):
+        """Simulate another process replacing the file."""
+        with open(self.file_path, 'wb') as f:
+            f.write(data)
+
+    def test_commit_checks_the_expected_version(self):
+        data, version = read_versioned(self.file_path)
+        self.assertEqual(commit(self.file_path, b'version 2\n', version), content_hash(b'version 2\n'))
+        with self.assertRaises(ConcurrentModificationError):
+            commit(self.file_path, b'version 3\n', version)
+        self.assertEqual(read_versioned(self.file_path)[0], b'version 2\n')
+
+    def test_commit_with_no_version_requires_a_new_file(self):
+        new_file = self.path('WU-002_panel.md')
+        commit(new_file, b'created\n', None)
+        with self.assertRaises(ConcurrentModificationError):
+            commit(new_file, b'created again\n', None)
+
+    def test_update_retries_on_a_concurrent_modification(self):
+        calls = []
+
+        def append_line(data):
+            calls.append(data)
+            if len(calls) == 1:
+                self.overwrite(b'concurrent\n')
+            return data + b'appended\n'
+
+        self.assertEqual(update_file(self.file_path, append_line), b'concurrent\nappended\n')
+        self.assertEqual(calls, [b'version 1\n', b'concurrent\n'])
+
+    def test_contended_update_falls_back_to_the_lock(self):
+        calls = []
+
+        def always_overtaken(data):
+            calls.append(data)
+            if len(calls) <= MAX_ATTEMPTS:
+                self.overwrite(f"concurrent {len(calls)}\n".encode('utf-8'))
+            return data + b'appended\n'
+
+        self.assertEqual(update_file(self.file_path, always_overtaken), f"concurrent {MAX_ATTEMPTS}\nappended\n".encode('utf-8'))
+        self.assertEqual(len(calls), MAX_ATTEMPTS + 1)
+
+    def test_declined_or_unchanged_update_does_not_write(self):
+        mtime_ns = os.stat(self.file_path).st_mtime_ns
+        self.assertIsNone(update_text_file(self.file_path, lambda text: None))
+        self.assertEqual(update_text_file(self.file_path, lambda text: text), 'version 1\n')
+        self.assertEqual(os.stat(self.file_path).st_mtime_ns, mtime_ns)
+
+    def test_atomic_write_keeps_the_mode_and_leaves_no_temporary_file(self):
+        os.chmod(self.file_path, 0o640)
+        write_atomic(self.file_path, b'replaced\n')
+        self.assertEqual(stat.S_IMODE(os.stat(self.file_path).st_mode), 0o640)
+        self.assertEqual(os.listdir(self.work_units_dir), ['WU-001_core.md'])
+
+    @unittest.skipUnless(file_store.fcntl and 'fork' in multiprocessing.get_all_start_methods(),
+                         'needs fcntl locking and forked workers')
+    def test_concurrent_updates_are_not_lost(self):
+        counter = self.path('counter.txt')
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=increment_in_process, args=(counter, 25)) for _ in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual(read_versioned(counter)[0], b'100')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the work unit ID allocator.
+
+Usage:
+    python -m pytest .ai/tests
+"""
+
+import os
+import sys
+import unittest
+import multiprocessing
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from support import WorkUnitTreeTestCase, work_unit_text
+import id_allocator
+from id_allocator import reserve_work_unit_id, reserve_work_unit_ids, peek_next_work_unit_id, rebuild_counter
+
+def reserve_in_process(count):
+    return [reserve_work_unit_id() for _ in range(count)]
+
+class IdAllocatorTest(WorkUnitTreeTestCase):
+
+    PATCHES = (
+        (id_allocator, 'CACHE_DIR', 'cache'),
+        (id_allocator, 'COUNTER_FILE', 'cache/work_unit_id_counter'),
+        (id_allocator, 'LOCK_FILE', 'cache/work_unit_id_counter.lock'),
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.write_unit('WU-008_library.md', work_unit_text('WU-008', 'Library'))
+        self.write_unit('WU-013-01_panel.md', work_unit_text('WU-013-01', 'Panel'))
+        # A file whose metadata ID is missing still holds its number
+        self.write_unit('WU-014_notes.md', '# Notes\n')
+
+    def test_counter_is_seeded_from_ids_and_file_names(self):
+        self.assertEqual(peek_next_work_unit_id(), 'WU-015')
+        self.assertFalse(os.path.exists(id_allocator.COUNTER_FILE))
+        self.assertEqual(reserve_work_unit_id(), 'WU-015')
+        self.assertEqual(reserve_work_unit_id(), 'WU-016')
+
+    def test_block_reservation_is_consecutive(self):
+        self.assertEqual(reserve_work_unit_ids(3), ['WU-015', 'WU-016', 'WU-017'])
+        self.assertEqual(peek_next_work_unit_id(), 'WU-018')
+        with self.assertRaises(ValueError):
+            reserve_work_unit_ids(0)
+
+    def test_counter_does_not_depend_on_the_corpus_once_seeded(self):
+        reserve_work_unit_id()
+        self.write_unit('WU-100_future.md', work_unit_text('WU-100', 'Future'))
+        self.assertEqual(reserve_work_unit_id(), 'WU-016')
+        self.assertEqual(rebuild_counter(), 'WU-101')
+
+    def test_rebuild_never_moves_the_counter_back(self):
+        reserve_work_unit_ids(10)
+        self.assertEqual(rebuild_counter(), 'WU-025')
+
+    def test_unreadable_counter_is_reseeded(self):
+        reserve_work_unit_id()
+        with open(id_allocator.COUNTER_FILE, 'w', encoding='utf-8') as f:
+            f.write('garbage')
+        self.assertEqual(reserve_work_unit_id(), 'WU-015')
+
+    @unittest.skipUnless(id_allocator.fcntl and 'fork' in multiprocessing.get_all_start_methods(),
+                         'needs fcntl locking and forked workers')
+    def test_concurrent_reservations_are_unique(self):
+        reserve_work_unit_id()
+        with multiprocessing.get_context('fork').Pool(4) as pool:
+            allocated = [wu_id for ids in pool.map(reserve_in_process, [25] * 4) for wu_id in ids]
+        self.assertEqual(len(set(allocated)), 100)
+        self.assertEqual(peek_next_work_unit_id(), 'WU-116')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental link graph.
+
+Usage:
+    python -m pytest .ai/tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from support import WorkUnitTreeTestCase
+import link_graph
+from link_graph import LinkGraph
+
+CORE = """# Core
+
+## Scope
+
+See the [panel design](WU-002_panel.md#design), the [old notes](WU-404_gone.md),
+a [template](./path/to/WU-XXX_title.md) and the [site](https://example.com).
+"""
+
+PANEL = """# Panel
+
+## Overview
+
+Back to the [core scope](WU-001_core.md#scope).
+"""
+
+class LinkGraphTest(WorkUnitTreeTestCase):
+
+    PATCHES = (
+        (link_graph, 'CACHE_DIR', 'cache'),
+        (link_graph, 'CACHE_FILE', 'cache/link_graph.json'),
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.write_unit('WU-001_core.md', CORE)
+        self.write_unit('WU-002_panel.md', PANEL)
+        self.write_unit('WU-003_notes.md', '# Notes\n')
+        os.makedirs(os.path.join(self.ai_dir, '_core'))
+        self.framework = os.path.join(self.ai_dir, '_core', 'framework.md')
+        with open(self.framework, 'w', encoding='utf-8') as f:
+            f.write('Start with the [core unit](../work_units/WU-001_core.md).\n')
+        self.graph = LinkGraph(root=self.ai_dir)
+
+    def broken(self, key):
+        return [(issue['source'], issue['line'], issue['target']) for issue in self.graph.report()[key]]
+
+    def test_first_sync_checks_every_document(self):
+        self.assertEqual(self.graph.sync(), {self.framework, self.path('WU-001_core.md'), self.path('WU-002_panel.md'),
+                                             self.path('WU-003_notes.md')})
+        report = self.graph.report()
+        self.assertEqual((report['documents'], report['links']), (4, 4))
+        self.assertEqual(self.broken('broken_files'), [('work_units/WU-001_core.md', 5, 'WU-404_gone.md')])
+        self.assertEqual(self.broken('broken_anchors'), [('work_units/WU-001_core.md', 5, 'WU-002_panel.md#design')])
+        self.assertEqual(report['orphans'], ['_core/framework.md', 'work_units/WU-003_notes.md'])
+
+    def test_links_are_indexed_both_ways(self):
+        self.graph.sync()
+        core = self.path('WU-001_core.md')
+        self.assertEqual([(resolved, anchor) for resolved, anchor, _, _ in self.graph.links_from(core)],
+                         [(self.path('WU-002_panel.md'), 'design'), (self.path('WU-404_gone.md'), '')])
+        self.assertEqual(self.graph.links_to(core), [self.framework, self.path('WU-002_panel.md')])
+
+    def test_sync_only_rechecks_documents_touching_a_change(self):
+        self.graph.sync()
+        self.assertEqual(self.graph.sync(), set())
+
+        self.write_unit('WU-002_panel.md', PANEL + '\n## Design\n')
+        self.assertEqual(self.graph.sync(), {self.path('WU-002_panel.md'), self.path('WU-001_core.md')})
+        self.assertEqual(self.broken('broken_anchors'), [])
+
+        os.remove(self.path('WU-001_core.md'))
+        self.assertEqual(self.graph.sync(), {self.path('WU-002_panel.md'), self.framework})
+        self.assertEqual(self.broken('broken_files'), [('_core/framework.md', 1, '../work_units/WU-001_core.md'),
+                                                       ('work_units/WU-002_panel.md', 5, 'WU-001_core.md#scope')])
+
+    def test_cache_carries_the_checked_graph_to_the_next_run(self):
+        self.graph.sync()
+        report = self.graph.report()
+
+        # A touched but unchanged document is not read into a changed record
+        self.write_unit('WU-003_notes.md', '# Notes\n')
+        graph = LinkGraph(root=self.ai_dir)
+        graph.load_cache()
+        self.assertEqual(graph.sync(), set())
+        self.assertEqual(graph.report(), report)
+
+if __name__ == '__main__':
+    unittest.main()
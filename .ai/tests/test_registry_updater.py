@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental registry regeneration.
+
+Usage:
+    python -m pytest .ai/tests
+"""
+
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from support import WorkUnitTreeTestCase, work_unit_text
+import registry_updater
+from registry_updater import update_registry, load_registry, load_manifest, render_entries, scan_work_units
+
+class RegistryUpdaterTest(WorkUnitTreeTestCase):
+
+    PATCHES = (
+        (registry_updater, 'WORK_UNITS_DIR', 'work_units'),
+        (registry_updater, 'REGISTRY_FILE', 'work_units/registry.md'),
+        (registry_updater, 'SIDECAR_FILE', 'work_units/registry.json'),
+        (registry_updater, 'CACHE_DIR', 'cache'),
+        (registry_updater, 'MANIFEST_FILE', 'cache/registry_manifest.json'),
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.write_unit('WU-001_core.md', work_unit_text('WU-001', 'Core', status='Completed', completion='100%'))
+        self.write_unit('WU-002_panel.md', work_unit_text('WU-002', 'Panel', completion='30%', dependencies='WU-001'))
+
+    def update(self, check_only=False):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            result = update_registry(check_only)
+        return result, output.getvalue()
+
+    def test_registry_and_sidecar_list_every_work_unit(self):
+        self.assertEqual(self.update()[0], True)
+        registry = self.read_unit('registry.md')
+        self.assertIn('WU-001', registry)
+        self.assertIn('WU-002', registry)
+
+        records = {record['id']: record for record in load_registry()}
+        self.assertEqual(records['WU-002']['completion'], 30)
+        self.assertEqual(records['WU-002']['dependencies'], ['WU-001'])
+
+    def test_unchanged_inputs_leave_the_registry_untouched(self):
+        self.update()
+        mtime_ns = os.stat(self.path('registry.md')).st_mtime_ns
+        _, output = self.update()
+        self.assertIn('up to date', output)
+        self.assertEqual(os.stat(self.path('registry.md')).st_mtime_ns, mtime_ns)
+
+    def test_only_changed_entries_are_rendered_again(self):
+        self.update()
+        self.write_unit('WU-002_panel.md', work_unit_text('WU-002', 'Panel', completion='60%', dependencies='WU-001'))
+        os.remove(self.path('WU-001_core.md'))
+
+        entries, rendered, removed = render_entries(scan_work_units(), load_manifest())
+        self.assertEqual((rendered, removed), (1, 1))
+        self.assertEqual(list(entries), ['WU-002_panel.md'])
+
+    def test_manual_edit_is_detected_and_regenerated(self):
+        self.update()
+        self.write_unit('registry.md', self.read_unit('registry.md') + '\nManual note\n')
+        self.assertIsNone(load_registry())
+        self.assertEqual(self.update(check_only=True)[0], False)
+
+        self.update()
+        self.assertNotIn('Manual note', self.read_unit('registry.md'))
+        self.assertIsNotNone(load_registry())
+
+if __name__ == '__main__':
+    unittest.main()
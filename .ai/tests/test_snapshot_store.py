@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed snapshot store.
+
+Usage:
+    python -m pytest .ai/tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from support import WorkUnitTreeTestCase
+import snapshot_store
+from snapshot_store import (save_snapshot, store_object, load_object, list_snapshots, find_snapshot, restore_snapshot,
+                            prune, stats)
+from file_store import content_hash
+
+class SnapshotStoreTest(WorkUnitTreeTestCase):
+
+    PATCHES = (
+        (snapshot_store, 'PROJECT_ROOT', '.'),
+        (snapshot_store, 'SNAPSHOTS_DIR', 'snapshots'),
+        (snapshot_store, 'OBJECTS_DIR', 'snapshots/objects'),
+        (snapshot_store, 'HISTORY_FILE', 'snapshots/history.json'),
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.file_path = self.write_unit('WU-001_core.md', 'version 1\n')
+
+    def save(self, text, **options):
+        self.write_unit('WU-001_core.md', text)
+        return save_snapshot(self.file_path, **options)
+
+    def test_each_content_is_stored_once(self):
+        digest = save_snapshot(self.file_path)
+        self.assertEqual(digest, content_hash(b'version 1\n'))
+        self.assertEqual(save_snapshot(self.file_path), digest)
+        self.assertEqual(load_object(digest), b'version 1\n')
+        self.assertTrue(os.path.exists(os.path.join(self.ai_dir, 'snapshots', 'objects', digest[:2], digest + '.z')))
+
+        self.save('version 2\n')
+        self.assertIsNone(save_snapshot(self.path('WU-002_panel.md')))
+        self.assertEqual([entry['size'] for entry in list_snapshots(self.file_path)], [10, 10])
+        self.assertEqual(stats()['objects'], 2)
+
+    def test_restore_saves_the_current_version_first(self):
+        first = save_snapshot(self.file_path)
+        self.write_unit('WU-001_core.md', 'version 2\n')
+
+        self.assertEqual(restore_snapshot(self.file_path)['hash'], first)
+        self.assertEqual(self.read_unit('WU-001_core.md'), 'version 1\n')
+        second = list_snapshots(self.file_path)[0]['hash']
+        self.assertEqual(second, content_hash(b'version 2\n'))
+
+        restore_snapshot(self.file_path, second[:8])
+        self.assertEqual(self.read_unit('WU-001_core.md'), 'version 2\n')
+        with self.assertRaises(ValueError):
+            find_snapshot(self.file_path, 'not-a-hash')
+        with self.assertRaises(ValueError):
+            restore_snapshot(self.path('WU-002_panel.md'))
+
+    def test_retention_deletes_objects_no_snapshot_refers_to(self):
+        first = save_snapshot(self.file_path)
+        # Another document keeps a shared content alive
+        other = self.write_unit('WU-002_panel.md', 'version 2\n')
+        save_snapshot(other)
+        self.save('version 2\n', max_snapshots=2)
+        self.save('version 3\n', max_snapshots=2)
+
+        self.assertEqual(len(list_snapshots(self.file_path)), 2)
+        self.assertIsNone(load_object(first))
+        self.assertEqual(load_object(content_hash(b'version 2\n')), b'version 2\n')
+
+        # The dropped snapshot's content is still the other document's snapshot
+        self.assertEqual(prune(max_snapshots=1), (1, 0))
+        result = stats()
+        self.assertEqual((result['documents'], result['snapshots'], result['objects']), (2, 2, 2))
+
+    def test_prune_refuses_without_a_readable_history(self):
+        digest = store_object(b'orphaned\n')
+        self.assertEqual(prune(), (0, 0))
+        self.assertEqual(load_object(digest), b'orphaned\n')
+
+        with open(snapshot_store.HISTORY_FILE, 'w', encoding='utf-8') as f:
+            f.write('{not json')
+        with self.assertRaises(ValueError):
+            prune()
+        self.assertEqual(load_object(digest), b'orphaned\n')
+
+if __name__ == '__main__':
+    unittest.main()
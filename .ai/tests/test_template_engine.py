@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled template cache.
+
+Usage:
+    python -m pytest .ai/tests
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+import template_engine
+from template_engine import get_placeholder_template
+
+class PlaceholderCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix='atavya-test-')
+        self.addCleanup(shutil.rmtree, self.temp_dir, True)
+        self.cache_dir = os.path.join(self.temp_dir, 'cache')
+        for attribute, value in (('CACHE_DIR', self.cache_dir), ('_templates', {})):
+            patcher = mock.patch.object(template_engine, attribute, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.template_path = os.path.join(self.temp_dir, 'document.md')
+        with open(self.template_path, 'w', encoding='utf-8') as f:
+            f.write("# [Title]\n\nOwner: [Owner]\n")
+
+    def test_placeholder_maps_keep_their_own_compilations(self):
+        title_only = {'[Title]': 'title'}
+        both = {'[Title]': 'title', '[Owner]': 'owner'}
+        get_placeholder_template(self.template_path, title_only)
+        get_placeholder_template(self.template_path, both)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+        template_engine._templates.clear()
+        rendered = get_placeholder_template(self.template_path, title_only).render({'title': 'Panel'})
+        self.assertEqual(rendered, "# Panel\n\nOwner: [Owner]\n")
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_changed_template_replaces_its_compilation(self):
+        placeholders = {'[Title]': 'title'}
+        get_placeholder_template(self.template_path, placeholders)
+        with open(self.template_path, 'w', encoding='utf-8') as f:
+            f.write("## [Title] (revised)\n")
+        template_engine._templates.clear()
+
+        rendered = get_placeholder_template(self.template_path, placeholders).render({'title': 'Panel'})
+        self.assertEqual(rendered, "## Panel (revised)\n")
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+if __name__ == '__main__':
+    unittest.main()
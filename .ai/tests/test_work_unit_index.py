@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent work unit index.
+
+Usage:
+    python -m pytest .ai/tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from support import WorkUnitTreeTestCase, work_unit_text
+from work_unit_index import refresh_index, rebuild_index, find_work_unit_file, list_work_units, close_connection
+
+class WorkUnitIndexTest(WorkUnitTreeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_unit('WU-001_core.md', work_unit_text('WU-001', 'Core', status='Completed', completion='100%'))
+        self.write_unit('WU-002_panel.md', work_unit_text('WU-002', 'Panel', dependencies='WU-001'))
+        self.write_unit('registry.md', '# Work Unit Registry\n')
+
+    def test_first_refresh_indexes_work_units_only(self):
+        changed, removed = refresh_index()
+        self.assertEqual(changed, ['WU-001_core.md', 'WU-002_panel.md'])
+        self.assertEqual(removed, [])
+
+        work_units = {wu['id']: wu for wu in list_work_units()}
+        self.assertEqual(sorted(work_units), ['WU-001', 'WU-002'])
+        self.assertEqual(work_units['WU-001']['status'], 'Completed')
+        self.assertEqual(work_units['WU-002']['dependencies'], 'WU-001')
+        self.assertEqual(work_units['WU-002']['path'], 'WU-002_panel.md')
+
+    def test_refresh_only_extracts_changed_and_removed_files(self):
+        refresh_index()
+        self.assertEqual(refresh_index(), ([], []))
+
+        self.write_unit('WU-002_panel.md', work_unit_text('WU-002', 'Panel', status='Blocked'))
+        os.remove(self.path('WU-001_core.md'))
+        self.assertEqual(refresh_index(), (['WU-002_panel.md'], ['WU-001_core.md']))
+        self.assertEqual([(wu['id'], wu['status']) for wu in list_work_units()], [('WU-002', 'Blocked')])
+
+    def test_lookup_follows_renamed_files(self):
+        self.assertEqual(find_work_unit_file('WU-002'), self.path('WU-002_panel.md'))
+        os.rename(self.path('WU-002_panel.md'), self.path('WU-002_side_panel.md'))
+        self.assertEqual(find_work_unit_file('WU-002'), self.path('WU-002_side_panel.md'))
+        self.assertIsNone(find_work_unit_file('WU-404'))
+
+    def test_index_persists_across_connections(self):
+        refresh_index()
+        close_connection()
+        self.assertEqual(refresh_index(), ([], []))
+        changed, _ = rebuild_index()
+        self.assertEqual(changed, ['WU-001_core.md', 'WU-002_panel.md'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the subtask markers written by task status updates.
+
+Usage:
+    python -m pytest .ai/tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from work_unit_parser import parse_work_unit_bytes, apply_edits
+from work_unit_status_update import task_status_edits
+
+WORK_UNIT = """# Work Unit: WU-901 Reports
+
+## Metadata
+- **ID**: WU-901
+- **Status**: In Progress
+- **Completion**: 20%
+- **Last Updated**: 2025-03-28
+
+## Tasks
+"""
+
+CHECKLIST_TASK = """
+#### 1.1 Export
+- **Status**: In Progress
+- **Completion**: 40%
+- **Implementation Details**:
+  - [x] CSV export
+  - [ ] Pending: PDF export
+"""
+
+NESTED_VERB_TASK = """
+#### 1.1 Filters
+- **Status**: In Progress
+- **Completion**: 50%
+- **Implementation Details**:
+  - [✓] Date filter
+  - Region filter
+    - Will implement [US-RP-004: Region Filter](../requirements/reports.md#us-rp-004)
+"""
+
+def set_status(task_text, status, completion=None):
+    data = (WORK_UNIT + task_text).encode('utf-8')
+    doc = parse_work_unit_bytes(data)
+    return apply_edits(doc, task_status_edits(doc, '1.1', status, completion, None)).decode('utf-8')
+
+class TaskStatusMarkerTest(unittest.TestCase):
+
+    def test_hand_maintained_checklist_keeps_its_markers(self):
+        updated = set_status(CHECKLIST_TASK, 'Completed', 100)
+        self.assertIn('  - [x] CSV export\n  - [ ] Pending: PDF export\n', updated)
+        self.assertIn('- **Status**: Completed', updated)
+        self.assertIn('- **Completion**: 100%', updated)
+
+    def test_nested_verb_item_is_updated_with_its_caption(self):
+        updated = set_status(NESTED_VERB_TASK, 'Completed')
+        self.assertIn('  - Region filter\n    - Implements [US-RP-004: Region Filter]', updated)
+        self.assertNotIn('Will implement', updated)
+
+        subtasks = parse_work_unit_bytes(updated.encode('utf-8')).tasks[0].subtasks
+        self.assertEqual([subtask.state for subtask in subtasks], ['completed', 'completed'])
+
+    def test_nested_verb_item_is_reset_with_its_caption(self):
+        updated = set_status(NESTED_VERB_TASK.replace('Will implement', 'Implements'), 'Not Started')
+        self.assertIn('  - [ ] Date filter\n  - Region filter\n    - Will implement [', updated)
+
+if __name__ == '__main__':
+    unittest.main()
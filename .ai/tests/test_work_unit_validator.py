@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests that work_unit_validator and the validation rules share one completion model.
+
+Usage:
+    python -m pytest .ai/tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from support import WorkUnitTreeTestCase, work_unit_text
+from work_unit_validator import validate_work_unit, WORK_UNIT_RULES
+from validation_rules import check_file, fix_file
+from work_unit_parser import parse_work_unit
+
+TASKS = """
+## Tasks
+
+#### 1.1 Navigation
+- **Status**: In Progress
+- **Completion**: 50%
+- **Implementation Details**:
+  - [✓] Built navigation tree
+  - [ ] Keyboard support
+
+#### 1.2 Badges
+- **Status**: Not Started
+"""
+
+class SharedCompletionModelTest(WorkUnitTreeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.file_path = self.write_unit('WU-200_panel.md', work_unit_text('WU-200', 'Panel', completion='80%') + TASKS)
+
+    def test_validator_fix_satisfies_the_rules(self):
+        result = validate_work_unit(self.file_path, fix=True)
+        self.assertTrue(result['issues'])
+        self.assertEqual(check_file(self.file_path, WORK_UNIT_RULES)[1], [])
+        self.assertEqual(validate_work_unit(self.file_path)['issues'], [])
+
+        doc = parse_work_unit(self.file_path)
+        self.assertEqual(doc.find_task('1.2').get('Completion'), '0%')
+        self.assertEqual(doc.get('Completion'), '25%')
+
+    def test_rule_fix_satisfies_the_validator(self):
+        self.assertTrue(fix_file(self.file_path, WORK_UNIT_RULES))
+        result = validate_work_unit(self.file_path, fix=True)
+        self.assertEqual(result['issues'], [])
+        self.assertEqual(result['completion_percentage'], 25)
+
+if __name__ == '__main__':
+    unittest.main()